@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AirlinkApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "airlink_api"
+
+    def ready(self):
+        import airlink_api.signals  # noqa F401
@@ -0,0 +1,137 @@
+"""
+Airport autocomplete.
+
+Every process keeps an ``AirportIndex``: sorted arrays of normalized keys
+(accents stripped, case folded, punctuation turned into spaces) pointing at
+airports, so a lookup is a binary search followed by a scan of at most
+``limit`` matches per tier. Matches at the start of the airport name rank
+first, then matches at the start of its city, then matches at the start of
+any later word of the name ("prat" finds "Barcelona–El Prat").
+
+Saving or deleting an airport bumps a version number in the Django cache;
+each process rebuilds its index when it sees a new version, so steady-state
+lookups never hit the database.
+"""
+
+import threading
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+
+from airlink_api.models import Airport
+
+DEFAULT_SETTINGS = {
+    "CACHE_ALIAS": "default",
+    "CACHE_KEY": "airport-autocomplete:version",
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+}
+
+
+def autocomplete_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "AIRPORT_AUTOCOMPLETE", {})}
+
+
+def _cache():
+    return caches[autocomplete_settings()["CACHE_ALIAS"]]
+
+
+def current_version():
+    cache = _cache()
+    key = autocomplete_settings()["CACHE_KEY"]
+    cache.add(key, 0, None)
+    return cache.get(key)
+
+
+def record_change():
+    """Publish that airports were created, changed or deleted."""
+    cache = _cache()
+    key = autocomplete_settings()["CACHE_KEY"]
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def normalize(text):
+    """``"Barcelona–El Prat"`` -> ``"barcelona el prat"``."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    characters = (
+        character if character.isalnum() else " "
+        for character in decomposed
+        if not unicodedata.combining(character)
+    )
+    return " ".join("".join(characters).casefold().split())
+
+
+class AirportIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        # One sorted list of ``(key, airport_id)`` per ranking tier and the
+        # payloads by id, swapped together so searches need no lock.
+        self.snapshot = ((), {})
+
+    def sync(self):
+        version = current_version()
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.rebuild(version)
+
+    def rebuild(self, version):
+        names, cities, words = [], [], []
+        airports = {}
+        for pk, name, city, latitude, longitude in Airport.objects.values_list(
+            "pk", "name", "closest_big_city", "latitude", "longitude"
+        ):
+            airports[pk] = {
+                "id": pk,
+                "name": name,
+                "closest_big_city": city,
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+            name_key = normalize(name)
+            names.append((name_key, pk))
+            cities.append((normalize(city), pk))
+            tokens = name_key.split(" ")
+            for index in range(1, len(tokens)):
+                words.append((" ".join(tokens[index:]), pk))
+        self.snapshot = (
+            tuple(sorted(tier) for tier in (names, cities, words)),
+            airports,
+        )
+        self.version = version
+
+    def search(self, query, limit):
+        """Up to ``limit`` airport payloads matching ``query``, best first."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found = {}
+        tiers, airports = self.snapshot
+        for tier in tiers:
+            index = bisect_left(tier, (prefix,))
+            while (
+                len(found) < limit
+                and index < len(tier)
+                and tier[index][0].startswith(prefix)
+            ):
+                found.setdefault(tier[index][1], None)
+                index += 1
+            if len(found) == limit:
+                break
+        return [airports[pk] for pk in found]
+
+
+@lru_cache(maxsize=None)
+def get_airport_index():
+    return AirportIndex()
+
+
+def find_airports(query, limit=None):
+    index = get_airport_index()
+    index.sync()
+    return index.search(query, limit or autocomplete_settings()["LIMIT"])
@@ -0,0 +1,127 @@
+"""
+Crew duty timelines.
+
+``CrewDutyInterval`` holds one row per crew assignment with the flight's
+departure and arrival copied in, indexed by ``(crew, departure_time)``. A
+timeline is a single range scan of that index: flights never last longer
+than ``MAX_FLIGHT_DURATION``, so every interval overlapping ``[start, end)``
+departs after ``start - MAX_FLIGHT_DURATION``. The rows are kept in sync by
+the signals in ``airlink_api.signals``; ``rebuild_intervals`` recomputes
+them from ``Flight.crew``.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from airlink_api.models import MAX_FLIGHT_DURATION, CrewDutyInterval, Flight
+
+
+def add_intervals(flight_ids, crew_ids):
+    """Index every pair of the given flights and crew members."""
+    flights = Flight.objects.filter(pk__in=flight_ids).values_list(
+        "pk", "departure_time", "arrival_time"
+    )
+    CrewDutyInterval.objects.bulk_create(
+        [
+            CrewDutyInterval(
+                crew_id=crew_id,
+                flight_id=flight_id,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+            for flight_id, departure_time, arrival_time in flights
+            for crew_id in crew_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def remove_intervals(flight_ids=None, crew_ids=None):
+    intervals = CrewDutyInterval.objects.all()
+    if flight_ids is not None:
+        intervals = intervals.filter(flight_id__in=flight_ids)
+    if crew_ids is not None:
+        intervals = intervals.filter(crew_id__in=crew_ids)
+    intervals.delete()
+
+
+def move_intervals(flight):
+    """Copy new departure and arrival times of ``flight`` to its intervals."""
+    CrewDutyInterval.objects.filter(flight_id=flight.pk).exclude(
+        departure_time=flight.departure_time, arrival_time=flight.arrival_time
+    ).update(departure_time=flight.departure_time, arrival_time=flight.arrival_time)
+
+
+def rebuild_intervals(batch_size=1000):
+    """Recompute the whole index from ``Flight.crew``; returns the row count."""
+    assignments = Flight.crew.through.objects.values_list(
+        "crew_id", "flight_id", "flight__departure_time", "flight__arrival_time"
+    )
+    with transaction.atomic():
+        CrewDutyInterval.objects.all().delete()
+        CrewDutyInterval.objects.bulk_create(
+            (
+                CrewDutyInterval(
+                    crew_id=crew_id,
+                    flight_id=flight_id,
+                    departure_time=departure_time,
+                    arrival_time=arrival_time,
+                )
+                for crew_id, flight_id, departure_time, arrival_time in (
+                    assignments.iterator(chunk_size=batch_size)
+                )
+            ),
+            batch_size=batch_size,
+        )
+    return CrewDutyInterval.objects.count()
+
+
+def timeline(intervals):
+    """
+    Turn ``(flight_id, departure, arrival)`` tuples sorted by departure into
+    schedule entries with the rest before each flight, in minutes. A negative
+    rest means the flight overlaps the previous one.
+    """
+    entries = []
+    previous_arrival = None
+    for flight_id, departure_time, arrival_time in intervals:
+        rest = None
+        if previous_arrival is not None:
+            rest = int((departure_time - previous_arrival).total_seconds() // 60)
+        entries.append(
+            {
+                "flight": flight_id,
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+                "rest_before_minutes": rest,
+            }
+        )
+        if previous_arrival is None or arrival_time > previous_arrival:
+            previous_arrival = arrival_time
+    return entries
+
+
+def crew_schedules(crew_ids, start=None, end=None):
+    """
+    Return ``{crew_id: [entry, ...]}`` for flights overlapping ``[start, end)``
+    with one query for all crew members.
+    """
+    intervals = CrewDutyInterval.objects.filter(crew_id__in=crew_ids)
+    if start is not None:
+        intervals = intervals.filter(
+            departure_time__gt=start - MAX_FLIGHT_DURATION, arrival_time__gt=start
+        )
+    if end is not None:
+        intervals = intervals.filter(departure_time__lt=end)
+
+    by_crew = defaultdict(list)
+    for crew_id, flight_id, departure_time, arrival_time in intervals.order_by(
+        "crew_id", "departure_time", "flight_id"
+    ).values_list("crew_id", "flight_id", "departure_time", "arrival_time"):
+        by_crew[crew_id].append((flight_id, departure_time, arrival_time))
+    return {crew_id: timeline(by_crew[crew_id]) for crew_id in crew_ids}
+
+
+def crew_schedule(crew_id, start=None, end=None):
+    return crew_schedules([crew_id], start, end)[crew_id]
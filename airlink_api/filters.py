@@ -0,0 +1,61 @@
+import django_filters
+from django.db.models import F
+
+from airlink_api.models import Flight, FlightSearchEntry
+
+
+class FlightFilter(django_filters.FilterSet):
+    departure_after = django_filters.IsoDateTimeFilter(
+        field_name="departure_time", lookup_expr="gte"
+    )
+    departure_before = django_filters.IsoDateTimeFilter(
+        field_name="departure_time", lookup_expr="lt"
+    )
+    source_city = django_filters.CharFilter(
+        field_name="route__source__closest_big_city", lookup_expr="iexact"
+    )
+    destination_city = django_filters.CharFilter(
+        field_name="route__destination__closest_big_city", lookup_expr="iexact"
+    )
+    available_only = django_filters.BooleanFilter(method="filter_available_only")
+
+    class Meta:
+        model = Flight
+        fields = ["departure_time", "arrival_time", "id", "route__id"]
+
+    def filter_available_only(self, queryset, name, value):
+        if not value:
+            return queryset
+        # Compared on the stored counter, so no ticket rows are counted.
+        return queryset.filter(
+            tickets_sold__lt=F("airplane__rows") * F("airplane__seats_in_row")
+        )
+
+
+class FlightSearchFilter(django_filters.FilterSet):
+    """``FlightFilter`` over the flattened columns of ``FlightSearchEntry``."""
+
+    departure_after = django_filters.IsoDateTimeFilter(
+        field_name="departure_time", lookup_expr="gte"
+    )
+    departure_before = django_filters.IsoDateTimeFilter(
+        field_name="departure_time", lookup_expr="lt"
+    )
+    source_city = django_filters.CharFilter(
+        field_name="source_city", lookup_expr="iexact"
+    )
+    destination_city = django_filters.CharFilter(
+        field_name="destination_city", lookup_expr="iexact"
+    )
+    available_only = django_filters.BooleanFilter(method="filter_available_only")
+    id = django_filters.NumberFilter(field_name="flight_id")
+    route__id = django_filters.NumberFilter(field_name="route_id")
+
+    class Meta:
+        model = FlightSearchEntry
+        fields = ["departure_time", "arrival_time"]
+
+    def filter_available_only(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(tickets_sold__lt=F("capacity"))
@@ -0,0 +1,133 @@
+"""
+Flight search read model.
+
+``FlightSearchEntry`` holds one flat row per flight with the route text,
+cities, airplane type, capacity, seats sold and crew names copied in, so the
+flight list is a single indexed scan of one table. Rows are refreshed from
+the signals in ``airlink_api.signals`` whenever a flight or anything it
+shows changes, and ``tickets_sold`` is bumped by the same statements that
+bump ``Flight.tickets_sold``. Every write sets ``updated_at``, which the
+flight views use as a cheap version stamp for conditional requests;
+``content_updated_at`` is set only when a row is recomputed, so it changes
+with everything a flight shows except seats sold.
+``rebuild_entries`` recomputes the table.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from airlink_api.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSearchEntry,
+    Route,
+)
+
+ENTRY_FIELDS = (
+    "route",
+    "flight_route",
+    "source_city",
+    "destination_city",
+    "airplane_type",
+    "capacity",
+    "tickets_sold",
+    "crew",
+    "departure_time",
+    "arrival_time",
+    "updated_at",
+    "content_updated_at",
+)
+
+# Lookups from ``Flight`` to each model whose fields are copied into entries.
+SOURCE_LOOKUPS = {
+    Route: ("route",),
+    Airport: ("route__source", "route__destination"),
+    Airplane: ("airplane",),
+    AirplaneType: ("airplane__airplane_type",),
+    Crew: ("crew",),
+}
+
+
+def build_entries(flight_ids):
+    """Yield unsaved entries of the given flights with two queries."""
+    crew = defaultdict(list)
+    for flight_id, first_name, last_name in (
+        Flight.crew.through.objects.filter(flight_id__in=flight_ids)
+        .order_by("flight_id", "crew_id")
+        .values_list("flight_id", "crew__first_name", "crew__last_name")
+    ):
+        crew[flight_id].append(f"{first_name} {last_name}")
+
+    for flight in Flight.objects.filter(pk__in=flight_ids).values(
+        "pk",
+        "route_id",
+        "route__source__name",
+        "route__source__closest_big_city",
+        "route__destination__name",
+        "route__destination__closest_big_city",
+        "airplane__airplane_type__name",
+        "airplane__rows",
+        "airplane__seats_in_row",
+        "tickets_sold",
+        "departure_time",
+        "arrival_time",
+    ):
+        has_route = flight["route_id"] is not None
+        has_airplane = flight["airplane__rows"] is not None
+        yield FlightSearchEntry(
+            flight_id=flight["pk"],
+            route_id=flight["route_id"],
+            flight_route=(
+                f"{flight['route__source__name']} - "
+                f"{flight['route__destination__name']}"
+                if has_route
+                else None
+            ),
+            source_city=flight["route__source__closest_big_city"] or "",
+            destination_city=flight["route__destination__closest_big_city"] or "",
+            airplane_type=flight["airplane__airplane_type__name"],
+            capacity=(
+                flight["airplane__rows"] * flight["airplane__seats_in_row"]
+                if has_airplane
+                else None
+            ),
+            tickets_sold=flight["tickets_sold"],
+            crew=crew[flight["pk"]],
+            departure_time=flight["departure_time"],
+            arrival_time=flight["arrival_time"],
+        )
+
+
+def refresh_entries(flight_ids, batch_size=1000):
+    """Recompute the entries of the given flights; deleted flights are skipped."""
+    flight_ids = sorted(set(flight_ids))
+    for start in range(0, len(flight_ids), batch_size):
+        FlightSearchEntry.objects.bulk_create(
+            list(build_entries(flight_ids[start : start + batch_size])),
+            update_conflicts=True,
+            unique_fields=["flight"],
+            update_fields=ENTRY_FIELDS,
+        )
+
+
+def dependent_flight_ids(instance):
+    """Ids of the flights whose entries show a field of ``instance``."""
+    condition = Q()
+    for lookup in SOURCE_LOOKUPS[type(instance)]:
+        condition |= Q(**{lookup: instance})
+    return list(
+        Flight.objects.filter(condition).values_list("pk", flat=True).distinct()
+    )
+
+
+def rebuild_entries(batch_size=1000):
+    """Recompute the whole table from flights; returns the row count."""
+    with transaction.atomic():
+        FlightSearchEntry.objects.all().delete()
+        refresh_entries(Flight.objects.values_list("pk", flat=True), batch_size)
+    return FlightSearchEntry.objects.count()
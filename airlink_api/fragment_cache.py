@@ -0,0 +1,112 @@
+"""
+Per-object fragment cache for flight serializers.
+
+A flight's representation is mostly static: route, airplane and crew change
+rarely, while seat availability changes with every order. Serializers using
+``FragmentCacheMixin`` cache each object's representation without its
+``volatile_fields`` under a key holding the object's pk and its own stamp,
+so a change to one flight leaves every other fragment valid. Flights are
+stamped with the ``content_updated_at`` of their search entry, set whenever
+anything the flight shows changes (see ``airlink_api.flight_search``) but
+not by ticket sales, so selling seats keeps the fragments of busy flights.
+Lists read all fragments with one ``get_many``, serialize only the misses
+and fill them with one ``set_many``; volatile fields are always computed
+from the instance.
+
+Each lookup reports its hits and misses to the callable named by
+``FRAGMENT_CACHE["STATS_HOOK"]``. The default one keeps per-process
+counters, read with ``get_stats()``, to help size the cache.
+"""
+
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from airlink_api.models import FlightSearchEntry
+
+DEFAULT_SETTINGS = {
+    "CACHE_ALIAS": "default",
+    "CACHE_PREFIX": "fragment",
+    "TIMEOUT": 60 * 60,
+    "STATS_HOOK": "airlink_api.fragment_cache.record_stats",
+}
+
+
+def fragment_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "FRAGMENT_CACHE", {})}
+
+
+def _cache():
+    return caches[fragment_settings()["CACHE_ALIAS"]]
+
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def record_stats(name, hits, misses):
+    """Default stats hook: count hits and misses per serializer."""
+    with _stats_lock:
+        _stats[name]["hits"] += hits
+        _stats[name]["misses"] += misses
+
+
+def get_stats():
+    """``{name: {"hits", "misses", "ratio"}}`` counted by ``record_stats``."""
+    with _stats_lock:
+        return {
+            name: {
+                **counts,
+                "ratio": counts["hits"] / (counts["hits"] + counts["misses"]),
+            }
+            for name, counts in _stats.items()
+            if counts["hits"] + counts["misses"]
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def report(name, hits, misses):
+    hook = fragment_settings()["STATS_HOOK"]
+    if hook:
+        import_string(hook)(name, hits, misses)
+
+
+def entry_stamp(content_updated_at):
+    return str(content_updated_at.timestamp())
+
+
+def flight_stamps(flight_ids):
+    """``{flight_id: stamp}`` of the flights with a search entry, one query."""
+    return {
+        flight_id: entry_stamp(content_updated_at)
+        for flight_id, content_updated_at in FlightSearchEntry.objects.filter(
+            pk__in=flight_ids
+        ).values_list("pk", "content_updated_at")
+    }
+
+
+def fragment_keys(name, stamps):
+    """``{pk: key}`` of the current fragments of ``stamps`` (``{pk: stamp}``)."""
+    prefix = f"{fragment_settings()['CACHE_PREFIX']}:{name}"
+    return {pk: f"{prefix}:{pk}:{stamp}" for pk, stamp in stamps.items()}
+
+
+def get_fragments(keys):
+    """``{pk: fragment}`` of the cached ``keys`` (as built by ``fragment_keys``)."""
+    cached = _cache().get_many(keys.values())
+    return {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+
+def set_fragments(keys, fragments):
+    """Cache ``{pk: fragment}``; fragments of unstamped pks are dropped."""
+    _cache().set_many(
+        {keys[pk]: fragment for pk, fragment in fragments.items() if pk in keys},
+        fragment_settings()["TIMEOUT"],
+    )
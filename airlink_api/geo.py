@@ -0,0 +1,221 @@
+"""
+Airport coordinates: great-circle route distances and nearby airports.
+
+``Route.distance`` is derived from the coordinates of its airports whenever
+both are known: a route is filled in on save, and the routes of an airport
+are recomputed in one batch when it moves.
+
+Nearby lookups use a per-process ``AirportGeoIndex`` that buckets airports
+into cells of ``CELL_DEGREES`` latitude by longitude, so a search only
+measures the airports in the cells overlapping the search radius. It is
+rebuilt when the airport version published by ``airlink_api.autocomplete``
+changes, so steady-state lookups run no queries.
+"""
+
+import math
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from airlink_api import reference_cache
+from airlink_api.autocomplete import current_version
+from airlink_api.itineraries import record_change
+from airlink_api.models import Airport, Flight, Route
+
+DEFAULT_SETTINGS = {
+    "CELL_DEGREES": 1.0,
+    "RADIUS_KM": 200,
+    "MAX_RADIUS_KM": 2000,
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+}
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def geo_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "AIRPORT_GEO", {})}
+
+
+def haversine(latitude1, longitude1, latitude2, longitude2):
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(longitude2 - longitude1) / 2
+    a = (
+        math.sin(half_dphi) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def route_distance(source, destination):
+    """Rounded distance between two airports, ``None`` without coordinates."""
+    if None in (
+        source.latitude,
+        source.longitude,
+        destination.latitude,
+        destination.longitude,
+    ):
+        return None
+    return round(
+        haversine(
+            source.latitude,
+            source.longitude,
+            destination.latitude,
+            destination.longitude,
+        )
+    )
+
+
+def update_route_distances(airport_ids=None, batch_size=1000):
+    """
+    Recompute ``Route.distance`` of the routes between airports with
+    coordinates, limited to routes touching ``airport_ids`` when given.
+    Returns the number of routes whose distance changed.
+    """
+    routes = Route.objects.exclude(
+        Q(source__latitude=None)
+        | Q(source__longitude=None)
+        | Q(destination__latitude=None)
+        | Q(destination__longitude=None)
+    )
+    if airport_ids is not None:
+        routes = routes.filter(
+            Q(source_id__in=airport_ids) | Q(destination_id__in=airport_ids)
+        )
+
+    changed = []
+    for pk, distance, *points in routes.values_list(
+        "pk",
+        "distance",
+        "source__latitude",
+        "source__longitude",
+        "destination__latitude",
+        "destination__longitude",
+    ).iterator(chunk_size=batch_size):
+        computed = round(haversine(*points))
+        if computed != distance:
+            changed.append(Route(pk=pk, distance=computed))
+    if not changed:
+        return 0
+
+    with transaction.atomic():
+        Route.objects.bulk_update(changed, ["distance"], batch_size=batch_size)
+        # bulk_update sends no signals; the flight graph and the reference
+        # cache both hold route distances.
+        flight_ids = list(
+            Flight.objects.filter(route__in=changed).values_list("pk", flat=True)
+        )
+        transaction.on_commit(lambda: record_change(flight_ids))
+        reference_cache.record_change(Route)
+    return len(changed)
+
+
+class AirportGeoIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        # ``{(lat_cell, lon_cell): [airport payload, ...]}`` and the cell size
+        # it was built with, swapped together so searches need no lock.
+        self.snapshot = ({}, DEFAULT_SETTINGS["CELL_DEGREES"])
+
+    def sync(self):
+        version = current_version()
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.rebuild(version)
+
+    def rebuild(self, version):
+        size = geo_settings()["CELL_DEGREES"]
+        cells = defaultdict(list)
+        for pk, name, city, latitude, longitude in Airport.objects.exclude(
+            Q(latitude=None) | Q(longitude=None)
+        ).values_list("pk", "name", "closest_big_city", "latitude", "longitude"):
+            cells[self.cell(latitude, longitude, size)].append(
+                {
+                    "id": pk,
+                    "name": name,
+                    "closest_big_city": city,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                }
+            )
+        self.snapshot = (dict(cells), size)
+        self.version = version
+
+    @staticmethod
+    def column(longitude, size):
+        """Cell column of a longitude, wrapped into ``[-180, 180)``."""
+        lowest = math.floor(-180 / size)
+        return (math.floor(longitude / size) - lowest) % math.ceil(360 / size) + lowest
+
+    @classmethod
+    def cell(cls, latitude, longitude, size):
+        return math.floor(latitude / size), cls.column(longitude, size)
+
+    @classmethod
+    def cell_ranges(cls, latitude, longitude, radius, size):
+        """Cell rows and columns covering the circle's bounding box."""
+        lat_delta = radius / KM_PER_DEGREE
+        rows = range(
+            math.floor(max(-90.0, latitude - lat_delta) / size),
+            math.floor(min(90.0, latitude + lat_delta) / size) + 1,
+        )
+        widest = abs(latitude) + lat_delta
+        if widest < 90:
+            lon_delta = lat_delta / math.cos(math.radians(widest))
+            if 2 * lon_delta + size < 360:
+                columns = {
+                    cls.column(longitude + step * size, size)
+                    for step in range(
+                        math.floor(-lon_delta / size) - 1,
+                        math.ceil(lon_delta / size) + 2,
+                    )
+                }
+                return rows, sorted(columns)
+        # The circle reaches a pole or wraps around: every column is in range.
+        lowest = math.floor(-180 / size)
+        return rows, range(lowest, lowest + math.ceil(360 / size))
+
+    def nearby(self, latitude, longitude, radius, limit):
+        """Up to ``limit`` airports within ``radius`` km, nearest first."""
+        cells, size = self.snapshot
+        rows, columns = self.cell_ranges(latitude, longitude, radius, size)
+        found = []
+        for row in rows:
+            for column in columns:
+                for airport in cells.get((row, column), ()):
+                    distance = haversine(
+                        latitude, longitude, airport["latitude"], airport["longitude"]
+                    )
+                    if distance <= radius:
+                        found.append((distance, airport["id"], airport))
+        found.sort(key=lambda match: match[:2])
+        return [
+            {**airport, "distance": round(distance, 1)}
+            for distance, _, airport in found[:limit]
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_airport_geo_index():
+    return AirportGeoIndex()
+
+
+def find_nearby_airports(latitude, longitude, radius=None, limit=None):
+    config = geo_settings()
+    index = get_airport_geo_index()
+    index.sync()
+    return index.nearby(
+        latitude,
+        longitude,
+        config["RADIUS_KM"] if radius is None else radius,
+        limit or config["LIMIT"],
+    )
@@ -0,0 +1,144 @@
+"""
+Stores for ``Idempotency-Key`` responses.
+
+A store keeps the first response given for a key until its TTL runs out and
+hands out a short-lived lock so that concurrent duplicates wait for the
+first request instead of running again. The store is configured by
+``settings.IDEMPOTENCY["STORE"]``.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_SETTINGS = {
+    "STORE": "airlink_api.idempotency.CacheIdempotencyStore",
+    "OPTIONS": {},
+    "TTL": 24 * 60 * 60,
+    "LOCK_TIMEOUT": 30,
+    "WAIT": 5,
+}
+
+
+def idempotency_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "IDEMPOTENCY", {})}
+
+
+@lru_cache(maxsize=None)
+def get_idempotency_store():
+    config = idempotency_settings()
+    return import_string(config["STORE"])(**config["OPTIONS"])
+
+
+def request_fingerprint(data):
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CacheIdempotencyStore:
+    """
+    Store on top of a Django cache; expiry and eviction are left to the cache
+    backend, and ``cache.add`` provides the lock.
+    """
+
+    def __init__(self, alias="default", prefix="idempotency"):
+        self.alias = alias
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(f"{self.prefix}:response:{key}")
+
+    def save(self, key, record):
+        self.cache.set(
+            f"{self.prefix}:response:{key}", record, idempotency_settings()["TTL"]
+        )
+
+    def lock(self, key):
+        return self.cache.add(
+            f"{self.prefix}:lock:{key}", 1, idempotency_settings()["LOCK_TIMEOUT"]
+        )
+
+    def unlock(self, key):
+        self.cache.delete(f"{self.prefix}:lock:{key}")
+
+
+class DatabaseIdempotencyStore:
+    """
+    Store backed by ``IdempotencyRecord`` rows. The row itself is the lock
+    while its response is empty; expired rows are evicted a batch at a time
+    whenever a response is saved.
+    """
+
+    evict_batch_size = 100
+
+    @property
+    def model(self):
+        from airlink_api.models import IdempotencyRecord
+
+        return IdempotencyRecord
+
+    def get(self, key):
+        record = (
+            self.model.objects.filter(
+                key=key, expires_at__gt=timezone.now(), status_code__isnull=False
+            )
+            .values("fingerprint", "status_code", "response")
+            .first()
+        )
+        if record is None:
+            return None
+        return {
+            "fingerprint": record["fingerprint"],
+            "status": record["status_code"],
+            "data": record["response"],
+        }
+
+    def save(self, key, record):
+        now = timezone.now()
+        self.model.objects.update_or_create(
+            key=key,
+            defaults={
+                "fingerprint": record["fingerprint"],
+                "status_code": record["status"],
+                "response": record["data"],
+                "expires_at": now + timedelta(seconds=idempotency_settings()["TTL"]),
+            },
+        )
+        self.evict(now)
+
+    def lock(self, key):
+        now = timezone.now()
+        lock_expires_at = now + timedelta(
+            seconds=idempotency_settings()["LOCK_TIMEOUT"]
+        )
+        try:
+            with transaction.atomic():
+                self.model.objects.create(key=key, expires_at=lock_expires_at)
+            return True
+        except IntegrityError:
+            # Take over locks left behind by crashed requests and expired rows.
+            return bool(
+                self.model.objects.filter(key=key, expires_at__lte=now).update(
+                    status_code=None, response=None, expires_at=lock_expires_at
+                )
+            )
+
+    def unlock(self, key):
+        self.model.objects.filter(key=key, status_code__isnull=True).delete()
+
+    def evict(self, now=None):
+        expired = self.model.objects.filter(
+            expires_at__lte=now or timezone.now()
+        ).values_list("pk", flat=True)[: self.evict_batch_size]
+        return self.model.objects.filter(pk__in=list(expired)).delete()[0]
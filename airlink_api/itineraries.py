@@ -0,0 +1,273 @@
+"""
+Multi-leg itinerary search.
+
+Every process keeps a ``FlightGraph``: for each airport, the flights leaving
+it sorted by departure, with their arrival airport and route distance.
+Searches run a best-first, time-dependent search over that graph, so
+connections are found with a binary search per airport instead of queries.
+
+Changes reach the graph through a change log in the Django cache: saving or
+deleting a flight or route appends the affected flight ids under a new
+version number, and each process replays the versions it has not seen by
+reloading just those flights. When the log has gaps (expired entries or a
+process that fell too far behind) the graph is rebuilt from scratch.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict, namedtuple
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import caches
+
+from airlink_api.models import Flight
+
+DEFAULT_SETTINGS = {
+    "CACHE_ALIAS": "default",
+    "CACHE_PREFIX": "itineraries",
+    "CHANGE_TIMEOUT": 60 * 60,
+    "MAX_REPLAY": 500,
+    "MIN_CONNECTION_MINUTES": 45,
+    "MAX_CONNECTION_MINUTES": 12 * 60,
+    "MAX_LEGS": 3,
+}
+
+# ``departure`` and ``arrival`` are POSIX timestamps.
+Leg = namedtuple("Leg", "departure arrival flight source destination distance")
+
+RANKINGS = ("arrival", "distance")
+
+
+def itinerary_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "ITINERARIES", {})}
+
+
+def _cache():
+    return caches[itinerary_settings()["CACHE_ALIAS"]]
+
+
+def _version_key():
+    return f"{itinerary_settings()['CACHE_PREFIX']}:version"
+
+
+def _change_key(version):
+    return f"{itinerary_settings()['CACHE_PREFIX']}:change:{version}"
+
+
+def current_version():
+    cache = _cache()
+    cache.add(_version_key(), 0, None)
+    return cache.get(_version_key())
+
+
+def record_change(flight_ids):
+    """Publish that the given flights were created, changed or deleted."""
+    flight_ids = list(flight_ids)
+    if not flight_ids:
+        return
+    cache = _cache()
+    cache.add(_version_key(), 0, None)
+    version = cache.incr(_version_key())
+    cache.set(_change_key(version), flight_ids, itinerary_settings()["CHANGE_TIMEOUT"])
+
+
+class FlightGraph:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.departures = {}
+        self.legs = {}
+        self.version = None
+
+    def sync(self):
+        """Catch up with the change log, rebuilding when it has gaps."""
+        with self.lock:
+            version = current_version()
+            if self.version is None or version < self.version:
+                return self.rebuild(version)
+            missing = version - self.version
+            if not missing:
+                return
+            if missing > itinerary_settings()["MAX_REPLAY"]:
+                return self.rebuild(version)
+
+            changes = _cache().get_many(
+                [_change_key(v) for v in range(self.version + 1, version + 1)]
+            )
+            if len(changes) != missing:
+                return self.rebuild(version)
+            self.reload({pk for flight_ids in changes.values() for pk in flight_ids})
+            self.version = version
+
+    def rebuild(self, version):
+        self.departures = defaultdict(list)
+        self.legs = {}
+        for leg in self.load_legs(Flight.objects.all()):
+            self.legs[leg.flight] = leg
+            self.departures[leg.source].append(leg)
+        for departures in self.departures.values():
+            departures.sort()
+        self.departures = dict(self.departures)
+        self.version = version
+
+    def reload(self, flight_ids):
+        for pk in flight_ids:
+            self.remove(pk)
+        for leg in self.load_legs(Flight.objects.filter(pk__in=flight_ids)):
+            self.add(leg)
+
+    @staticmethod
+    def load_legs(flights):
+        for row in (
+            flights.exclude(route=None)
+            .values_list(
+                "departure_time",
+                "arrival_time",
+                "pk",
+                "route__source_id",
+                "route__destination_id",
+                "route__distance",
+            )
+            .iterator(chunk_size=5000)
+        ):
+            yield Leg(row[0].timestamp(), row[1].timestamp(), *row[2:])
+
+    def add(self, leg):
+        self.legs[leg.flight] = leg
+        insort(self.departures.setdefault(leg.source, []), leg)
+
+    def remove(self, flight_id):
+        leg = self.legs.pop(flight_id, None)
+        if leg is None:
+            return
+        departures = self.departures[leg.source]
+        del departures[bisect_left(departures, leg)]
+
+    def leaving(self, airport, earliest, latest):
+        """Legs leaving ``airport`` with ``earliest <= departure < latest``."""
+        departures = self.departures.get(airport, ())
+        index = bisect_left(departures, (earliest,))
+        while index < len(departures) and departures[index].departure < latest:
+            yield departures[index]
+            index += 1
+
+    def search(
+        self,
+        origin,
+        destination,
+        earliest,
+        latest,
+        max_legs=None,
+        min_connection=None,
+        max_connection=None,
+        rank="arrival",
+        limit=5,
+    ):
+        """
+        Return up to ``limit`` itineraries, as lists of ``Leg``, from
+        ``origin`` to ``destination`` whose first leg departs in
+        ``[earliest, latest)``, best first by arrival time or total distance.
+
+        Arrival time and distance only grow along an itinerary, so popping
+        partial itineraries in rank order yields complete ones in rank order.
+        A partial itinerary is dropped when ``limit`` others have already
+        reached the same airport no later, no longer and in no more legs.
+        """
+        config = itinerary_settings()
+        max_legs = max_legs or config["MAX_LEGS"]
+        if min_connection is None:
+            min_connection = config["MIN_CONNECTION_MINUTES"] * 60
+        if max_connection is None:
+            max_connection = config["MAX_CONNECTION_MINUTES"] * 60
+
+        def key(arrival, distance):
+            return (arrival, distance) if rank == "arrival" else (distance, arrival)
+
+        with self.lock:
+            tie = count()
+            heap = [
+                (key(leg.arrival, leg.distance), next(tie), (leg,), leg.distance)
+                for leg in self.leaving(origin, earliest, latest)
+                if leg.destination != origin
+            ]
+            heapq.heapify(heap)
+            settled = defaultdict(list)
+            results = []
+            while heap and len(results) < limit:
+                _, _, path, distance = heapq.heappop(heap)
+                last = path[-1]
+                if last.destination == destination:
+                    results.append(list(path))
+                    continue
+
+                label = (last.arrival, distance, len(path))
+                labels = settled[last.destination]
+                dominated = sum(
+                    all(mine <= theirs for mine, theirs in zip(other, label))
+                    for other in labels
+                )
+                if dominated >= limit:
+                    continue
+                labels.append(label)
+                if len(path) == max_legs:
+                    continue
+
+                visited = {leg.source for leg in path}
+                for leg in self.leaving(
+                    last.destination,
+                    last.arrival + min_connection,
+                    last.arrival + max_connection,
+                ):
+                    if leg.destination in visited:
+                        continue
+                    heapq.heappush(
+                        heap,
+                        (
+                            key(leg.arrival, distance + leg.distance),
+                            next(tie),
+                            path + (leg,),
+                            distance + leg.distance,
+                        ),
+                    )
+            return results
+
+
+@lru_cache(maxsize=None)
+def get_flight_graph():
+    return FlightGraph()
+
+
+def find_itineraries(origin, destination, earliest, latest, **options):
+    graph = get_flight_graph()
+    graph.sync()
+    return graph.search(
+        origin, destination, earliest.timestamp(), latest.timestamp(), **options
+    )
+
+
+def describe_itinerary(legs, airports):
+    """Payload of an itinerary; ``airports`` maps ids to airport names."""
+
+    def as_datetime(timestamp):
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+    return {
+        "departure_time": as_datetime(legs[0].departure),
+        "arrival_time": as_datetime(legs[-1].arrival),
+        "duration_minutes": int((legs[-1].arrival - legs[0].departure) // 60),
+        "distance": sum(leg.distance for leg in legs),
+        "legs": [
+            {
+                "flight": leg.flight,
+                "source": airports.get(leg.source, ""),
+                "destination": airports.get(leg.destination, ""),
+                "departure_time": as_datetime(leg.departure),
+                "arrival_time": as_datetime(leg.arrival),
+                "distance": leg.distance,
+            }
+            for leg in legs
+        ],
+    }
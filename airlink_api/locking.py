@@ -0,0 +1,98 @@
+"""
+Concurrency strategies for claiming seats during order creation.
+
+Every strategy runs ``choose(inventory)`` to decide which seats to take and
+then writes the updated seat map:
+
+* ``pessimistic`` locks the ``Flight`` row with ``SELECT ... FOR UPDATE``;
+* ``advisory`` takes a transaction-level PostgreSQL advisory lock per flight
+  and falls back to ``pessimistic`` on other databases;
+* ``optimistic`` takes no lock and writes with a version check, re-reading
+  the inventory and choosing again from the remaining seats on conflict.
+
+The default comes from ``settings.SEAT_LOCKING["STRATEGY"]``.
+"""
+
+from django.conf import settings
+from django.db import connection
+
+from airlink_api.models import Flight
+from airlink_api.seat_inventory import get_inventory, mark_seats, save_reservation
+
+DEFAULT_SETTINGS = {
+    "STRATEGY": "pessimistic",
+    "OPTIMISTIC_RETRIES": 5,
+}
+
+ADVISORY_LOCK_NAMESPACE = 7291
+
+
+class SeatContention(Exception):
+    pass
+
+
+def locking_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "SEAT_LOCKING", {})}
+
+
+class PessimisticLocking:
+    name = "pessimistic"
+
+    def lock(self, flight):
+        list(Flight.objects.select_for_update().filter(pk=flight.pk).values("pk"))
+
+    def claim(self, flight, choose):
+        """Take the seats returned by ``choose(inventory)`` and return them."""
+        self.lock(flight)
+        inventory = get_inventory(flight, lock=True)
+        seats = choose(inventory)
+        save_reservation(inventory, seats, mark_seats(inventory, seats))
+        return seats
+
+
+class AdvisoryLocking(PessimisticLocking):
+    name = "advisory"
+
+    def lock(self, flight):
+        if connection.vendor != "postgresql":
+            return super().lock(flight)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [ADVISORY_LOCK_NAMESPACE, flight.pk],
+            )
+
+
+class OptimisticLocking:
+    name = "optimistic"
+
+    def __init__(self, retries=None):
+        self.retries = retries or locking_settings()["OPTIMISTIC_RETRIES"]
+
+    def claim(self, flight, choose):
+        for _ in range(self.retries):
+            inventory = get_inventory(flight)
+            seats = choose(inventory)
+            seat_map = mark_seats(inventory, seats)
+            if save_reservation(inventory, seats, seat_map, inventory.version):
+                return seats
+        raise SeatContention(
+            f"Flight {flight.pk} changed {self.retries} times while booking."
+        )
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (PessimisticLocking, AdvisoryLocking, OptimisticLocking)
+}
+
+
+def get_locking_strategy(name=None):
+    name = name or locking_settings()["STRATEGY"]
+    try:
+        return STRATEGIES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown seat locking strategy {name!r}, "
+            f"choose one of {', '.join(STRATEGIES)}."
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from airlink_api.models import AIRPLANE_OVERLAP_CONSTRAINT, Flight
+
+
+class Command(BaseCommand):
+    help = (
+        "Adds a PostgreSQL exclusion constraint that rejects overlapping "
+        "flights of the same airplane, or removes it with --drop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--drop", action="store_true", help="Remove the constraint."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Exclusion constraints require PostgreSQL.")
+
+        table = connection.ops.quote_name(Flight._meta.db_table)
+        constraint = connection.ops.quote_name(AIRPLANE_OVERLAP_CONSTRAINT)
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options["drop"]:
+                cursor.execute(
+                    f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"
+                )
+                self.stdout.write(self.style.SUCCESS("Constraint dropped"))
+                return
+
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+            cursor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {constraint} EXCLUDE USING gist "
+                f"(airplane_id WITH =, "
+                f"tstzrange(departure_time, arrival_time, '[)') WITH &&)"
+            )
+        self.stdout.write(self.style.SUCCESS("Constraint added"))
@@ -0,0 +1,77 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airlink_api.roster import RosterFlight, solve_roster
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the crew roster solver on a synthetic season and reports the "
+        "solve time and coverage for each worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=10000)
+        parser.add_argument("--crew", type=int, default=2000)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--min-crew", type=int, default=4)
+        parser.add_argument("--min-rest-minutes", type=int, default=60)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 4],
+            help="Process pool sizes to compare.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        flights = self.make_flights(options)
+        crew_ids = list(range(1, options["crew"] + 1))
+
+        self.stdout.write(
+            f"{options['flights']} flights over {options['days']} days, "
+            f"{options['crew']} crew, {options['min_crew']} crew per flight"
+        )
+        self.stdout.write(
+            f"{'workers':>7} {'blocks':>6} {'staffed':>8} {'unstaffed':>9} {'ms':>8}"
+        )
+        for workers in options["workers"]:
+            started = time.perf_counter()
+            assignments, unassigned, blocks = solve_roster(
+                flights,
+                crew_ids,
+                min_crew=options["min_crew"],
+                min_rest=options["min_rest_minutes"] * 60,
+                workers=workers,
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                f"{workers:>7} {blocks:>6} {len(assignments):>8} "
+                f"{len(unassigned):>9} {elapsed:>8.1f}"
+            )
+
+    @staticmethod
+    def make_flights(options):
+        """Flights depart between 06:00 and 20:00 and last one to four hours."""
+        rng = random.Random(options["seed"])
+        season_start = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        flights = []
+        for flight_id in range(1, options["flights"] + 1):
+            departure = season_start + timedelta(
+                days=rng.randrange(options["days"]),
+                minutes=rng.randrange(6 * 60, 20 * 60, 5),
+            )
+            arrival = departure + timedelta(minutes=rng.randrange(60, 4 * 60, 5))
+            flights.append(
+                RosterFlight(
+                    flight_id, departure.timestamp(), arrival.timestamp(), frozenset()
+                )
+            )
+        return flights
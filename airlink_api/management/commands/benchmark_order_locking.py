@@ -0,0 +1,171 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, DatabaseError, IntegrityError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airlink_api.locking import STRATEGIES
+from airlink_api.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+    Flight,
+    Order,
+    Ticket,
+)
+from airlink_api.serializers import OrderSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent orders at one flight with each seat locking strategy "
+        "and reports throughput, latency and conflict rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seats-per-order", type=int, default=2)
+        parser.add_argument("--rows", type=int, default=40)
+        parser.add_argument("--seats-in-row", type=int, default=6)
+        parser.add_argument(
+            "--mode",
+            choices=["explicit", "assign"],
+            default="explicit",
+            help="Pick random seats client-side, or let the server assign them.",
+        )
+        parser.add_argument(
+            "--strategies", nargs="+", choices=list(STRATEGIES), default=None
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite":
+            self.stdout.write(
+                self.style.WARNING(
+                    "SQLite serializes writers; run against PostgreSQL "
+                    "for meaningful numbers."
+                )
+            )
+        user, _ = get_user_model().objects.get_or_create(
+            email="locking-benchmark@airlink.local"
+        )
+        self.stdout.write(
+            f"{'strategy':<12} {'ok':>5} {'conflict':>8} {'error':>5} "
+            f"{'conflict%':>9} {'orders/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for strategy in options["strategies"] or list(STRATEGIES):
+            objects = self.create_flight(options)
+            try:
+                self.report(strategy, self.run(strategy, objects[-1], user, options))
+            finally:
+                self.cleanup(user, objects)
+
+    def create_flight(self, options):
+        suffix = uuid.uuid4().hex[:8]
+        airplane_type = AirplaneType.objects.create(name=f"benchmark-{suffix}")
+        airplane = Airplane.objects.create(
+            name=f"benchmark-{suffix}",
+            rows=options["rows"],
+            seats_in_row=options["seats_in_row"],
+            airplane_type=airplane_type,
+        )
+        source = Airport.objects.create(
+            name=f"benchmark-source-{suffix}", closest_big_city="Benchmark"
+        )
+        destination = Airport.objects.create(
+            name=f"benchmark-destination-{suffix}", closest_big_city="Benchmark"
+        )
+        route = Route.objects.create(source=source, destination=destination, distance=1)
+        departure_time = timezone.now() + timedelta(days=1)
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+        return airplane_type, source, destination, flight
+
+    def cleanup(self, user, objects):
+        airplane_type, source, destination, flight = objects
+        Order.objects.filter(user=user).delete()
+        Ticket.objects.filter(flight=flight).delete()
+        flight.delete()
+        source.delete()
+        destination.delete()
+        airplane_type.delete()
+
+    def run(self, strategy, flight, user, options):
+        rng = random.Random(options["seed"])
+        payloads = []
+        for _ in range(options["orders"]):
+            if options["mode"] == "assign":
+                payloads.append(
+                    {"flight": flight.pk, "count": options["seats_per_order"]}
+                )
+                continue
+            seats = set()
+            while len(seats) < options["seats_per_order"]:
+                seats.add(
+                    (
+                        rng.randint(1, options["rows"]),
+                        rng.randint(1, options["seats_in_row"]),
+                    )
+                )
+            payloads.append(
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": flight.pk}
+                        for row, seat in seats
+                    ]
+                }
+            )
+
+        def place_order(payload):
+            started = time.perf_counter()
+            try:
+                serializer = OrderSerializer(
+                    data=payload, context={"locking_strategy": strategy}
+                )
+                if serializer.is_valid():
+                    serializer.save(user=user)
+                    outcome = "ok"
+                else:
+                    outcome = "conflict"
+            except (ValidationError, IntegrityError):
+                outcome = "conflict"
+            except DatabaseError:
+                outcome = "error"
+            finally:
+                connection.close()
+            return outcome, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            results = list(pool.map(place_order, payloads))
+        return results, time.perf_counter() - started
+
+    def report(self, strategy, run):
+        results, elapsed = run
+        latencies = sorted(latency for _, latency in results)
+        outcomes = [outcome for outcome, _ in results]
+        ok = outcomes.count("ok")
+        conflicts = outcomes.count("conflict")
+        errors = outcomes.count("error")
+
+        def percentile(share):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * share))]
+
+        self.stdout.write(
+            f"{strategy:<12} {ok:>5} {conflicts:>8} {errors:>5} "
+            f"{100 * conflicts / len(results):>8.1f}% "
+            f"{ok / elapsed:>9.1f} "
+            f"{1000 * percentile(0.5):>8.1f} {1000 * percentile(0.99):>8.1f}"
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airlink_api.crew_schedule import rebuild_intervals
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the crew duty timeline index from flight crew assignments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of intervals inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_intervals(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Crew schedule rebuilt with {count} intervals")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airlink_api.flight_search import rebuild_entries
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the flight search read model from flights."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of flights loaded and written per query.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_entries(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Flight search rebuilt with {count} entries")
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airlink_api.models import Flight
+from airlink_api.seat_inventory import check_inventory, rebuild_inventory
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-flight seat inventory from tickets, or checks it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "flight_ids", nargs="*", type=int, help="Limit to these flights."
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report inconsistencies, do not rebuild.",
+        )
+
+    def handle(self, *args, **options):
+        flights = Flight.objects.select_related("airplane").exclude(airplane=None)
+        if options["flight_ids"]:
+            flights = flights.filter(pk__in=options["flight_ids"])
+
+        inconsistent = 0
+        for flight in flights.iterator():
+            if options["check"]:
+                problems = check_inventory(flight)
+                if problems:
+                    inconsistent += 1
+                    for problem in problems:
+                        self.stdout.write(f"Flight {flight.pk}: {problem}")
+                continue
+
+            with transaction.atomic():
+                rebuild_inventory(flight)
+
+        if not options["check"]:
+            self.stdout.write(self.style.SUCCESS("Seat inventory rebuilt"))
+        elif inconsistent:
+            self.stdout.write(
+                self.style.ERROR(f"{inconsistent} flights have inconsistent inventory")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Seat inventory is consistent"))
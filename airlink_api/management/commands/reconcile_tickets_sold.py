@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airlink_api.models import Flight, Ticket
+from airlink_api.seat_inventory import resync_inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes Flight.tickets_sold, the seat inventory and the flight "
+        "search entry counters from tickets in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report flights with a wrong counter.",
+        )
+
+    def handle(self, *args, **options):
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        actual_sold = Coalesce(Subquery(sold), 0)
+
+        last_pk = 0
+        fixed = 0
+        while True:
+            batch = list(
+                Flight.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .annotate(
+                    actual_sold=actual_sold,
+                    inventory_sold=F("seat_inventory__sold"),
+                    entry_sold=F("search_entry__tickets_sold"),
+                )
+                .values_list(
+                    "pk", "tickets_sold", "inventory_sold", "entry_sold", "actual_sold"
+                )[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            for pk, tickets_sold, inventory_sold, entry_sold, actual in batch:
+                # Flights without an inventory or entry have none to fix.
+                counters = {
+                    "tickets_sold": tickets_sold,
+                    "inventory sold": inventory_sold,
+                    "search entry tickets_sold": entry_sold,
+                }
+                wrong = {
+                    name: value
+                    for name, value in counters.items()
+                    if value is not None and value != actual
+                }
+                if not wrong:
+                    continue
+                for name, value in wrong.items():
+                    self.stdout.write(f"Flight {pk}: {name} {value} -> {actual}")
+                if not options["dry_run"]:
+                    # Recounted under the inventory lock, so concurrent sales
+                    # are not lost.
+                    resync_inventory(pk)
+                fixed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{fixed} flights had a wrong sold counter")
+        )
@@ -0,0 +1,53 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airlink_api.serializers import FlightScheduleSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates flights in bulk from a JSON list in the format of "
+        "POST /api/v1/flights/schedule/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="JSON file with the flights, or '-' for stdin."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the schedule, do not create flights.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["path"] == "-":
+                data = json.load(sys.stdin)
+            else:
+                with open(options["path"]) as file:
+                    data = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read schedule: {error}")
+        if not isinstance(data, list):
+            raise CommandError("Expected a JSON list of flights.")
+
+        serializer = FlightScheduleSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            for line in self.format_errors(serializer.errors):
+                self.stdout.write(line)
+            raise CommandError("Schedule is invalid, no flights were created.")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(data)} flights are valid"))
+            return
+        flights = serializer.save()
+        self.stdout.write(self.style.SUCCESS(f"{len(flights)} flights created"))
+
+    @staticmethod
+    def format_errors(errors):
+        for index, error in enumerate(errors):
+            if error:
+                yield f"Flight #{index}: {json.dumps(error)}"
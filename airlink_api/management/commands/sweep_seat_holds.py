@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airlink_api.seat_holds import get_seat_hold_store
+
+
+class Command(BaseCommand):
+    """
+    Only useful with a store shared between processes (``RedisSeatHoldStore``):
+    this command runs in its own process, so it would sweep an empty copy of a
+    process-local store. ``LocMemSeatHoldStore`` sweeps itself on every hold.
+    """
+
+    help = "Removes expired seat holds from a shared hold store (Redis)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep sweeping every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        store = get_seat_hold_store()
+        if not store.shared:
+            raise CommandError(
+                f"{type(store).__name__} is local to each process; only a shared "
+                "store such as RedisSeatHoldStore can be swept from here."
+            )
+        while True:
+            removed = store.sweep()
+            self.stdout.write(f"Removed {removed} expired seat hold entries")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from airlink_api.geo import update_route_distances
+
+
+class Command(BaseCommand):
+    help = "Recomputes Route.distance of routes between airports with coordinates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of routes loaded and updated per query.",
+        )
+
+    def handle(self, *args, **options):
+        changed = update_route_distances(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{changed} route distances updated"))
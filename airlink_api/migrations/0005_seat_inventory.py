@@ -0,0 +1,60 @@
+# Generated by Django 5.0.8 on 2026-10-17 20:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from airlink_api.seat_inventory import build_seat_map, count_taken
+
+
+def build_inventories(apps, schema_editor):
+    Flight = apps.get_model("airlink_api", "Flight")
+    SeatInventory = apps.get_model("airlink_api", "SeatInventory")
+    Ticket = apps.get_model("airlink_api", "Ticket")
+
+    flights = Flight.objects.select_related("airplane").exclude(airplane=None)
+    for flight in flights.filter(tickets__isnull=False).distinct().iterator():
+        seat_map = build_seat_map(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight).values_list("row", "seat"),
+        )
+        SeatInventory.objects.create(
+            flight=flight,
+            rows=flight.airplane.rows,
+            seats_in_row=flight.airplane.seats_in_row,
+            seat_map=bytes(seat_map),
+            sold=count_taken(seat_map),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "airlink_api",
+            "0004_alter_airplane_rows_alter_airplane_seats_in_row_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatInventory",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="seat_inventory",
+                        serialize=False,
+                        to="airlink_api.flight",
+                    ),
+                ),
+                ("rows", models.PositiveIntegerField()),
+                ("seats_in_row", models.PositiveIntegerField()),
+                ("seat_map", models.BinaryField(default=bytes)),
+                ("sold", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_inventories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0006_flight_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seatinventory",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
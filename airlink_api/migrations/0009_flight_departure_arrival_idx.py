@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0008_idempotencyrecord"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time", "arrival_time"],
+                name="flight_departure_arrival_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_crew_duty_intervals(apps, schema_editor):
+    Flight = apps.get_model("airlink_api", "Flight")
+    CrewDutyInterval = apps.get_model("airlink_api", "CrewDutyInterval")
+
+    CrewDutyInterval.objects.bulk_create(
+        (
+            CrewDutyInterval(
+                crew_id=crew_id,
+                flight_id=flight_id,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+            for crew_id, flight_id, departure_time, arrival_time in (
+                Flight.crew.through.objects.values_list(
+                    "crew_id",
+                    "flight_id",
+                    "flight__departure_time",
+                    "flight__arrival_time",
+                ).iterator()
+            )
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0009_flight_departure_arrival_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrewDutyInterval",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                (
+                    "crew",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duty_intervals",
+                        to="airlink_api.crew",
+                    ),
+                ),
+                (
+                    "flight",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duty_intervals",
+                        to="airlink_api.flight",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["crew", "departure_time", "arrival_time"],
+                        name="crew_duty_timeline_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="crewdutyinterval",
+            constraint=models.UniqueConstraint(
+                fields=("crew", "flight"), name="unique_crew_duty"
+            ),
+        ),
+        migrations.RunPython(build_crew_duty_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0010_crew_duty_interval"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "departure_time", "arrival_time"],
+                name="flight_airplane_timeline_idx",
+            ),
+        ),
+    ]
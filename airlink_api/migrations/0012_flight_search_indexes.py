@@ -0,0 +1,27 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0011_flight_airplane_timeline_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(
+                django.db.models.functions.text.Upper("closest_big_city"),
+                name="airport_city_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.0.8 on 2026-10-17 21:24
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def build_flight_search_entries(apps, schema_editor):
+    Flight = apps.get_model("airlink_api", "Flight")
+    FlightSearchEntry = apps.get_model("airlink_api", "FlightSearchEntry")
+
+    def entries():
+        for flight in (
+            Flight.objects.select_related(
+                "route__source", "route__destination", "airplane__airplane_type"
+            )
+            .prefetch_related("crew")
+            .iterator(chunk_size=1000)
+        ):
+            route, airplane = flight.route, flight.airplane
+            yield FlightSearchEntry(
+                flight_id=flight.pk,
+                route_id=flight.route_id,
+                flight_route=(
+                    f"{route.source.name} - {route.destination.name}" if route else None
+                ),
+                source_city=route.source.closest_big_city if route else "",
+                destination_city=route.destination.closest_big_city if route else "",
+                airplane_type=airplane.airplane_type.name if airplane else None,
+                capacity=airplane.rows * airplane.seats_in_row if airplane else None,
+                tickets_sold=flight.tickets_sold,
+                crew=[
+                    f"{member.first_name} {member.last_name}"
+                    for member in sorted(flight.crew.all(), key=lambda c: c.pk)
+                ],
+                departure_time=flight.departure_time,
+                arrival_time=flight.arrival_time,
+            )
+
+    FlightSearchEntry.objects.bulk_create(entries(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0013_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightSearchEntry",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="airlink_api.flight",
+                    ),
+                ),
+                ("flight_route", models.CharField(max_length=511, null=True)),
+                ("source_city", models.CharField(blank=True, max_length=255)),
+                ("destination_city", models.CharField(blank=True, max_length=255)),
+                ("airplane_type", models.CharField(max_length=255, null=True)),
+                ("capacity", models.PositiveIntegerField(null=True)),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                ("crew", models.JSONField(default=list)),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                (
+                    "route",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="airlink_api.route",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["departure_time", "flight"],
+                        name="flight_search_departure_idx",
+                    ),
+                    models.Index(
+                        django.db.models.functions.text.Upper("source_city"),
+                        models.F("departure_time"),
+                        name="flight_search_source_idx",
+                    ),
+                    models.Index(
+                        django.db.models.functions.text.Upper("destination_city"),
+                        models.F("departure_time"),
+                        name="flight_search_destination_idx",
+                    ),
+                    models.Index(
+                        fields=["route", "departure_time"],
+                        name="flight_search_route_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(build_flight_search_entries, migrations.RunPython.noop),
+    ]
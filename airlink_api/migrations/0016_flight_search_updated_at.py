@@ -0,0 +1,26 @@
+# Generated by Django 5.0.8 on 2026-10-17 22:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0015_airport_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flightsearchentry",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="flightsearchentry",
+            index=models.Index(fields=["updated_at"], name="flight_search_updated_idx"),
+        ),
+    ]
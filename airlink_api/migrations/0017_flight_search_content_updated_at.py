@@ -0,0 +1,22 @@
+# Generated by Django 5.0.8 on 2026-10-17 22:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airlink_api", "0016_flight_search_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flightsearchentry",
+            name="content_updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
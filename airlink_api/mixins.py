@@ -1,3 +1,30 @@
+import hashlib
+import json
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from airlink_api.idempotency import (
+    get_idempotency_store,
+    idempotency_settings,
+    request_fingerprint,
+)
+from airlink_api.reference_cache import (
+    attach_related,
+    cache_enabled,
+    get_response,
+    get_versions,
+    response_key,
+    set_response,
+)
+
+
 class GenericMethodsMixin:
     def get_serializer_class(self):
         assert self.serializer_class is not None, (
@@ -7,3 +34,211 @@ class GenericMethodsMixin:
         if hasattr(self, "action_serializers"):
             return self.action_serializers.get(self.action, self.serializer_class)
         return self.serializer_class
+
+
+class KeysetPaginationMixin:
+    """
+    Paginate with ``keyset_pagination_class`` when the request asks for
+    ``?pagination=cursor`` or carries a ``cursor``; page numbers stay the
+    default so existing clients are unaffected.
+    """
+
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            pagination_class = self.pagination_class
+            request = getattr(self, "request", None)
+            if (
+                self.keyset_pagination_class is not None
+                and request is not None
+                and (
+                    request.query_params.get("pagination") == "cursor"
+                    or "cursor" in request.query_params
+                )
+            ):
+                pagination_class = self.keyset_pagination_class
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``list`` and ``retrieve`` conditionally. ``get_version_stamp``
+    returns a cheap stamp of the data behind the response, computed before
+    any queryset is evaluated, and optionally its last modification time.
+    The ``ETag`` hashes the stamp with the request URI and the negotiated
+    format; a matching ``If-None-Match`` (or ``If-Modified-Since``) gets a
+    304 without running the view.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_version_stamp(self):
+        """Return ``(stamp, last_modified)``, or ``None`` to skip the check."""
+        return None
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        version = self.get_version_stamp()
+        if version is None:
+            return view(request, *args, **kwargs)
+        stamp, last_modified = version
+        digest = hashlib.sha256(
+            json.dumps(
+                [
+                    stamp,
+                    request.build_absolute_uri(),
+                    request.accepted_renderer.format,
+                ],
+                default=str,
+            ).encode()
+        ).hexdigest()[:32]
+        etag = quote_etag(digest)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class ReferenceVersionMixin(ConditionalGetMixin):
+    """Conditional GETs stamped with the reference cache versions."""
+
+    def get_version_stamp(self):
+        if not cache_enabled():
+            return None
+        return get_versions(self.reference_models), None
+
+
+class ReferenceCacheMixin:
+    """
+    Serve ``list`` and ``retrieve`` from the reference data cache, keyed by
+    the versions of ``reference_models`` and the full request URI. On a miss
+    the foreign keys named in ``cached_relations`` are resolved from the
+    cache instead of being joined.
+    """
+
+    reference_models = ()
+    cached_relations = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs):
+        key = response_key(
+            self.reference_models,
+            f"{self.basename}-{self.action}",
+            request.build_absolute_uri(),
+        )
+        if key is None:
+            return view(request, *args, **kwargs)
+        data = get_response(key)
+        if data is not None:
+            return Response(data)
+        response = view(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_response(key, response.data)
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        if args:
+            attach_related(args[0], self.cached_relations)
+        return super().get_serializer(*args, **kwargs)
+
+
+class IdempotentCreateMixin:
+    """
+    Honour an ``Idempotency-Key`` header on ``create``: the first response
+    for a key is stored and replayed for retries without running the
+    serializer again, while concurrent duplicates wait for the first one.
+    """
+
+    idempotency_header = "Idempotency-Key"
+    idempotency_poll_interval = 0.05
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 200:
+            return Response(
+                {"detail": f"{self.idempotency_header} is too long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        store = get_idempotency_store()
+        scoped_key = f"{self.basename}:{request.user.pk}:{key}"
+        fingerprint = request_fingerprint(request.data)
+
+        record = store.get(scoped_key)
+        if record is None:
+            if store.lock(scoped_key):
+                # The first request may have finished between get and lock.
+                record = store.get(scoped_key)
+                if record is not None:
+                    store.unlock(scoped_key)
+            else:
+                record = self.wait_for_response(store, scoped_key)
+                if record is None:
+                    return Response(
+                        {"detail": "A request with this key is still in progress."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+        if record is not None:
+            return self.replay(record, fingerprint)
+
+        try:
+            try:
+                response = super().create(request, *args, **kwargs)
+            except APIException as exc:
+                response = self.handle_exception(exc)
+            if response.status_code < 500:
+                store.save(
+                    scoped_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": json.loads(JSONRenderer().render(response.data)),
+                    },
+                )
+            return response
+        finally:
+            store.unlock(scoped_key)
+
+    def wait_for_response(self, store, key):
+        deadline = time.monotonic() + idempotency_settings()["WAIT"]
+        while time.monotonic() < deadline:
+            time.sleep(self.idempotency_poll_interval)
+            record = store.get(key)
+            if record is not None:
+                return record
+        return None
+
+    def replay(self, record, fingerprint):
+        if record["fingerprint"] != fingerprint:
+            return Response(
+                {
+                    "detail": f"{self.idempotency_header} was already used "
+                    f"with a different payload."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            record["data"],
+            status=record["status"],
+            headers={"Idempotent-Replayed": "true"},
+        )
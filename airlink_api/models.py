@@ -2,11 +2,18 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.validators import MinValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import UniqueConstraint, Q
+from django.db.models import UniqueConstraint
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+MAX_FLIGHT_DURATION = timedelta(hours=24)
+
+# Optional PostgreSQL exclusion constraint, see the airplane_overlap_constraint
+# management command.
+AIRPLANE_OVERLAP_CONSTRAINT = "flight_airplane_no_overlap"
+
 
 class AirplaneType(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -34,6 +41,22 @@ class Airplane(models.Model):
 class Airport(models.Model):
     name = models.CharField(max_length=255, unique=True)
     closest_big_city = models.CharField(max_length=255)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+
+    class Meta:
+        indexes = [
+            # Serves case-insensitive city lookups, which compare UPPER().
+            models.Index(Upper("closest_big_city"), name="airport_city_upper_idx"),
+        ]
 
     def __str__(self):
         return str(self.name)
@@ -83,6 +106,27 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew)
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "arrival_time"],
+                name="flight_departure_arrival_idx",
+            ),
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_id_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+            models.Index(
+                fields=["airplane", "departure_time", "arrival_time"],
+                name="flight_airplane_timeline_idx",
+            ),
+        ]
 
     @staticmethod
     def validate_time(arrival_time, departure_time):
@@ -92,7 +136,7 @@ class Flight(models.Model):
             )
 
         flight_duration = arrival_time - departure_time
-        if flight_duration > timedelta(hours=24):
+        if flight_duration > MAX_FLIGHT_DURATION:
             raise ValidationError(
                 {"arrival_time": "Flight duration cannot exceed 24 hours."}
             )
@@ -113,37 +157,194 @@ class Flight(models.Model):
     def validate_crew_availability(
         crew, departure_time, arrival_time, exclude_flight_id=None
     ):
-        for crew_member in crew:
-            conflicting_flights = Flight.objects.filter(
-                Q(crew=crew_member)
-                & Q(departure_time__lt=arrival_time)
-                & Q(arrival_time__gt=departure_time)
+        conflicts = Flight.crew.through.objects.filter(
+            crew__in=crew,
+            flight__departure_time__lt=arrival_time,
+            flight__arrival_time__gt=departure_time,
+        )
+        if exclude_flight_id:
+            conflicts = conflicts.exclude(flight_id=exclude_flight_id)
+
+        conflicts = conflicts.order_by("crew_id", "flight__departure_time").values_list(
+            "crew__first_name",
+            "crew__last_name",
+            "flight_id",
+            "flight__departure_time",
+            "flight__arrival_time",
+        )
+        if conflicts:
+            raise ValidationError(
+                [
+                    f"Crew member {first_name} {last_name} is not available for "
+                    f"this flight time. They are assigned to flight {flight_id} "
+                    f"from {departure:%Y-%m-%d %H:%M} to {arrival:%Y-%m-%d %H:%M}."
+                    for first_name, last_name, flight_id, departure, arrival in conflicts
+                ]
             )
-            if exclude_flight_id:
-                conflicting_flights = conflicting_flights.exclude(pk=exclude_flight_id)
 
-            if conflicting_flights.exists():
-                raise ValidationError(
-                    f"Crew member {crew_member} is not available for this flight time. "
-                    f"They already have an assigned flight during this period."
-                )
+    @staticmethod
+    def validate_airplane_availability(
+        airplane, departure_time, arrival_time, exclude_flight_id=None
+    ):
+        conflicts = Flight.objects.filter(
+            airplane=airplane,
+            departure_time__lt=arrival_time,
+            arrival_time__gt=departure_time,
+        )
+        if exclude_flight_id:
+            conflicts = conflicts.exclude(pk=exclude_flight_id)
+
+        conflicts = conflicts.order_by("departure_time").values_list(
+            "pk", "departure_time", "arrival_time"
+        )
+        if conflicts:
+            raise ValidationError(
+                {
+                    "airplane": [
+                        f"Airplane {airplane} is already assigned to flight "
+                        f"{flight_id} from {departure:%Y-%m-%d %H:%M} to "
+                        f"{arrival:%Y-%m-%d %H:%M}."
+                        for flight_id, departure, arrival in conflicts
+                    ]
+                }
+            )
+
+    @property
+    def flight_route(self):
+        return str(self.route) if self.route_id else None
 
     def clean(self):
         super().clean()
         self.validate_time(self.arrival_time, self.departure_time)
+        if self.airplane_id:
+            self.validate_airplane_availability(
+                self.airplane, self.departure_time, self.arrival_time, self.pk
+            )
         if self.pk:
             self.validate_crew_availability(
                 self.crew.all(), self.departure_time, self.arrival_time, self.pk
             )
-        else:
-            self.validate_crew_availability(
-                self.crew.all(), self.departure_time, self.arrival_time
-            )
 
     def __str__(self):
         return f"{self.airplane.name} on route {self.route}"
 
 
+class SeatInventory(models.Model):
+    flight = models.OneToOneField(
+        Flight,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="seat_inventory",
+    )
+    rows = models.PositiveIntegerField()
+    seats_in_row = models.PositiveIntegerField()
+    seat_map = models.BinaryField(default=bytes)
+    sold = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.sold
+
+    def __str__(self):
+        return f"Seat inventory of flight {self.flight_id}: {self.sold}/{self.capacity}"
+
+
+class CrewDutyInterval(models.Model):
+    """
+    Copy of a crew assignment with the flight times, so a crew member's
+    timeline is read from one index range instead of joining flights.
+    """
+
+    crew = models.ForeignKey(
+        Crew, on_delete=models.CASCADE, related_name="duty_intervals"
+    )
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="duty_intervals"
+    )
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["crew", "flight"], name="unique_crew_duty"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["crew", "departure_time", "arrival_time"],
+                name="crew_duty_timeline_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Crew {self.crew_id} on flight {self.flight_id} "
+            f"from {self.departure_time} to {self.arrival_time}"
+        )
+
+
+class FlightSearchEntry(models.Model):
+    """
+    Flattened copy of a flight with everything the flight list shows, so the
+    list is read from this one table without joins or per-row crew queries.
+    Kept in sync by ``airlink_api.flight_search``.
+    """
+
+    flight = models.OneToOneField(
+        Flight,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_entry",
+    )
+    route = models.ForeignKey(
+        Route, on_delete=models.SET_NULL, null=True, db_index=False, related_name="+"
+    )
+    flight_route = models.CharField(max_length=511, null=True)
+    source_city = models.CharField(max_length=255, blank=True)
+    destination_city = models.CharField(max_length=255, blank=True)
+    airplane_type = models.CharField(max_length=255, null=True)
+    capacity = models.PositiveIntegerField(null=True)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    crew = models.JSONField(default=list)
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set only when the entry is rebuilt, never by ticket sales.
+    content_updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "flight"], name="flight_search_departure_idx"
+            ),
+            models.Index(fields=["updated_at"], name="flight_search_updated_idx"),
+            models.Index(
+                Upper("source_city"), "departure_time", name="flight_search_source_idx"
+            ),
+            models.Index(
+                Upper("destination_city"),
+                "departure_time",
+                name="flight_search_destination_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"], name="flight_search_route_idx"
+            ),
+        ]
+
+    @property
+    def tickets_available(self):
+        if self.capacity is None:
+            return None
+        return self.capacity - self.tickets_sold
+
+    def __str__(self):
+        return f"Search entry of flight {self.flight_id}"
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -153,6 +354,14 @@ class Order(models.Model):
         related_name="orders",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="order_created_id_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"], name="order_user_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Order created at {self.created_at} by user {self.user}"
 
@@ -190,3 +399,15 @@ class Ticket(models.Model):
 
     def __str__(self):
         return f"Flight: {self.flight}, Row: {self.row}, Seat: {self.seat}"
+
+
+class IdempotencyRecord(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Idempotency key {self.key}"
@@ -0,0 +1,299 @@
+"""
+Keyset pagination and page-number pagination with cheaper counts.
+
+Keyset pages are selected with a ``WHERE`` on the ordering columns of the
+last row seen instead of ``OFFSET``, and no ``COUNT(*)`` is run, so every
+page costs one index range scan however deep it is. The ordering must end
+with a unique column (``id``) to be stable.
+
+``CountStrategyPagination`` keeps page numbers but lets each viewset pick
+how the total is obtained with ``count_strategy``:
+
+- ``exact`` - ``COUNT(*)`` on every request
+- ``cached`` - ``COUNT(*)`` cached for ``count_cache_timeout`` seconds per
+  filtered query, also keyed by the reference cache versions of the
+  viewset's ``count_models`` so that their saves and deletes show at once
+- ``estimated`` - the PostgreSQL planner's row estimate (``reltuples`` for
+  an unfiltered table, ``EXPLAIN`` otherwise), with an exact count below
+  ``ESTIMATE_THRESHOLD`` rows and on other databases
+
+Responses carry ``count_approximate`` telling whether ``count`` is exact.
+"""
+
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from airlink_api.reference_cache import cache_enabled, get_versions
+
+DEFAULT_SETTINGS = {
+    "STRATEGY": "exact",
+    "CACHE_ALIAS": "default",
+    "CACHE_PREFIX": "count",
+    "TIMEOUT": 60,
+    "ESTIMATE_THRESHOLD": 10000,
+}
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated")
+
+
+def pagination_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "PAGINATION_COUNT", {})}
+
+
+def count_key(queryset, models=()):
+    """Cache key of the count of ``queryset``, whatever its ordering."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha256(
+        f"{queryset.model._meta.label_lower}:{sql}:{params!r}".encode()
+    ).hexdigest()
+    versions = ".".join(str(version) for version in get_versions(models))
+    return f"{pagination_settings()['CACHE_PREFIX']}:{versions}:{digest}"
+
+
+def estimate_count(queryset):
+    """The planner's row estimate on PostgreSQL, ``None`` when unavailable."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    query = queryset.order_by().query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and not query.combinator:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # -1 until the table is first vacuumed or analyzed.
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountPaginator(DjangoPaginator):
+    """
+    Paginator with a precomputed ``count``. An approximate count may be too
+    low, so pages past it are still served instead of raising ``EmptyPage``.
+    """
+
+    def __init__(self, object_list, per_page, count, approximate=False):
+        super().__init__(object_list, per_page)
+        self.count = count
+        self.approximate = approximate
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.approximate and int(number) > 1:
+                return int(number)
+            raise
+
+    def page(self, number):
+        if not self.approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
+
+
+class CountStrategyPagination(PageNumberPagination):
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.count_approximate = False
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        # Called by ``PageNumberPagination.paginate_queryset`` in place of
+        # the paginator class.
+        count, self.count_approximate = self.get_count(queryset)
+        return CountPaginator(queryset, page_size, count, self.count_approximate)
+
+    def get_count_strategy(self):
+        strategy = getattr(self.view, "count_strategy", None)
+        strategy = strategy or pagination_settings()["STRATEGY"]
+        if strategy not in COUNT_STRATEGIES:
+            raise ValueError(
+                f"Unknown count strategy {strategy!r}, "
+                f"choose one of {', '.join(COUNT_STRATEGIES)}."
+            )
+        return strategy
+
+    def get_count(self, queryset):
+        """Return ``(count, approximate)`` with the view's strategy."""
+        strategy = self.get_count_strategy()
+        config = pagination_settings()
+        if strategy == "estimated":
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= config["ESTIMATE_THRESHOLD"]:
+                return estimate, True
+        elif strategy == "cached" and cache_enabled():
+            cache = caches[config["CACHE_ALIAS"]]
+            key = count_key(queryset, getattr(self.view, "count_models", ()))
+            count = cache.get(key)
+            if count is not None:
+                return count, True
+            count = queryset.count()
+            timeout = getattr(self.view, "count_cache_timeout", None)
+            cache.set(key, count, timeout or config["TIMEOUT"])
+            return count, False
+        return queryset.count(), False
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_approximate": self.count_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_approximate"] = {"type": "boolean"}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        position, self.backwards = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.backwards:
+            ordering = [self.reverse(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.backwards:
+            rows.reverse()
+
+        self.page = rows
+        self.has_next = has_more if not self.backwards else position is not None
+        self.has_previous = position is not None if not self.backwards else has_more
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def reverse(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        ``(a, b) > (x, y)`` in the given ordering, spelled as
+        ``a > x OR (a = x AND b > y)`` so each branch is an index range.
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            branch = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(ordering[:index], position):
+                branch &= Q(**{previous.lstrip("-"): value})
+            condition |= branch
+        return condition
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, cursor["p"], strict=True)
+            ]
+            return values, bool(cursor.get("r"))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, backwards):
+        position = [getattr(row, field.lstrip("-")) for field in self.ordering]
+        cursor = {"p": position}
+        if backwards:
+            cursor["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            # isoformat() keeps the microseconds DjangoJSONEncoder would drop.
+            json.dumps(cursor, default=lambda value: value.isoformat()).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class FlightKeysetPagination(KeysetPagination):
+    # The flight list reads ``FlightSearchEntry``, keyed by ``flight_id``.
+    ordering = ("departure_time", "flight_id")
+
+
+class OrderKeysetPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,161 @@
+"""
+Read-through cache for reference data.
+
+Airplane types, airplanes, airports, crew and routes change rarely but are
+read on almost every request. Each of these models has a version number in
+the cache named by ``REFERENCE_CACHE["CACHE_ALIAS"]`` that is bumped after
+every committed save or delete (see ``airlink_api.signals``). Cached
+instances and API responses are keyed by the versions they were built
+from, so a bump makes them unreachable and the backend's own eviction (the
+LRU culling of ``LocMemCache`` with ``MAX_ENTRIES`` by default) drops them.
+
+A transaction that changed reference data holds writes other processes
+cannot see yet and which may still be rolled back, so until it commits it
+neither reads nor fills the cache.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from airlink_api.models import Airplane, AirplaneType, Airport, Crew, Route
+
+DEFAULT_SETTINGS = {
+    "CACHE_ALIAS": "default",
+    "CACHE_PREFIX": "reference",
+    "TIMEOUT": 60 * 60,
+}
+
+REFERENCE_MODELS = (AirplaneType, Airplane, Airport, Crew, Route)
+
+
+def reference_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "REFERENCE_CACHE", {})}
+
+
+def _cache():
+    return caches[reference_settings()["CACHE_ALIAS"]]
+
+
+def _version_key(model):
+    return f"{reference_settings()['CACHE_PREFIX']}:{model._meta.label_lower}:version"
+
+
+class VersionBump:
+    """``on_commit`` callback bumping a model's version; marks itself run."""
+
+    def __init__(self, model):
+        self.model = model
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        bump_version(self.model)
+
+
+def cache_enabled(using=DEFAULT_DB_ALIAS):
+    """
+    False while the current transaction has uncommitted reference changes.
+    Rolling back a savepoint drops its callbacks, so only live ones count.
+    """
+    return not any(
+        isinstance(callback, VersionBump) and not callback.done
+        for _, callback, _ in connections[using].run_on_commit
+    )
+
+
+def get_versions(models):
+    """Current version of each model, in order."""
+    cache = _cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, 0, None)
+            versions[key] = cache.get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    cache = _cache()
+    key = _version_key(model)
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def record_change(model):
+    """Invalidate cached data of ``model`` once the transaction commits."""
+    transaction.on_commit(VersionBump(model))
+
+
+def get_instances(model, pks):
+    """``{pk: instance}`` of the existing ``pks``, from the cache when possible."""
+    pks = {pk for pk in pks if pk is not None}
+    if not pks:
+        return {}
+    if not cache_enabled():
+        return model._default_manager.in_bulk(pks)
+
+    config = reference_settings()
+    (version,) = get_versions([model])
+    prefix = f"{config['CACHE_PREFIX']}:{model._meta.label_lower}:{version}"
+    cache = _cache()
+    cached = cache.get_many([f"{prefix}:{pk}" for pk in pks])
+    instances = {instance.pk: instance for instance in cached.values()}
+    missing = pks - instances.keys()
+    if missing:
+        loaded = model._default_manager.in_bulk(missing)
+        cache.set_many(
+            {f"{prefix}:{pk}": instance for pk, instance in loaded.items()},
+            config["TIMEOUT"],
+        )
+        instances.update(loaded)
+    return instances
+
+
+def get_instance(model, pk):
+    return get_instances(model, [pk]).get(pk)
+
+
+def attach_related(instances, field_names):
+    """
+    Set the foreign keys ``field_names`` of ``instances`` (one instance or an
+    iterable) from the cache instead of joining or querying them.
+    """
+    if not field_names or instances is None:
+        return
+    if hasattr(instances, "_meta"):
+        instances = [instances]
+    instances = list(instances)
+    if not instances:
+        return
+    meta = instances[0]._meta
+    for name in field_names:
+        field = meta.get_field(name)
+        related = get_instances(
+            field.related_model,
+            [getattr(instance, field.attname) for instance in instances],
+        )
+        for instance in instances:
+            value = getattr(instance, field.attname)
+            if value in related:
+                setattr(instance, name, related[value])
+
+
+def response_key(models, name, uri):
+    """Cache key of a response built from ``models``, ``None`` when disabled."""
+    if not cache_enabled():
+        return None
+    versions = ".".join(str(version) for version in get_versions(models))
+    digest = hashlib.sha256(uri.encode()).hexdigest()
+    return f"{reference_settings()['CACHE_PREFIX']}:response:{name}:{versions}:{digest}"
+
+
+def get_response(key):
+    return _cache().get(key)
+
+
+def set_response(key, data):
+    _cache().set(key, data, reference_settings()["TIMEOUT"])
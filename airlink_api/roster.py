@@ -0,0 +1,231 @@
+"""
+Automatic crew rostering.
+
+Flights are handled in departure order and every crew member sits in a heap
+keyed by the time they are rested again; each flight takes the crew members
+that have been free the longest, skipping anyone with an existing duty that
+overlaps the flight plus the minimum rest. This is the greedy
+interval-partitioning heuristic and needs ``O(n log m)`` heap operations for
+``n`` crew slots and ``m`` crew members.
+
+Flights separated by an idle gap of at least the minimum rest form
+independent blocks: when a block starts every crew member is rested, so each
+block is solved on its own with a fresh heap. The picks can therefore differ
+from one pass over all flights, which would carry rest times across blocks,
+but they do not depend on the number of workers: blocks are solved in
+sequence or in parallel by a process pool
+(``settings.CREW_ROSTER["WORKERS"]``) with the same result.
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import repeat
+
+from django.conf import settings
+from django.db import transaction
+
+from airlink_api import reference_cache
+from airlink_api.flight_search import refresh_entries
+from airlink_api.models import Crew, CrewDutyInterval, Flight
+
+DEFAULT_SETTINGS = {
+    "MIN_CREW": 2,
+    "MIN_REST_MINUTES": 60,
+    "WORKERS": 1,
+}
+
+# ``start`` and ``end`` are POSIX timestamps, ``assigned`` the crew ids the
+# flight already has.
+RosterFlight = namedtuple("RosterFlight", "id start end assigned")
+
+
+def roster_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "CREW_ROSTER", {})}
+
+
+def split_blocks(flights, min_rest):
+    """Group flights into runs separated by at least ``min_rest`` seconds."""
+    blocks, block, block_end = [], [], None
+    for flight in sorted(flights, key=lambda f: (f.start, f.end, f.id)):
+        if block and flight.start >= block_end + min_rest:
+            blocks.append(block)
+            block = []
+        if not block or flight.end > block_end:
+            block_end = flight.end
+        block.append(flight)
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+def is_busy(duties, start, end):
+    """
+    Whether sorted, non-overlapping ``(starts, ends)`` duties intersect
+    ``[start, end)``.
+    """
+    if not duties:
+        return False
+    starts, ends = duties
+    index = bisect_left(starts, end)
+    return index > 0 and ends[index - 1] > start
+
+
+def solve_block(block, crew_ids, duties, min_crew, min_rest):
+    """
+    Roster one block; returns ``({flight_id: [crew_id, ...]}, [flight_id])``
+    with the new assignments and the flights that could not be staffed.
+    """
+    heap = [(0.0, crew_id) for crew_id in sorted(crew_ids)]
+    assignments, unassigned = {}, []
+    for flight in block:
+        needed = min_crew - len(flight.assigned)
+        if needed <= 0:
+            continue
+
+        chosen, skipped = [], []
+        while heap and len(chosen) < needed and heap[0][0] <= flight.start:
+            rested_at, crew_id = heapq.heappop(heap)
+            if crew_id in flight.assigned or is_busy(
+                duties.get(crew_id), flight.start - min_rest, flight.end + min_rest
+            ):
+                skipped.append((rested_at, crew_id))
+            else:
+                chosen.append((rested_at, crew_id))
+
+        if len(chosen) < needed:
+            unassigned.append(flight.id)
+            skipped += chosen
+        else:
+            assignments[flight.id] = [crew_id for _, crew_id in chosen]
+            for _, crew_id in chosen:
+                heapq.heappush(heap, (flight.end + min_rest, crew_id))
+        for item in skipped:
+            heapq.heappush(heap, item)
+    return assignments, unassigned
+
+
+def solve_roster(
+    flights, crew_ids, duties=None, min_crew=None, min_rest=None, workers=None
+):
+    """
+    Assign crew to ``RosterFlight``s. ``duties`` maps crew ids to their
+    existing duties as ``(starts, ends)`` lists of timestamps; ``min_rest``
+    is in seconds. Returns ``(assignments, unassigned, block_count)``.
+    """
+    config = roster_settings()
+    min_crew = config["MIN_CREW"] if min_crew is None else min_crew
+    if min_rest is None:
+        min_rest = config["MIN_REST_MINUTES"] * 60
+    workers = workers or config["WORKERS"]
+    duties = duties or {}
+
+    blocks = split_blocks(flights, min_rest)
+    arguments = (
+        blocks,
+        repeat(crew_ids),
+        repeat(duties),
+        repeat(min_crew),
+        repeat(min_rest),
+    )
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(solve_block, *arguments, chunksize=8))
+    else:
+        results = list(map(solve_block, *arguments))
+
+    assignments, unassigned = {}, []
+    for block_assignments, block_unassigned in results:
+        assignments.update(block_assignments)
+        unassigned += block_unassigned
+    return assignments, unassigned, len(blocks)
+
+
+def load_roster(flights, crew=None, min_rest=0):
+    """
+    Read the roster problem for a ``Flight`` queryset and an optional ``Crew``
+    queryset (every crew member by default) with four queries. Existing
+    duties are read from the crew timeline index for the flights' time span
+    widened by ``min_rest`` seconds.
+    """
+    crew = Crew.objects.all() if crew is None else crew
+    rest = timedelta(seconds=min_rest)
+    rows = list(flights.order_by().values_list("pk", "departure_time", "arrival_time"))
+    if not rows:
+        return [], [], {}
+
+    assigned = {}
+    for flight_id, crew_id in Flight.crew.through.objects.filter(
+        flight__in=flights.order_by().values("pk")
+    ).values_list("flight_id", "crew_id"):
+        assigned.setdefault(flight_id, set()).add(crew_id)
+
+    crew_ids = list(crew.order_by().values_list("pk", flat=True))
+    duties = {}
+    for crew_id, departure_time, arrival_time in (
+        CrewDutyInterval.objects.filter(
+            crew__in=crew.order_by().values("pk"),
+            departure_time__lt=max(row[2] for row in rows) + rest,
+            arrival_time__gt=min(row[1] for row in rows) - rest,
+        )
+        .order_by("crew_id", "departure_time")
+        .values_list("crew_id", "departure_time", "arrival_time")
+    ):
+        starts, ends = duties.setdefault(crew_id, ([], []))
+        starts.append(departure_time.timestamp())
+        ends.append(arrival_time.timestamp())
+
+    roster_flights = [
+        RosterFlight(
+            pk,
+            departure_time.timestamp(),
+            arrival_time.timestamp(),
+            frozenset(assigned.get(pk, ())),
+        )
+        for pk, departure_time, arrival_time in rows
+    ]
+    return roster_flights, crew_ids, duties
+
+
+def save_roster(flights, assignments, batch_size=1000):
+    """
+    Store new crew assignments of ``RosterFlight``s together with their crew
+    timeline intervals and refresh the search entries of the flights.
+    """
+    times = {
+        flight.id: (
+            datetime.fromtimestamp(flight.start, tz=dt_timezone.utc),
+            datetime.fromtimestamp(flight.end, tz=dt_timezone.utc),
+        )
+        for flight in flights
+        if flight.id in assignments
+    }
+    with transaction.atomic():
+        Flight.crew.through.objects.bulk_create(
+            [
+                Flight.crew.through(flight_id=flight_id, crew_id=crew_id)
+                for flight_id, crew_ids in assignments.items()
+                for crew_id in crew_ids
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        CrewDutyInterval.objects.bulk_create(
+            [
+                CrewDutyInterval(
+                    crew_id=crew_id,
+                    flight_id=flight_id,
+                    departure_time=times[flight_id][0],
+                    arrival_time=times[flight_id][1],
+                )
+                for flight_id, crew_ids in assignments.items()
+                for crew_id in crew_ids
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        refresh_entries(assignments, batch_size)
+        # The bulk insert sends no m2m_changed; crew is part of flight fragments.
+        reference_cache.record_change(Flight)
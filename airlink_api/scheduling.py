@@ -0,0 +1,201 @@
+"""
+Bulk flight scheduling.
+
+A batch of new flights is validated in memory: the intervals already booked
+for the batch's airplanes and crew are loaded in one query, merged with the
+intervals of the batch itself and swept in departure order per airplane and
+per crew member, so conflicts with existing flights and inside the batch are
+found in ``O(n log n)`` without a query per flight.
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import CharField, Value
+
+from airlink_api import reference_cache
+from airlink_api.flight_search import refresh_entries
+from airlink_api.itineraries import record_change
+from airlink_api.models import Airplane, Crew, CrewDutyInterval, Flight, Route
+
+Interval = namedtuple("Interval", "kind resource start end flight index")
+
+RESOURCE_NAMES = {"airplane": "Airplane", "crew": "Crew member"}
+
+
+def load_intervals(airplane_ids, crew_ids, start, end):
+    """
+    Return intervals of existing flights of these airplanes and crew members
+    overlapping ``[start, end)``, fetched with a single ``UNION ALL`` query.
+    """
+    airplanes = Flight.objects.filter(
+        airplane_id__in=airplane_ids,
+        departure_time__lt=end,
+        arrival_time__gt=start,
+    ).values_list(
+        Value("airplane", output_field=CharField()),
+        "airplane_id",
+        "departure_time",
+        "arrival_time",
+        "pk",
+    )
+    crew = CrewDutyInterval.objects.filter(
+        crew_id__in=crew_ids,
+        departure_time__lt=end,
+        arrival_time__gt=start,
+    ).values_list(
+        Value("crew", output_field=CharField()),
+        "crew_id",
+        "departure_time",
+        "arrival_time",
+        "flight_id",
+    )
+    return [
+        Interval(kind, resource, departure_time, arrival_time, flight_id, None)
+        for kind, resource, departure_time, arrival_time, flight_id in (
+            airplanes.union(crew, all=True)
+        )
+    ]
+
+
+def batch_intervals(flights):
+    for index, flight in enumerate(flights):
+        yield Interval(
+            "airplane",
+            flight["airplane_id"],
+            flight["departure_time"],
+            flight["arrival_time"],
+            None,
+            index,
+        )
+        for crew_id in flight["crew"]:
+            yield Interval(
+                "crew",
+                crew_id,
+                flight["departure_time"],
+                flight["arrival_time"],
+                None,
+                index,
+            )
+
+
+def find_overlaps(intervals):
+    """
+    Yield ``(earlier, later)`` for every interval that starts before an
+    earlier interval of the same airplane or crew member has ended.
+    """
+    latest = {}
+    for interval in sorted(
+        intervals, key=lambda i: (i.kind, i.resource, i.start, i.end)
+    ):
+        key = (interval.kind, interval.resource)
+        earlier = latest.get(key)
+        if earlier is not None and interval.start < earlier.end:
+            yield earlier, interval
+        if earlier is None or interval.end > earlier.end:
+            latest[key] = interval
+
+
+def describe(interval):
+    if interval.index is None:
+        where = f"flight {interval.flight}"
+    else:
+        where = f"flight #{interval.index} of this batch"
+    return (
+        f"{RESOURCE_NAMES[interval.kind]} {interval.resource} is already "
+        f"scheduled on {where} from {interval.start:%Y-%m-%d %H:%M} "
+        f"to {interval.end:%Y-%m-%d %H:%M}."
+    )
+
+
+def missing_references(flights):
+    """Report routes, airplanes and crew members that do not exist."""
+    errors = defaultdict(list)
+    for model, label, get_ids in (
+        (Route, "Route", lambda flight: [flight["route_id"]]),
+        (Airplane, "Airplane", lambda flight: [flight["airplane_id"]]),
+        (Crew, "Crew member", lambda flight: flight["crew"]),
+    ):
+        ids = {pk for flight in flights for pk in get_ids(flight)}
+        existing = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        for index, flight in enumerate(flights):
+            errors[index].extend(
+                f"{label} {pk} does not exist."
+                for pk in get_ids(flight)
+                if pk not in existing
+            )
+    return errors
+
+
+def validate_schedule(flights):
+    """
+    Validate ``flights`` (dicts with ``route_id``, ``airplane_id``, a list of
+    ``crew`` ids, ``departure_time`` and ``arrival_time``) against each other and the
+    existing schedule. Returns ``{index: [message, ...]}`` of the failing
+    flights, empty when the whole batch can be created.
+    """
+    if not flights:
+        return {}
+    errors = missing_references(flights)
+
+    intervals = list(batch_intervals(flights))
+    intervals += load_intervals(
+        {flight["airplane_id"] for flight in flights},
+        {crew_id for flight in flights for crew_id in flight["crew"]},
+        min(flight["departure_time"] for flight in flights),
+        max(flight["arrival_time"] for flight in flights),
+    )
+    for earlier, later in find_overlaps(intervals):
+        if later.index is not None:
+            errors[later.index].append(describe(earlier))
+        if earlier.index is not None:
+            errors[earlier.index].append(describe(later))
+    return {index: messages for index, messages in errors.items() if messages}
+
+
+def create_schedule(flights, batch_size=1000):
+    """
+    Insert validated ``flights`` with their crew assignments, crew timeline
+    intervals and search entries in bulk; returns the created flights.
+    """
+    with transaction.atomic():
+        created = Flight.objects.bulk_create(
+            [
+                Flight(
+                    route_id=flight["route_id"],
+                    airplane_id=flight["airplane_id"],
+                    departure_time=flight["departure_time"],
+                    arrival_time=flight["arrival_time"],
+                )
+                for flight in flights
+            ],
+            batch_size=batch_size,
+        )
+        Flight.crew.through.objects.bulk_create(
+            [
+                Flight.crew.through(flight_id=instance.pk, crew_id=crew_id)
+                for instance, flight in zip(created, flights)
+                for crew_id in flight["crew"]
+            ],
+            batch_size=batch_size,
+        )
+        CrewDutyInterval.objects.bulk_create(
+            [
+                CrewDutyInterval(
+                    crew_id=crew_id,
+                    flight_id=instance.pk,
+                    departure_time=instance.departure_time,
+                    arrival_time=instance.arrival_time,
+                )
+                for instance, flight in zip(created, flights)
+                for crew_id in flight["crew"]
+            ],
+            batch_size=batch_size,
+        )
+        refresh_entries([instance.pk for instance in created], batch_size)
+        # Bulk inserts send no post_save, so bump the flight version here.
+        reference_cache.record_change(Flight)
+        transaction.on_commit(
+            lambda: record_change([instance.pk for instance in created])
+        )
+    return created
@@ -0,0 +1,274 @@
+"""
+Time-limited seat holds.
+
+A hold reserves seats of one flight for one user until it expires or is
+consumed by order creation. Holds live in a pluggable store configured by
+``settings.SEAT_HOLDS["STORE"]``: the in-process ``LocMemSeatHoldStore`` by
+default, or ``RedisSeatHoldStore`` for deployments with several workers.
+"""
+
+import heapq
+import json
+import threading
+import time
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_SETTINGS = {
+    "STORE": "airlink_api.seat_holds.LocMemSeatHoldStore",
+    "OPTIONS": {},
+    "DEFAULT_MINUTES": 10,
+    "MAX_MINUTES": 30,
+}
+
+
+class SeatsHeld(Exception):
+    def __init__(self, seats):
+        self.seats = seats
+        super().__init__(
+            "Seats already held: "
+            + ", ".join(f"row {row} seat {seat}" for row, seat in seats)
+        )
+
+
+def hold_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "SEAT_HOLDS", {})}
+
+
+@lru_cache(maxsize=None)
+def get_seat_hold_store():
+    config = hold_settings()
+    return import_string(config["STORE"])(**config["OPTIONS"])
+
+
+class BaseSeatHoldStore:
+    """
+    Holds are plain dicts with ``token``, ``flight``, ``user``, ``seats``
+    (a list of ``(row, seat)`` pairs) and ``expires_at`` (a Unix timestamp).
+    ``shared`` tells whether other processes see the same holds.
+    """
+
+    shared = False
+
+    def acquire(self, flight_id, seats, user_id, ttl):
+        """Hold all ``seats`` or none of them; raises ``SeatsHeld``."""
+        raise NotImplementedError
+
+    def peek(self, token, user_id):
+        """Return the user's live hold without removing it, or ``None``."""
+        raise NotImplementedError
+
+    def consume(self, token, user_id):
+        """Atomically remove and return the user's live hold, or ``None``."""
+        raise NotImplementedError
+
+    def held_seats(self, flight_id):
+        """Return ``{(row, seat): user_id}`` of live holds on a flight."""
+        raise NotImplementedError
+
+    def sweep(self):
+        """Drop expired holds and return how many entries were removed."""
+        raise NotImplementedError
+
+    @staticmethod
+    def new_hold(flight_id, seats, user_id, ttl):
+        return {
+            "token": uuid.uuid4().hex,
+            "flight": flight_id,
+            "user": user_id,
+            "seats": [tuple(seat) for seat in seats],
+            "expires_at": time.time() + ttl,
+        }
+
+
+class LocMemSeatHoldStore(BaseSeatHoldStore):
+    """
+    Process-local store. Expiry times sit in a heap, so a sweep only touches
+    the holds that actually expired.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holds = {}
+        self._seats = {}
+        self._expiry = []
+
+    def acquire(self, flight_id, seats, user_id, ttl):
+        with self._lock:
+            self._sweep(time.time())
+            flight_seats = self._seats.setdefault(flight_id, {})
+            conflicts = [seat for seat in seats if tuple(seat) in flight_seats]
+            if conflicts:
+                raise SeatsHeld(conflicts)
+
+            hold = self.new_hold(flight_id, seats, user_id, ttl)
+            self._holds[hold["token"]] = hold
+            for seat in hold["seats"]:
+                flight_seats[seat] = hold["token"]
+            heapq.heappush(self._expiry, (hold["expires_at"], hold["token"]))
+            return hold
+
+    def peek(self, token, user_id):
+        with self._lock:
+            return self._live_hold(token, user_id)
+
+    def consume(self, token, user_id):
+        with self._lock:
+            hold = self._live_hold(token, user_id)
+            if hold is not None:
+                self._remove(hold)
+            return hold
+
+    def _live_hold(self, token, user_id):
+        hold = self._holds.get(token)
+        if hold is None or hold["user"] != user_id or hold["expires_at"] <= time.time():
+            return None
+        return hold
+
+    def held_seats(self, flight_id):
+        now = time.time()
+        with self._lock:
+            return {
+                seat: self._holds[token]["user"]
+                for seat, token in self._seats.get(flight_id, {}).items()
+                if self._holds[token]["expires_at"] > now
+            }
+
+    def sweep(self):
+        with self._lock:
+            return self._sweep(time.time())
+
+    def _sweep(self, now):
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, token = heapq.heappop(self._expiry)
+            hold = self._holds.get(token)
+            if hold is not None:
+                self._remove(hold)
+                removed += 1
+        return removed
+
+    def _remove(self, hold):
+        del self._holds[hold["token"]]
+        flight_seats = self._seats[hold["flight"]]
+        for seat in hold["seats"]:
+            if flight_seats.get(seat) == hold["token"]:
+                del flight_seats[seat]
+        if not flight_seats:
+            del self._seats[hold["flight"]]
+
+
+class RedisSeatHoldStore(BaseSeatHoldStore):
+    """
+    Store backed by a Redis-compatible client.
+
+    Only ``set``, ``get``, ``delete``, ``zadd``, ``zrangebyscore``,
+    ``zremrangebyscore``, ``zrem``, ``sadd``, ``smembers`` and ``srem`` are
+    used, so any client exposing the redis-py signatures of those works.
+    Seat keys are taken with ``SET NX PX`` and expire on their own; the
+    per-flight sorted sets are trimmed by ``sweep``.
+    """
+
+    shared = True
+
+    def __init__(self, client=None, url="redis://localhost:6379/0", prefix="seathold"):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        elif isinstance(client, str):
+            client = import_string(client)()
+        self.client = client
+        self.prefix = prefix
+
+    def _hold_key(self, token):
+        return f"{self.prefix}:hold:{token}"
+
+    def _seat_key(self, flight_id, seat):
+        return f"{self.prefix}:seat:{flight_id}:{seat[0]}:{seat[1]}"
+
+    def _flight_key(self, flight_id):
+        return f"{self.prefix}:flight:{flight_id}"
+
+    def _flights_key(self):
+        return f"{self.prefix}:flights"
+
+    @staticmethod
+    def _member(hold, seat):
+        return f"{seat[0]}:{seat[1]}:{hold['user']}:{hold['token']}"
+
+    def acquire(self, flight_id, seats, user_id, ttl):
+        hold = self.new_hold(flight_id, seats, user_id, ttl)
+        ttl_ms = int(ttl * 1000)
+        taken, conflicts = [], []
+        for seat in hold["seats"]:
+            key = self._seat_key(flight_id, seat)
+            if self.client.set(key, hold["token"], nx=True, px=ttl_ms):
+                taken.append(key)
+            else:
+                conflicts.append(seat)
+        if conflicts:
+            if taken:
+                self.client.delete(*taken)
+            raise SeatsHeld(conflicts)
+
+        self.client.set(self._hold_key(hold["token"]), json.dumps(hold), px=ttl_ms)
+        self.client.zadd(
+            self._flight_key(flight_id),
+            {self._member(hold, seat): hold["expires_at"] for seat in hold["seats"]},
+        )
+        self.client.sadd(self._flights_key(), flight_id)
+        return hold
+
+    def peek(self, token, user_id):
+        raw = self.client.get(self._hold_key(token))
+        if raw is None:
+            return None
+        hold = json.loads(raw)
+        hold["seats"] = [tuple(seat) for seat in hold["seats"]]
+        if hold["user"] != user_id or hold["expires_at"] <= time.time():
+            return None
+        return hold
+
+    def consume(self, token, user_id):
+        hold = self.peek(token, user_id)
+        if hold is None:
+            return None
+        if not self.client.delete(self._hold_key(token)):
+            return None
+
+        self.client.delete(
+            *(self._seat_key(hold["flight"], seat) for seat in hold["seats"])
+        )
+        self.client.zrem(
+            self._flight_key(hold["flight"]),
+            *(self._member(hold, seat) for seat in hold["seats"]),
+        )
+        return hold
+
+    def held_seats(self, flight_id):
+        members = self.client.zrangebyscore(
+            self._flight_key(flight_id), time.time(), "+inf"
+        )
+        held = {}
+        for member in members:
+            if isinstance(member, bytes):
+                member = member.decode()
+            row, seat, user_id, _ = member.split(":")
+            held[(int(row), int(seat))] = int(user_id)
+        return held
+
+    def sweep(self):
+        removed = 0
+        now = time.time()
+        for flight_id in self.client.smembers(self._flights_key()):
+            if isinstance(flight_id, bytes):
+                flight_id = flight_id.decode()
+            key = self._flight_key(flight_id)
+            removed += self.client.zremrangebyscore(key, "-inf", now)
+            if not self.client.zrangebyscore(key, "-inf", "+inf"):
+                self.client.srem(self._flights_key(), flight_id)
+        return removed
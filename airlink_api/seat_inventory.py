@@ -0,0 +1,401 @@
+"""Per-flight seat bitmap inventory.
+
+Every seat of a flight maps to one bit of ``SeatInventory.seat_map``: seat
+``(row, seat)`` lives at index ``(row - 1) * seats_in_row + (seat - 1)``.
+The inventory is updated in the same transaction that creates tickets, so
+availability can be read without touching the ``Ticket`` table.
+"""
+
+import base64
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from airlink_api.models import Flight, FlightSearchEntry, SeatInventory, Ticket
+
+
+class SeatUnavailable(Exception):
+    def __init__(self, seats):
+        self.seats = seats
+        super().__init__(
+            "Seats already taken: "
+            + ", ".join(f"row {row} seat {seat}" for row, seat in seats)
+        )
+
+
+def seat_index(row, seat, seats_in_row):
+    return (row - 1) * seats_in_row + (seat - 1)
+
+
+def empty_seat_map(rows, seats_in_row):
+    return bytearray((rows * seats_in_row + 7) // 8)
+
+
+def is_taken(seat_map, index):
+    return bool(seat_map[index >> 3] & (1 << (index & 7)))
+
+
+def mark_taken(seat_map, index):
+    seat_map[index >> 3] |= 1 << (index & 7)
+
+
+def mark_free(seat_map, index):
+    seat_map[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+def count_taken(seat_map):
+    return bin(int.from_bytes(bytes(seat_map), "little")).count("1")
+
+
+def iter_taken(seat_map, seats_in_row):
+    """Yield ``(row, seat)`` pairs of every taken seat in row-major order."""
+    for byte_index, byte in enumerate(bytes(seat_map)):
+        if not byte:
+            continue
+        for bit in range(8):
+            if byte & (1 << bit):
+                row, seat = divmod(byte_index * 8 + bit, seats_in_row)
+                yield row + 1, seat + 1
+
+
+def build_seat_map(rows, seats_in_row, taken):
+    """Build a seat map from ``(row, seat)`` pairs, ignoring seats out of range."""
+    seat_map = empty_seat_map(rows, seats_in_row)
+    for row, seat in taken:
+        if 1 <= row <= rows and 1 <= seat <= seats_in_row:
+            mark_taken(seat_map, seat_index(row, seat, seats_in_row))
+    return seat_map
+
+
+def build_inventory(flight):
+    """Return an unsaved inventory computed from the flight's ticket rows."""
+    rows, seats_in_row = flight.airplane.rows, flight.airplane.seats_in_row
+    seat_map = build_seat_map(
+        rows,
+        seats_in_row,
+        Ticket.objects.filter(flight_id=flight.pk).values_list("row", "seat"),
+    )
+    return SeatInventory(
+        flight_id=flight.pk,
+        rows=rows,
+        seats_in_row=seats_in_row,
+        seat_map=bytes(seat_map),
+        sold=count_taken(seat_map),
+    )
+
+
+def rebuild_inventory(flight):
+    """
+    Recompute the inventory and ``Flight.tickets_sold``, with its copy in the
+    flight search entry, from ticket rows.
+    """
+    inventory = build_inventory(flight)
+    updated = SeatInventory.objects.filter(pk=flight.pk).update(
+        rows=inventory.rows,
+        seats_in_row=inventory.seats_in_row,
+        seat_map=inventory.seat_map,
+        sold=inventory.sold,
+        version=F("version") + 1,
+    )
+    if not updated:
+        inventory.save(force_insert=True)
+    Flight.objects.filter(pk=flight.pk).update(tickets_sold=inventory.sold)
+    FlightSearchEntry.objects.filter(pk=flight.pk).update(
+        tickets_sold=inventory.sold, updated_at=timezone.now()
+    )
+    return SeatInventory.objects.get(pk=flight.pk)
+
+
+def resync_inventory(flight_id):
+    """
+    Rebuild the inventory of ``flight_id`` and every sold counter from its
+    ticket rows under the inventory row lock, so concurrent orders wait.
+    Flights without an airplane have no inventory; only their counters are
+    recomputed.
+    """
+    flight = Flight.objects.select_related("airplane").filter(pk=flight_id).first()
+    if flight is None:
+        return
+    with transaction.atomic():
+        if flight.airplane is not None:
+            get_inventory(flight, lock=True)
+            rebuild_inventory(flight)
+            return
+        sold = Ticket.objects.filter(flight_id=flight_id).count()
+        Flight.objects.filter(pk=flight_id).update(tickets_sold=sold)
+        FlightSearchEntry.objects.filter(pk=flight_id).update(
+            tickets_sold=sold, updated_at=timezone.now()
+        )
+
+
+def adjust_seats(flight_id, taken=(), freed=()):
+    """
+    Mark ``taken`` seats sold and ``freed`` seats free in the inventory of
+    ``flight_id`` for tickets saved or deleted one by one. The sold counters
+    of the inventory, the flight and its search entry move with ``F()`` by
+    the number of seats that actually changed. An inventory built for the
+    first time, or for another airplane size, is rebuilt from tickets with
+    all counters instead.
+    """
+    if flight_id is None:
+        return
+    flight = Flight.objects.select_related("airplane").filter(pk=flight_id).first()
+    if flight is None or flight.airplane is None:
+        return
+    with transaction.atomic():
+        inventory = (
+            SeatInventory.objects.select_for_update().filter(pk=flight_id).first()
+        )
+        if inventory is None or (inventory.rows, inventory.seats_in_row) != (
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+        ):
+            resync_inventory(flight_id)
+            return
+        seat_map = bytearray(inventory.seat_map)
+        delta = 0
+        for seats, taking in ((freed, False), (taken, True)):
+            for row, seat in seats:
+                if not (
+                    1 <= row <= inventory.rows and 1 <= seat <= inventory.seats_in_row
+                ):
+                    continue
+                index = seat_index(row, seat, inventory.seats_in_row)
+                if is_taken(seat_map, index) == taking:
+                    continue
+                if taking:
+                    mark_taken(seat_map, index)
+                    delta += 1
+                else:
+                    mark_free(seat_map, index)
+                    delta -= 1
+        if bytes(seat_map) == bytes(inventory.seat_map):
+            return
+        SeatInventory.objects.filter(pk=inventory.pk).update(
+            seat_map=bytes(seat_map),
+            sold=F("sold") + delta,
+            version=F("version") + 1,
+        )
+        if delta:
+            Flight.objects.filter(pk=flight_id).update(
+                tickets_sold=F("tickets_sold") + delta
+            )
+            FlightSearchEntry.objects.filter(pk=flight_id).update(
+                tickets_sold=F("tickets_sold") + delta, updated_at=timezone.now()
+            )
+
+
+def get_inventory(flight, lock=False):
+    """
+    Return the inventory of ``flight``, building it from tickets on first use.
+
+    With ``lock=True`` the row is selected for update, so it must be called
+    inside a transaction.
+    """
+    queryset = SeatInventory.objects.all()
+    if lock:
+        queryset = queryset.select_for_update()
+
+    inventory = queryset.filter(flight_id=flight.pk).first()
+    if inventory is None:
+        try:
+            with transaction.atomic():
+                build_inventory(flight).save(force_insert=True)
+        except IntegrityError:
+            pass
+        inventory = queryset.get(flight_id=flight.pk)
+
+    airplane = flight.airplane
+    if (inventory.rows, inventory.seats_in_row) != (
+        airplane.rows,
+        airplane.seats_in_row,
+    ):
+        inventory = rebuild_inventory(flight)
+    return inventory
+
+
+def mark_seats(inventory, seats):
+    """
+    Return a copy of the inventory's seat map with ``seats`` marked as sold.
+
+    Raises ``SeatUnavailable`` listing every seat that is already taken or
+    out of range.
+    """
+    seat_map = bytearray(inventory.seat_map)
+    conflicts = []
+    for row, seat in seats:
+        if not (1 <= row <= inventory.rows and 1 <= seat <= inventory.seats_in_row):
+            conflicts.append((row, seat))
+            continue
+        index = seat_index(row, seat, inventory.seats_in_row)
+        if is_taken(seat_map, index):
+            conflicts.append((row, seat))
+        else:
+            mark_taken(seat_map, index)
+    if conflicts:
+        raise SeatUnavailable(conflicts)
+    return seat_map
+
+
+def save_reservation(inventory, seats, seat_map, expected_version=None):
+    """
+    Store ``seat_map`` and bump the sold counters of the inventory, of
+    ``Flight.tickets_sold`` and of its flight search entry copy. With
+    ``expected_version`` nothing is written unless the inventory is still at
+    that version; returns whether it was.
+    """
+    queryset = SeatInventory.objects.filter(pk=inventory.pk)
+    if expected_version is not None:
+        queryset = queryset.filter(version=expected_version)
+    updated = queryset.update(
+        seat_map=bytes(seat_map),
+        sold=F("sold") + len(seats),
+        version=F("version") + 1,
+    )
+    if not updated:
+        return False
+    Flight.objects.filter(pk=inventory.flight_id).update(
+        tickets_sold=F("tickets_sold") + len(seats)
+    )
+    FlightSearchEntry.objects.filter(pk=inventory.flight_id).update(
+        tickets_sold=F("tickets_sold") + len(seats), updated_at=timezone.now()
+    )
+    return True
+
+
+def check_inventory(flight):
+    """
+    Compare the stored inventory of ``flight`` with its ticket rows.
+
+    ``unique_ticket_seat_row_flight`` guarantees one ticket per seat, so a
+    consistent inventory has exactly one bit set per ticket. Returns a list of
+    human-readable problems, empty when the inventory is consistent.
+    """
+    problems = []
+    inventory = SeatInventory.objects.filter(flight_id=flight.pk).first()
+    tickets = list(
+        Ticket.objects.filter(flight_id=flight.pk).values_list("row", "seat")
+    )
+    if inventory is None:
+        if tickets:
+            problems.append(f"missing inventory for {len(tickets)} tickets")
+        return problems
+
+    if (inventory.rows, inventory.seats_in_row) != (
+        flight.airplane.rows,
+        flight.airplane.seats_in_row,
+    ):
+        problems.append("inventory dimensions do not match the airplane")
+
+    expected = set(tickets)
+    if len(expected) != len(tickets):
+        problems.append("duplicate tickets for the same seat")
+
+    stored = set(iter_taken(inventory.seat_map, inventory.seats_in_row))
+    for row, seat in sorted(expected - stored):
+        problems.append(f"row {row} seat {seat} is sold but marked free")
+    for row, seat in sorted(stored - expected):
+        problems.append(f"row {row} seat {seat} is marked sold without a ticket")
+
+    if inventory.sold != len(stored):
+        problems.append(
+            f"sold counter is {inventory.sold}, seat map has {len(stored)} seats"
+        )
+    tickets_sold = Flight.objects.values_list("tickets_sold", flat=True).get(
+        pk=flight.pk
+    )
+    if tickets_sold != len(tickets):
+        problems.append(
+            f"tickets_sold is {tickets_sold}, flight has {len(tickets)} tickets"
+        )
+    return problems
+
+
+def run_lengths(seat_map, capacity):
+    """
+    Encode the first ``capacity`` seats as alternating run lengths, starting
+    with a (possibly empty) run of free seats.
+    """
+    runs = []
+    current, length = False, 0
+    for index in range(capacity):
+        taken = is_taken(seat_map, index)
+        if taken != current:
+            runs.append(length)
+            current, length = taken, 0
+        length += 1
+    runs.append(length)
+    return runs
+
+
+def encode_seat_map(inventory, encoding="base64"):
+    """
+    Return the compact seat map payload of an inventory.
+
+    ``base64`` packs one bit per seat, least significant bit first, in
+    row-major order; ``rle`` returns alternating free/taken run lengths.
+    """
+    payload = {
+        "flight": inventory.flight_id,
+        "rows": inventory.rows,
+        "seats_in_row": inventory.seats_in_row,
+        "sold": inventory.sold,
+        "encoding": encoding,
+    }
+    if encoding == "rle":
+        payload["seats"] = run_lengths(inventory.seat_map, inventory.capacity)
+    else:
+        payload["seats"] = base64.b64encode(bytes(inventory.seat_map)).decode()
+    return payload
+
+
+def find_best_seats(seat_map, rows, seats_in_row, count, together=True, blocked=()):
+    """
+    Pick ``count`` free seats in one pass over the seat grid.
+
+    With ``together`` the front-most row with a contiguous block of ``count``
+    free seats wins; otherwise the shortest run of adjacent rows holding
+    enough free seats is used, front-most first. Without ``together`` the
+    first free seats in row-major order are returned. ``blocked`` seats are
+    treated as taken. Returns ``None`` when the flight has too few free seats.
+    """
+    blocked = set(blocked)
+    free_by_row = []
+    for row in range(1, rows + 1):
+        free = []
+        run_start = run_length = 0
+        for seat in range(1, seats_in_row + 1):
+            index = seat_index(row, seat, seats_in_row)
+            if is_taken(seat_map, index) or (row, seat) in blocked:
+                run_length = 0
+                continue
+            free.append(seat)
+            if run_length == 0:
+                run_start = seat
+            run_length += 1
+            if together and run_length == count:
+                return [(row, s) for s in range(run_start, run_start + count)]
+        free_by_row.append(free)
+
+    if sum(len(free) for free in free_by_row) < count:
+        return None
+
+    first_row, last_row = 0, len(free_by_row) - 1
+    if together:
+        window_free = 0
+        start = 0
+        for end, free in enumerate(free_by_row):
+            window_free += len(free)
+            while window_free - len(free_by_row[start]) >= count:
+                window_free -= len(free_by_row[start])
+                start += 1
+            if window_free >= count and end - start < last_row - first_row:
+                first_row, last_row = start, end
+
+    seats = []
+    for row in range(first_row, last_row + 1):
+        for seat in free_by_row[row]:
+            seats.append((row + 1, seat))
+            if len(seats) == count:
+                return seats
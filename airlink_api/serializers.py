@@ -1,16 +1,140 @@
-from django.db import transaction
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
 from rest_framework import serializers
+from rest_framework.fields import SkipField
 
+from airlink_api.autocomplete import autocomplete_settings
+from airlink_api.fragment_cache import (
+    entry_stamp,
+    flight_stamps,
+    fragment_keys,
+    get_fragments,
+    report,
+    set_fragments,
+)
+from airlink_api.geo import geo_settings, route_distance
+from airlink_api.itineraries import RANKINGS
+from airlink_api.locking import get_locking_strategy, SeatContention
 from airlink_api.models import (
+    AIRPLANE_OVERLAP_CONSTRAINT,
     AirplaneType,
     Airplane,
     Airport,
     Crew,
     Route,
     Flight,
+    FlightSearchEntry,
     Order,
     Ticket,
 )
+from airlink_api.reference_cache import REFERENCE_MODELS, cache_enabled, get_instance
+from airlink_api.roster import load_roster, roster_settings, save_roster, solve_roster
+from airlink_api.scheduling import create_schedule, validate_schedule
+from airlink_api.seat_holds import get_seat_hold_store, hold_settings, SeatsHeld
+from airlink_api.seat_inventory import (
+    encode_seat_map,
+    find_best_seats,
+    get_inventory,
+    is_taken,
+    seat_index,
+    SeatUnavailable,
+)
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves reference data from ``airlink_api.reference_cache`` instead of
+    querying. Only for relations whose queryset is the model's full table.
+    """
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        if model not in REFERENCE_MODELS:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = get_instance(model, pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class FragmentCacheListSerializer(serializers.ListSerializer):
+    """Serializes the whole list through ``FragmentCacheMixin``."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return self.child.to_representations(list(iterable))
+
+
+class FragmentCacheMixin:
+    """
+    Caches the representation of each instance without ``volatile_fields``
+    in ``airlink_api.fragment_cache``, keyed by the stamp returned for it by
+    ``get_fragment_stamps``; volatile fields are serialized on every call.
+    Instances without a stamp are serialized without the cache. Pair with
+    ``FragmentCacheListSerializer`` so that a list reads its fragments with
+    one ``get_many``.
+    """
+
+    volatile_fields = ()
+
+    def get_fragment_stamps(self, instances):
+        """``{pk: stamp}`` changing whenever a cached field of the pk changes."""
+        return flight_stamps({instance.pk for instance in instances})
+
+    def to_representation(self, instance):
+        return self.to_representations([instance])[0]
+
+    def to_representations(self, instances):
+        name = type(self).__name__
+        if not cache_enabled():
+            return [
+                super(FragmentCacheMixin, self).to_representation(instance)
+                for instance in instances
+            ]
+        keys = fragment_keys(name, self.get_fragment_stamps(instances))
+        fragments = get_fragments(keys)
+
+        representations, missed = [], {}
+        for instance in instances:
+            fragment = fragments.get(instance.pk)
+            if fragment is None:
+                representation = super().to_representation(instance)
+                missed[instance.pk] = {
+                    field_name: value
+                    for field_name, value in representation.items()
+                    if field_name not in self.volatile_fields
+                }
+            else:
+                representation = self.add_volatile_fields(instance, fragment)
+            representations.append(representation)
+
+        if missed:
+            set_fragments(keys, missed)
+        report(name, len(instances) - len(missed), len(missed))
+        return representations
+
+    def add_volatile_fields(self, instance, fragment):
+        representation = {}
+        for field in self._readable_fields:
+            if field.field_name not in self.volatile_fields:
+                representation[field.field_name] = fragment[field.field_name]
+                continue
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+            representation[field.field_name] = (
+                None if attribute is None else field.to_representation(attribute)
+            )
+        return representation
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -20,6 +144,8 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
 
 
 class AirplaneSerializer(serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     class Meta:
         model = Airplane
         fields = ("id", "name", "rows", "seats_in_row", "airplane_type")
@@ -44,7 +170,58 @@ class AirplaneDetailSerializer(serializers.ModelSerializer):
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city")
+        fields = ("id", "name", "closest_big_city", "latitude", "longitude")
+
+    def validate(self, attrs):
+        latitude = attrs.get("latitude", getattr(self.instance, "latitude", None))
+        longitude = attrs.get("longitude", getattr(self.instance, "longitude", None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError(
+                "Latitude and longitude must be set together."
+            )
+        return attrs
+
+
+class NearbyAirportSerializer(AirportSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Airport
+        fields = AirportSerializer.Meta.fields + ("distance",)
+
+
+class NearbyAirportsSearchSerializer(serializers.Serializer):
+    """Validates the query parameters of a nearby airports lookup."""
+
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_radius(self, value):
+        max_radius = geo_settings()["MAX_RADIUS_KM"]
+        if value > max_radius:
+            raise serializers.ValidationError(f"At most {max_radius} km.")
+        return value
+
+    def validate_limit(self, value):
+        max_limit = geo_settings()["MAX_LIMIT"]
+        if value > max_limit:
+            raise serializers.ValidationError(f"At most {max_limit}.")
+        return value
+
+
+class AirportAutocompleteSerializer(serializers.Serializer):
+    """Validates the query parameters of an airport autocomplete lookup."""
+
+    q = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        max_limit = autocomplete_settings()["MAX_LIMIT"]
+        if value > max_limit:
+            raise serializers.ValidationError(f"At most {max_limit}.")
+        return value
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -53,11 +230,100 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "full_name")
 
 
+class ScheduleRangeSerializer(serializers.Serializer):
+    """Validates the ``?from=&to=`` query parameters of crew schedules."""
+
+    def get_fields(self):
+        return {
+            **super().get_fields(),
+            "from": serializers.DateTimeField(required=False),
+            "to": serializers.DateTimeField(required=False),
+        }
+
+    def validate(self, attrs):
+        start, end = attrs.get("from"), attrs.get("to")
+        if start and end and start >= end:
+            raise serializers.ValidationError({"to": "Must be later than 'from'."})
+        return attrs
+
+
+class CrewDutySerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    rest_before_minutes = serializers.IntegerField(allow_null=True)
+
+
+class CrewScheduleSerializer(serializers.Serializer):
+    crew = serializers.IntegerField()
+    full_name = serializers.CharField()
+    flights = CrewDutySerializer(many=True)
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    """Validates the query parameters of an itinerary search."""
+
+    date = serializers.DateField()
+    max_legs = serializers.IntegerField(min_value=1, max_value=4, required=False)
+    min_connection_minutes = serializers.IntegerField(min_value=0, required=False)
+    rank = serializers.ChoiceField(choices=RANKINGS, default="arrival")
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=5)
+
+    def get_fields(self):
+        return {
+            **super().get_fields(),
+            "from": serializers.PrimaryKeyRelatedField(queryset=Airport.objects.all()),
+            "to": serializers.PrimaryKeyRelatedField(queryset=Airport.objects.all()),
+        }
+
+    def validate(self, attrs):
+        if attrs["from"] == attrs["to"]:
+            raise serializers.ValidationError({"to": "Must differ from 'from'."})
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    distance = serializers.IntegerField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField()
+    distance = serializers.IntegerField()
+    legs = ItineraryLegSerializer(many=True)
+
+
 class RouteSerializer(serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
 
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
+        extra_kwargs = {"distance": {"required": False}}
+
+    def validate(self, attrs):
+        source = attrs.get("source", getattr(self.instance, "source", None))
+        destination = attrs.get(
+            "destination", getattr(self.instance, "destination", None)
+        )
+        if (
+            "distance" not in attrs
+            and self.instance is None
+            and route_distance(source, destination) is None
+        ):
+            raise serializers.ValidationError(
+                {
+                    "distance": "This field is required unless both airports "
+                    "have coordinates."
+                }
+            )
+        return attrs
 
 
 class RouteListSerializer(serializers.ModelSerializer):
@@ -73,7 +339,18 @@ class RouteDetailSerializer(RouteSerializer):
     destination = AirportSerializer(read_only=True)
 
 
+def raise_airplane_overlap(error):
+    """Report a violation of the optional airplane overlap constraint."""
+    if AIRPLANE_OVERLAP_CONSTRAINT not in str(error):
+        raise error
+    raise serializers.ValidationError(
+        {"airplane": ["Airplane is already assigned to an overlapping flight."]}
+    )
+
+
 class FlightSerializer(serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     class Meta:
         model = Flight
         fields = (
@@ -98,6 +375,17 @@ class FlightSerializer(serializers.ModelSerializer):
         if arrival_time and departure_time:
             Flight.validate_time(arrival_time, departure_time)
 
+        airplane = attrs.get("airplane") or (
+            self.instance.airplane if self.instance else None
+        )
+        if airplane and arrival_time and departure_time:
+            Flight.validate_airplane_availability(
+                airplane,
+                departure_time,
+                arrival_time,
+                exclude_flight_id=self.instance.pk if self.instance else None,
+            )
+
         crew = attrs.get("crew") or (
             self.instance.crew.all() if self.instance else None
         )
@@ -111,8 +399,132 @@ class FlightSerializer(serializers.ModelSerializer):
 
         return data
 
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            raise_airplane_overlap(error)
+
+
+class FlightScheduleListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        """
+        Validate the batch against itself and the existing schedule once every
+        flight is valid on its own; errors are reported per flight, in the
+        same list layout as field errors.
+        """
+        flights = super().to_internal_value(data)
+        errors = validate_schedule(flights)
+        if errors:
+            raise serializers.ValidationError(
+                [
+                    {"non_field_errors": errors[index]} if index in errors else {}
+                    for index in range(len(flights))
+                ]
+            )
+        return flights
+
+    def create(self, validated_data):
+        try:
+            return create_schedule(validated_data)
+        except IntegrityError as error:
+            raise_airplane_overlap(error)
+
+
+class FlightScheduleSerializer(serializers.Serializer):
+    """
+    One flight of a bulk schedule. Related objects are plain ids, checked
+    for the whole batch at once by ``FlightScheduleListSerializer``.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    route = serializers.IntegerField(min_value=1, source="route_id")
+    airplane = serializers.IntegerField(min_value=1, source="airplane_id")
+    crew = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, write_only=True
+    )
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+    class Meta:
+        list_serializer_class = FlightScheduleListSerializer
+
+    def validate_crew(self, value):
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs):
+        Flight.validate_time(attrs["arrival_time"], attrs["departure_time"])
+        attrs.setdefault("crew", [])
+        return attrs
+
+
+class AutoAssignCrewSerializer(ScheduleRangeSerializer):
+    """
+    Selects the flights to roster by id or by a departure range and the crew
+    pool to draw from; nothing is written unless ``commit`` is set.
+    """
+
+    flights = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    crew = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    min_crew = serializers.IntegerField(min_value=1, required=False)
+    min_rest_minutes = serializers.IntegerField(min_value=0, required=False)
+    commit = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if not any(key in attrs for key in ("flights", "from", "to")):
+            raise serializers.ValidationError(
+                "Select flights with 'flights' or a 'from'/'to' departure range."
+            )
+        return data
+
+    def create(self, validated_data):
+        config = roster_settings()
+        min_crew = validated_data.get("min_crew", config["MIN_CREW"])
+        min_rest = (
+            validated_data.get("min_rest_minutes", config["MIN_REST_MINUTES"]) * 60
+        )
+
+        flights = Flight.objects.all()
+        if "flights" in validated_data:
+            flights = flights.filter(pk__in=validated_data["flights"])
+        if "from" in validated_data:
+            flights = flights.filter(departure_time__gte=validated_data["from"])
+        if "to" in validated_data:
+            flights = flights.filter(departure_time__lt=validated_data["to"])
+        crew = None
+        if "crew" in validated_data:
+            crew = Crew.objects.filter(pk__in=validated_data["crew"])
+
+        roster_flights, crew_ids, duties = load_roster(flights, crew, min_rest)
+        assignments, unassigned, blocks = solve_roster(
+            roster_flights, crew_ids, duties, min_crew, min_rest
+        )
+        if validated_data["commit"] and assignments:
+            save_roster(roster_flights, assignments)
+        return {
+            "committed": validated_data["commit"],
+            "flights": len(roster_flights),
+            "blocks": blocks,
+            "assigned": [
+                {"flight": flight_id, "crew": crew_ids}
+                for flight_id, crew_ids in sorted(assignments.items())
+            ],
+            "unassigned": sorted(unassigned),
+        }
+
+    def to_representation(self, instance):
+        return instance
+
+
+class FlightListSerializer(FragmentCacheMixin, FlightSerializer):
+    volatile_fields = ("tickets_available",)
 
-class FlightListSerializer(FlightSerializer):
     flight_route = serializers.CharField(read_only=True)
     crew = serializers.StringRelatedField(many=True)
     airplane_name = serializers.CharField(
@@ -131,9 +543,96 @@ class FlightListSerializer(FlightSerializer):
             "arrival_time",
             "tickets_available",
         )
+        list_serializer_class = FragmentCacheListSerializer
+
+
+class FlightSearchEntrySerializer(FragmentCacheMixin, serializers.ModelSerializer):
+    """Same payload as ``FlightListSerializer``, read from the search entry."""
+
+    volatile_fields = ("tickets_available",)
+
+    def get_fragment_stamps(self, instances):
+        return {entry.pk: entry_stamp(entry.content_updated_at) for entry in instances}
+
+    id = serializers.IntegerField(source="flight_id", read_only=True)
+    airplane_name = serializers.CharField(source="airplane_type", read_only=True)
+    tickets_available = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FlightSearchEntry
+        fields = (
+            "id",
+            "crew",
+            "flight_route",
+            "airplane_name",
+            "departure_time",
+            "arrival_time",
+            "tickets_available",
+        )
+        list_serializer_class = FragmentCacheListSerializer
+
+
+class PreloadedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolves flights from ``context["flights"]`` before querying."""
+
+    def to_internal_value(self, data):
+        flights = self.context.get("flights", {})
+        try:
+            return flights[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
+class TicketListSerializer(serializers.ListSerializer):
+    """
+    Loads every flight of the payload, with its airplane, in one query so
+    that seats are validated in memory. Seat availability is checked against
+    the seat inventory on save instead of one uniqueness query per ticket.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            preload_flights(
+                self.context,
+                (item.get("flight") for item in data if isinstance(item, dict)),
+            )
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        seats = [
+            (ticket["flight"].pk, ticket["row"], ticket["seat"]) for ticket in attrs
+        ]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError("Each seat can be booked only once.")
+        return attrs
+
+
+def require_airplane(flight, field="flight"):
+    """Flights whose airplane was deleted have no seats to hold or sell."""
+    if flight.airplane_id is None:
+        raise serializers.ValidationError(
+            {field: f"Flight {flight.pk} has no airplane."}
+        )
+
+
+def preload_flights(context, flight_ids):
+    flights = context.setdefault("flights", {})
+    missing = set()
+    for flight_id in flight_ids:
+        try:
+            flight_id = int(flight_id)
+        except (TypeError, ValueError):
+            continue
+        if flight_id not in flights:
+            missing.add(flight_id)
+    if missing:
+        flights.update(Flight.objects.select_related("airplane").in_bulk(missing))
+    return flights
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PreloadedFlightField(queryset=Flight.objects.select_related("airplane"))
+
     def validate(self, attrs):
         data = super().validate(attrs)
         Ticket.validate_seat(attrs["row"], attrs["seat"], attrs["flight"])
@@ -142,6 +641,8 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight", "order")
+        list_serializer_class = TicketListSerializer
+        validators = []
 
 
 class TicketSeatsSerializer(TicketSerializer):
@@ -150,7 +651,9 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
-class FlightDetailSerializer(FlightSerializer):
+class FlightDetailSerializer(FragmentCacheMixin, FlightSerializer):
+    volatile_fields = ("tickets_available", "taken_places")
+
     flight_route = serializers.CharField(read_only=True)
     crew = CrewSerializer(many=True, read_only=True)
     airplane = AirplaneDetailSerializer(read_only=True)
@@ -171,6 +674,108 @@ class FlightDetailSerializer(FlightSerializer):
         )
 
 
+class FlightDetailCompactSerializer(FlightDetailSerializer):
+    volatile_fields = ("tickets_available", "seatmap")
+
+    seatmap = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "flight_route",
+            "airplane",
+            "departure_time",
+            "arrival_time",
+            "crew",
+            "tickets_available",
+            "seatmap",
+        )
+
+    def get_seatmap(self, obj):
+        if obj.airplane_id is None:
+            return None
+        return encode_seat_map(get_inventory(obj))
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
+    flight = serializers.IntegerField(read_only=True)
+    seats = SeatSerializer(many=True, allow_empty=False)
+    minutes = serializers.IntegerField(min_value=1, required=False, write_only=True)
+    expires_at = serializers.SerializerMethodField()
+
+    def get_expires_at(self, hold):
+        return datetime.fromtimestamp(hold["expires_at"], tz=dt_timezone.utc)
+
+    def validate_minutes(self, value):
+        max_minutes = hold_settings()["MAX_MINUTES"]
+        if value > max_minutes:
+            raise serializers.ValidationError(
+                f"Seats can be held for at most {max_minutes} minutes."
+            )
+        return value
+
+    def validate_seats(self, value):
+        seats = [(seat["row"], seat["seat"]) for seat in value]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError("Each seat can be held only once.")
+        return seats
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        flight = self.context["flight"]
+        require_airplane(flight)
+        for row, seat in attrs["seats"]:
+            Ticket.validate_seat(row, seat, flight)
+
+        inventory = get_inventory(flight)
+        sold = [
+            f"Seat {seat} in row {row} is already sold."
+            for row, seat in attrs["seats"]
+            if is_taken(
+                inventory.seat_map, seat_index(row, seat, flight.airplane.seats_in_row)
+            )
+        ]
+        if sold:
+            raise serializers.ValidationError({"seats": sold})
+        return data
+
+    def create(self, validated_data):
+        minutes = validated_data.get("minutes", hold_settings()["DEFAULT_MINUTES"])
+        try:
+            return get_seat_hold_store().acquire(
+                self.context["flight"].pk,
+                validated_data["seats"],
+                self.context["request"].user.pk,
+                minutes * 60,
+            )
+        except SeatsHeld as error:
+            raise serializers.ValidationError(
+                {
+                    "seats": [
+                        f"Seat {seat} in row {row} is held by another customer."
+                        for row, seat in error.seats
+                    ]
+                }
+            )
+
+    def to_representation(self, instance):
+        return super().to_representation(
+            {
+                **instance,
+                "seats": [
+                    {"row": row, "seat": seat} for row, seat in instance["seats"]
+                ],
+            }
+        )
+
+
 class TicketDetailSerializer(TicketSerializer):
     flight = FlightListSerializer(read_only=True)
 
@@ -180,24 +785,313 @@ class TicketDetailSerializer(TicketSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(read_only=False, many=True, allow_empty=False)
+    tickets = TicketSerializer(
+        read_only=False, many=True, allow_empty=False, required=False
+    )
+    hold = serializers.CharField(write_only=True, required=False)
+    flight = PreloadedFlightField(
+        queryset=Flight.objects.select_related("airplane"),
+        write_only=True,
+        required=False,
+    )
+    count = serializers.IntegerField(min_value=1, write_only=True, required=False)
+    together = serializers.BooleanField(write_only=True, default=False)
 
     class Meta:
         model = Order
-        fields = ("id", "created_at", "tickets", "user")
+        fields = (
+            "id",
+            "created_at",
+            "tickets",
+            "user",
+            "hold",
+            "flight",
+            "count",
+            "together",
+        )
         read_only_fields = (
             "id",
             "user",
         )
 
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if self.instance is not None:
+            # Holds and seat assignment only create orders. ``together`` has
+            # a default, so look at what was actually sent.
+            sent = [
+                name
+                for name in ("hold", "flight", "count", "together")
+                if name in self.initial_data
+            ]
+            if sent:
+                raise serializers.ValidationError(
+                    {name: "Only new orders accept this field." for name in sent}
+                )
+        modes = [
+            mode
+            for mode, present in (
+                ("tickets", bool(attrs.get("tickets"))),
+                ("hold", "hold" in attrs),
+                ("seat assignment", "flight" in attrs or "count" in attrs),
+            )
+            if present
+        ]
+        if len(modes) > 1:
+            raise serializers.ValidationError(
+                "Send exactly one of tickets, a seat hold or flight and count."
+            )
+        if "hold" in attrs:
+            return data
+        if "flight" in attrs or "count" in attrs:
+            if "flight" not in attrs or "count" not in attrs:
+                raise serializers.ValidationError(
+                    "Seat assignment needs both flight and count."
+                )
+            require_airplane(attrs["flight"])
+            return data
+
+        if not attrs.get("tickets"):
+            if self.partial or self.instance is not None:
+                return data
+            raise serializers.ValidationError({"tickets": "This field is required."})
+        self.validate_not_held(attrs["tickets"])
+        return data
+
+    def validate_not_held(self, tickets_data):
+        request = self.context.get("request")
+        user_id = request.user.pk if request else None
+        store = get_seat_hold_store()
+        held_by_flight = {}
+        errors = []
+        for ticket_data in tickets_data:
+            flight_id = ticket_data["flight"].pk
+            if flight_id not in held_by_flight:
+                held_by_flight[flight_id] = store.held_seats(flight_id)
+            holder = held_by_flight[flight_id].get(
+                (ticket_data["row"], ticket_data["seat"])
+            )
+            if holder is not None and holder != user_id:
+                errors.append(
+                    f"Seat {ticket_data['seat']} in row {ticket_data['row']} "
+                    f"on flight {flight_id} is held by another customer."
+                )
+        if errors:
+            raise serializers.ValidationError({"tickets": errors})
+
+    @staticmethod
+    def tickets_from_hold(token, user):
+        """
+        Tickets for the seats of the user's hold. The hold is only consumed
+        once the order commits, so an order that fails keeps it. Must run
+        inside a transaction.
+        """
+        store = get_seat_hold_store()
+        user_id = user.pk if user else None
+        hold = store.peek(token, user_id)
+        if hold is None:
+            raise serializers.ValidationError(
+                {"hold": "Seat hold is unknown, expired or belongs to another user."}
+            )
+        flight = Flight.objects.select_related("airplane").get(pk=hold["flight"])
+        require_airplane(flight, "hold")
+        transaction.on_commit(lambda: store.consume(token, user_id))
+        return [
+            {"flight": flight, "row": row, "seat": seat} for row, seat in hold["seats"]
+        ]
+
+    def get_locking_strategy(self):
+        return get_locking_strategy(self.context.get("locking_strategy"))
+
+    def claim(self, flight, choose, field="tickets"):
+        try:
+            return self.get_locking_strategy().claim(flight, choose)
+        except SeatUnavailable as error:
+            raise serializers.ValidationError(
+                {
+                    field: [
+                        f"Seat {seat} in row {row} on flight {flight.pk} "
+                        f"is not available."
+                        for row, seat in error.seats
+                    ]
+                }
+            )
+        except SeatContention as error:
+            raise serializers.ValidationError({field: [str(error)]})
+
+    def assign_seats(self, flight, count, together, user):
+        """Pick and claim free seats; held seats of others are skipped."""
+        user_id = user.pk if user else None
+        blocked = [
+            seat
+            for seat, holder in get_seat_hold_store().held_seats(flight.pk).items()
+            if holder != user_id
+        ]
+
+        def choose(inventory):
+            seats = find_best_seats(
+                inventory.seat_map,
+                inventory.rows,
+                inventory.seats_in_row,
+                count,
+                together,
+                blocked,
+            )
+            if seats is None:
+                raise serializers.ValidationError(
+                    {"count": f"Flight {flight.pk} has fewer than {count} free seats."}
+                )
+            return seats
+
+        seats = self.claim(flight, choose, field="count")
+        return [{"flight": flight, "row": row, "seat": seat} for row, seat in seats]
+
+    def prepare_order(self, validated_data):
+        """
+        Reserve the seats and insert the order, returning it together with its
+        unsaved tickets. Must run inside a transaction.
+        """
+        validated_data = dict(validated_data)
+        token = validated_data.pop("hold", None)
+        flight = validated_data.pop("flight", None)
+        count = validated_data.pop("count", None)
+        together = validated_data.pop("together", False)
+        if flight is not None:
+            tickets_data = self.assign_seats(
+                flight, count, together, validated_data.get("user")
+            )
+            validated_data.pop("tickets", None)
+        else:
+            if token:
+                tickets_data = self.tickets_from_hold(token, validated_data.get("user"))
+            else:
+                tickets_data = validated_data.pop("tickets")
+            self.reserve_seats(tickets_data)
+        order = Order.objects.create(**validated_data)
+        return order, [
+            Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+        ]
+
     def create(self, validated_data):
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            order, tickets = self.prepare_order(validated_data)
+            self.insert_tickets(tickets)
             return order
 
+    @classmethod
+    def create_batch(cls, orders_data, context, user):
+        """
+        Create many orders in one transaction and return one result per order.
+
+        Each order runs in its own savepoint so a failing order leaves the
+        others intact. Flights are loaded once for the whole batch and the
+        tickets of all orders go in with one ``bulk_create``; should that
+        insert hit a constraint, the batch is replayed inserting per order.
+        """
+        preload_flights(
+            context,
+            (
+                flight_id
+                for order_data in orders_data
+                if isinstance(order_data, dict)
+                for flight_id in [order_data.get("flight")]
+                + [
+                    ticket.get("flight")
+                    for ticket in order_data.get("tickets") or []
+                    if isinstance(ticket, dict)
+                ]
+                if flight_id is not None
+            ),
+        )
+        try:
+            return cls._create_batch(orders_data, context, user, bulk=True)
+        except IntegrityError:
+            return cls._create_batch(orders_data, context, user, bulk=False)
+
+    @classmethod
+    def _create_batch(cls, orders_data, context, user, bulk):
+        results = []
+        created = []
+        with transaction.atomic():
+            for index, order_data in enumerate(orders_data):
+                serializer = cls(data=order_data, context=context)
+                if not serializer.is_valid():
+                    results.append({"index": index, "errors": serializer.errors})
+                    continue
+                try:
+                    with transaction.atomic():
+                        order, tickets = serializer.prepare_order(
+                            {**serializer.validated_data, "user": user}
+                        )
+                        if not bulk:
+                            cls.insert_tickets(tickets)
+                except serializers.ValidationError as error:
+                    results.append({"index": index, "errors": error.detail})
+                    continue
+                created.append((index, order, tickets))
+                results.append(None)
+
+            if bulk and created:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        [ticket for _, _, tickets in created for ticket in tickets]
+                    )
+
+        for index, order, tickets in created:
+            results[index] = {
+                "index": index,
+                "order": {
+                    "id": order.pk,
+                    "created_at": serializers.DateTimeField().to_representation(
+                        order.created_at
+                    ),
+                    "tickets": TicketSerializer(tickets, many=True).data,
+                    "user": order.user_id,
+                },
+            }
+        return results
+
+    @staticmethod
+    def insert_tickets(tickets):
+        """
+        Insert all tickets at once. The seat inventory should have rejected
+        taken seats already, so a constraint violation means it drifted; the
+        violation is mapped back to the seats that are actually taken.
+        """
+        try:
+            with transaction.atomic():
+                return Ticket.objects.bulk_create(tickets)
+        except IntegrityError:
+            requested = {
+                (ticket.flight_id, ticket.row, ticket.seat) for ticket in tickets
+            }
+            taken = Ticket.objects.filter(
+                flight_id__in={flight_id for flight_id, _, _ in requested},
+                row__in={row for _, row, _ in requested},
+                seat__in={seat for _, _, seat in requested},
+            ).values_list("flight_id", "row", "seat")
+            raise serializers.ValidationError(
+                {
+                    "tickets": [
+                        f"Seat {seat} in row {row} on flight {flight_id} "
+                        f"is not available."
+                        for flight_id, row, seat in sorted(set(taken) & requested)
+                    ]
+                }
+            )
+
+    def reserve_seats(self, tickets_data):
+        seats_by_flight = {}
+        for ticket_data in tickets_data:
+            flight = ticket_data["flight"]
+            seats_by_flight.setdefault(flight.pk, (flight, []))[1].append(
+                (ticket_data["row"], ticket_data["seat"])
+            )
+
+        for flight_id in sorted(seats_by_flight):
+            flight, seats = seats_by_flight[flight_id]
+            self.claim(flight, lambda inventory: seats)
+
 
 class OrderDetailSerializer(OrderSerializer):
     tickets = TicketDetailSerializer(read_only=True, many=True)
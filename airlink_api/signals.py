@@ -0,0 +1,243 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from airlink_api import autocomplete, reference_cache
+from airlink_api.crew_schedule import add_intervals, move_intervals, remove_intervals
+from airlink_api.flight_search import dependent_flight_ids, refresh_entries
+from airlink_api.geo import route_distance, update_route_distances
+from airlink_api.itineraries import record_change
+from airlink_api.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+    Ticket,
+)
+from airlink_api.seat_inventory import adjust_seats
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance.previous_seat = (
+        Ticket.objects.filter(pk=instance.pk)
+        .values_list("flight_id", "row", "seat")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def sync_seat_inventory_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the seat inventory and the sold counters in line with tickets
+    saved outside of order creation, e.g. through the admin. Order creation
+    reserves seats itself and inserts tickets with ``bulk_create``, which
+    does not send signals.
+    """
+    if raw:
+        return
+
+    seat = (instance.row, instance.seat)
+    if created:
+        adjust_seats(instance.flight_id, taken=[seat])
+        return
+    previous = getattr(instance, "previous_seat", None)
+    if previous is None or previous == (instance.flight_id, *seat):
+        return
+    if previous[0] == instance.flight_id:
+        adjust_seats(instance.flight_id, taken=[seat], freed=[previous[1:]])
+    else:
+        adjust_seats(previous[0], freed=[previous[1:]])
+        adjust_seats(instance.flight_id, taken=[seat])
+
+
+@receiver(post_delete, sender=Ticket)
+def release_seat_on_delete(sender, instance, **kwargs):
+    adjust_seats(instance.flight_id, freed=[(instance.row, instance.seat)])
+
+
+@receiver(post_save, sender=Flight)
+def move_crew_duty_intervals(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    move_intervals(instance)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def sync_crew_duty_intervals(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mirror changes of ``Flight.crew`` into the crew timeline index."""
+    if action == "post_add" and pk_set:
+        if reverse:
+            add_intervals(pk_set, [instance.pk])
+        else:
+            add_intervals([instance.pk], pk_set)
+    elif action == "post_remove" and pk_set:
+        if reverse:
+            remove_intervals(flight_ids=pk_set, crew_ids=[instance.pk])
+        else:
+            remove_intervals(flight_ids=[instance.pk], crew_ids=pk_set)
+    elif action == "post_clear":
+        if reverse:
+            remove_intervals(crew_ids=[instance.pk])
+        else:
+            remove_intervals(flight_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def publish_flight_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: record_change([instance.pk]))
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def invalidate_flight_version(sender, raw=False, **kwargs):
+    """
+    Bumps the flight version keying cached flight counts and list stamps;
+    deleted flights leave no search entry to stamp the flight list with.
+    """
+    if raw:
+        return
+    reference_cache.record_change(Flight)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def invalidate_flight_crew(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        reference_cache.record_change(Flight)
+
+
+@receiver(post_save, sender=Route)
+@receiver(pre_delete, sender=Route)
+def publish_route_change(sender, instance, raw=False, created=False, **kwargs):
+    """Routes carry the airports and distance of their flights' legs."""
+    if raw or created:
+        return
+    flight_ids = list(instance.flights.values_list("pk", flat=True))
+    transaction.on_commit(lambda: record_change(flight_ids))
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def publish_airport_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(autocomplete.record_change)
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=Crew)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Crew)
+@receiver(post_delete, sender=Route)
+def invalidate_reference_cache(sender, raw=False, **kwargs):
+    if raw:
+        return
+    reference_cache.record_change(sender)
+
+
+# Many-to-many fields of reference models are part of their cached data.
+REFERENCE_RELATIONS = {
+    field.remote_field.through: model
+    for model in reference_cache.REFERENCE_MODELS
+    for field in model._meta.many_to_many
+}
+
+
+def invalidate_reference_relations(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        reference_cache.record_change(REFERENCE_RELATIONS[sender])
+
+
+for through in REFERENCE_RELATIONS:
+    m2m_changed.connect(invalidate_reference_relations, sender=through)
+
+
+@receiver(pre_save, sender=Route)
+def fill_route_distance(sender, instance, raw=False, **kwargs):
+    """Routes between airports with coordinates get the great-circle distance."""
+    if raw:
+        return
+    distance = route_distance(instance.source, instance.destination)
+    if distance is not None:
+        instance.distance = distance
+
+
+@receiver(post_save, sender=Airport)
+def update_airport_route_distances(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if instance.latitude is not None and instance.longitude is not None:
+        update_route_distances([instance.pk])
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_search_entry(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_entries([instance.pk])
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def refresh_flight_search_crew(sender, instance, action, reverse, pk_set, **kwargs):
+    """Crew names are copied into the search entries of their flights."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_entries([instance.pk])
+    elif action == "pre_clear":
+        instance.search_flight_ids = dependent_flight_ids(instance)
+    elif action == "post_clear":
+        refresh_entries(getattr(instance, "search_flight_ids", ()))
+    elif action in ("post_add", "post_remove") and pk_set:
+        refresh_entries(pk_set)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Crew)
+def refresh_flight_search_sources(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    refresh_entries(dependent_flight_ids(instance))
+
+
+@receiver(pre_delete, sender=Route)
+@receiver(pre_delete, sender=Airport)
+@receiver(pre_delete, sender=Airplane)
+@receiver(pre_delete, sender=AirplaneType)
+@receiver(pre_delete, sender=Crew)
+def remember_flight_search_sources(sender, instance, **kwargs):
+    """
+    Deleting these detaches or drops rows without signals for the flights
+    (``SET_NULL`` updates, cascaded crew assignments), so the affected flights
+    are looked up before and refreshed after the delete.
+    """
+    instance.search_flight_ids = dependent_flight_ids(instance)
+
+
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Crew)
+def refresh_flight_search_after_delete(sender, instance, **kwargs):
+    refresh_entries(getattr(instance, "search_flight_ids", ()))
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase, skipIfDBFeature
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Flight
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    detail_url,
+    sample_airplane,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+
+class AirplaneAvailabilityTests(TestCase):
+    def setUp(self):
+        self.airplane = sample_airplane()
+        self.departure = timezone.now() + timedelta(days=1)
+        self.flight = sample_flight(
+            airplane=self.airplane,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=3),
+        )
+
+    def test_overlap_is_one_query(self):
+        with self.assertNumQueries(1):
+            with self.assertRaises(ValidationError) as context:
+                Flight.validate_airplane_availability(
+                    self.airplane,
+                    self.departure + timedelta(hours=2),
+                    self.departure + timedelta(hours=4),
+                )
+
+        self.assertIn(
+            str(self.flight.pk), context.exception.message_dict["airplane"][0]
+        )
+
+    def test_adjacent_flight_is_allowed(self):
+        Flight.validate_airplane_availability(
+            self.airplane,
+            self.departure + timedelta(hours=3),
+            self.departure + timedelta(hours=5),
+        )
+
+    def test_flight_does_not_conflict_with_itself(self):
+        Flight.validate_airplane_availability(
+            self.airplane,
+            self.departure,
+            self.departure + timedelta(hours=4),
+            exclude_flight_id=self.flight.pk,
+        )
+
+    def test_clean_checks_airplane(self):
+        flight = Flight(
+            route=sample_route(),
+            airplane=self.airplane,
+            departure_time=self.departure + timedelta(hours=1),
+            arrival_time=self.departure + timedelta(hours=2),
+        )
+
+        with self.assertRaises(ValidationError):
+            flight.clean()
+
+
+class AirplaneAvailabilityApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+        self.departure = timezone.now() + timedelta(days=1)
+        self.flight = sample_flight(
+            airplane=self.airplane,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=3),
+        )
+
+    def test_create_overlapping_flight(self):
+        payload = {
+            "departure_time": self.departure + timedelta(hours=1),
+            "arrival_time": self.departure + timedelta(hours=4),
+            "airplane": self.airplane.pk,
+            "route": sample_route().pk,
+            "crew": [sample_crew().pk],
+        }
+
+        res = self.client.post(FLIGHT_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("airplane", res.data)
+
+    def test_reschedule_own_flight(self):
+        res = self.client.patch(
+            detail_url(self.flight.pk),
+            {"arrival_time": self.departure + timedelta(hours=4)},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @skipIfDBFeature("has_select_for_update")
+    def test_constraint_command_requires_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command("airplane_overlap_constraint")
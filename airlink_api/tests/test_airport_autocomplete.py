@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.autocomplete import find_airports, get_airport_index, normalize
+from airlink_api.models import Airport
+
+AUTOCOMPLETE_URL = reverse("airlink_api:airport-autocomplete")
+
+
+class AirportAutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_airport_index.cache_clear()
+        self.prat = Airport.objects.create(
+            name="Barcelona–El Prat", closest_big_city="Barcelona"
+        )
+        self.girona = Airport.objects.create(
+            name="Girona–Costa Brava", closest_big_city="Barcelona"
+        )
+        self.zurich = Airport.objects.create(
+            name="Zürich Airport", closest_big_city="Zürich"
+        )
+
+    def names(self, query, limit=None):
+        return [airport["name"] for airport in find_airports(query, limit)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Barcelona–El Prat"), "barcelona el prat")
+        self.assertEqual(normalize("  ZÜRICH "), "zurich")
+
+    def test_name_matches_rank_before_city_and_words(self):
+        self.assertEqual(
+            self.names("barc"), ["Barcelona–El Prat", "Girona–Costa Brava"]
+        )
+        self.assertEqual(self.names("el p"), ["Barcelona–El Prat"])
+        self.assertEqual(self.names("zurich"), ["Zürich Airport"])
+        self.assertEqual(self.names("barc", limit=1), ["Barcelona–El Prat"])
+
+    def test_lookups_do_not_hit_the_database(self):
+        self.names("barc")
+
+        with self.assertNumQueries(0):
+            self.names("gir")
+
+    def test_index_follows_airport_changes(self):
+        self.names("barc")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zurich.name = "Kloten"
+            self.zurich.save()
+        self.assertEqual(self.names("klo"), ["Kloten"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.girona.delete()
+        self.assertEqual(self.names("barc"), ["Barcelona–El Prat"])
+
+
+class AirportAutocompleteApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_airport_index.cache_clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.airport = Airport.objects.create(
+            name="Barcelona–El Prat", closest_big_city="Barcelona"
+        )
+
+    def test_autocomplete(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "prat"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.airport.pk,
+                    "name": "Barcelona–El Prat",
+                    "closest_big_city": "Barcelona",
+                    "latitude": None,
+                    "longitude": None,
+                }
+            ],
+        )
+
+    def test_invalid_limit(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "b", "limit": 1000})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.geo import find_nearby_airports, get_airport_geo_index, haversine
+from airlink_api.models import Route
+from airlink_api.tests.test_airlink_api import sample_airport
+
+NEARBY_URL = reverse("airlink_api:airport-nearby")
+ROUTE_URL = reverse("airlink_api:route-list")
+
+
+def located_airport(latitude, longitude):
+    airport = sample_airport()
+    airport.latitude, airport.longitude = latitude, longitude
+    airport.save()
+    return airport
+
+
+class RouteDistanceTests(TestCase):
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine(0, 0, 0, 1), 111.2, places=1)
+        self.assertAlmostEqual(haversine(50.35, 30.89, 49.01, 2.55), 2036, delta=5)
+
+    def test_distance_is_computed_on_save(self):
+        route = Route.objects.create(
+            source=located_airport(0, 0), destination=located_airport(0, 1), distance=1
+        )
+
+        self.assertEqual(route.distance, 111)
+
+    def test_moving_an_airport_updates_its_routes(self):
+        source = located_airport(0, 0)
+        route = Route.objects.create(
+            source=source, destination=located_airport(0, 1), distance=1
+        )
+
+        source.longitude = -1
+        source.save()
+
+        route.refresh_from_db()
+        self.assertEqual(route.distance, 222)
+
+    def test_api_requires_distance_without_coordinates(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "testpass", is_staff=True
+            )
+        )
+
+        res = client.post(
+            ROUTE_URL,
+            {"source": sample_airport().pk, "destination": sample_airport().pk},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("distance", res.data)
+
+        res = client.post(
+            ROUTE_URL,
+            {
+                "source": located_airport(0, 0).pk,
+                "destination": located_airport(0, 1).pk,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["distance"], 111)
+
+
+class NearbyAirportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_airport_geo_index.cache_clear()
+        self.near = located_airport(0, 0.5)
+        self.far = located_airport(0, 1.5)
+        self.east = located_airport(0, 179.9)
+        self.west = located_airport(0, -179.9)
+        sample_airport()
+
+    def ids(self, latitude, longitude, radius, limit=10):
+        return [
+            airport["id"]
+            for airport in find_nearby_airports(latitude, longitude, radius, limit)
+        ]
+
+    def test_nearest_first_within_radius(self):
+        self.assertEqual(self.ids(0, 0, 100), [self.near.pk])
+        self.assertEqual(self.ids(0, 0, 200), [self.near.pk, self.far.pk])
+        self.assertEqual(self.ids(0, 0, 200, limit=1), [self.near.pk])
+
+    def test_across_the_antimeridian(self):
+        self.assertEqual(self.ids(0, -179.95, 50), [self.west.pk, self.east.pk])
+
+    def test_index_follows_airport_changes(self):
+        self.ids(0, 0, 100)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.far.longitude = 0.1
+            self.far.save()
+
+        self.assertEqual(self.ids(0, 0, 100), [self.far.pk, self.near.pk])
+        with self.assertNumQueries(0):
+            self.ids(0, 0, 100)
+
+    def test_nearby_api(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        res = client.get(NEARBY_URL, {"lat": 0, "lon": 0, "radius": 100})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([airport["id"] for airport in res.data], [self.near.pk])
+        self.assertAlmostEqual(res.data[0]["distance"], 55.6)
+
+        res = client.get(NEARBY_URL, {"lat": 0, "lon": 0, "radius": 100000})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Ticket
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    detail_url,
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+)
+from airlink_api.tests.test_tickets_sold import create_order
+
+AIRPORT_URL = reverse("airlink_api:airport-list")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches["reference"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        # Uncommitted reference changes disable version stamps, so commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight = sample_flight()
+            self.other = sample_flight()
+
+    def etag(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res["ETag"]
+
+    def assertNotModified(self, url, etag, queries=1):
+        with self.assertNumQueries(queries):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_flight_detail(self):
+        url = detail_url(self.flight.pk)
+        res = self.client.get(url)
+
+        self.assertIn("Last-Modified", res)
+        self.assertNotModified(url, res["ETag"])
+        self.assertNotEqual(self.etag(detail_url(self.other.pk)), res["ETag"])
+
+    def test_flight_list(self):
+        etag = self.etag(FLIGHT_URL)
+
+        self.assertNotModified(FLIGHT_URL, etag)
+        self.assertNotEqual(self.etag(f"{FLIGHT_URL}?id={self.flight.pk}"), etag)
+
+    def test_stamps_change_when_tickets_are_sold(self):
+        url = detail_url(self.flight.pk)
+        detail_etag, list_etag = self.etag(url), self.etag(FLIGHT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(self.user, self.flight, [(1, 1)])
+
+        self.assertNotEqual(self.etag(url), detail_etag)
+        self.assertNotEqual(self.etag(FLIGHT_URL), list_etag)
+
+    def test_stamp_changes_when_a_ticket_moves(self):
+        create_order(self.user, self.flight, [(1, 1)])
+        url = detail_url(self.flight.pk)
+        etag = self.etag(url)
+
+        ticket = Ticket.objects.get(flight=self.flight)
+        ticket.row = 2
+        ticket.save()
+
+        self.assertNotEqual(self.etag(url), etag)
+
+    def test_list_stamp_changes_when_a_flight_is_deleted(self):
+        etag = self.etag(FLIGHT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+
+        self.assertNotEqual(self.etag(FLIGHT_URL), etag)
+
+    def test_list_stamp_changes_when_a_flight_sells_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = sample_flight(airplane=sample_airplane(rows=1, seats_in_row=1))
+            # The newest entry stays in the list, so its newest stamp holds.
+            create_order(self.user, self.other, [(1, 1)])
+        url = f"{FLIGHT_URL}?available_only=true"
+        etag = self.etag(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(self.user, flight, [(1, 1)])
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn(flight.pk, [row["id"] for row in res.data["results"]])
+
+    def test_sales_outside_the_filter_keep_the_list_stamp(self):
+        url = f"{FLIGHT_URL}?id={self.flight.pk}"
+        etag = self.etag(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(self.user, self.other, [(1, 1)])
+
+        self.assertNotModified(url, etag)
+
+    def test_list_stamp_changes_when_a_city_filter_stops_matching(self):
+        source = self.flight.route.source
+        with self.captureOnCommitCallbacks(execute=True):
+            for airport in (source, self.other.route.source):
+                airport.closest_big_city = "Shared"
+                airport.save()
+        url = f"{FLIGHT_URL}?source_city=Shared"
+        etag = self.etag(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            source.closest_big_city = "Elsewhere"
+            source.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in res.data["results"]], [self.other.pk])
+
+    def test_reference_data(self):
+        etag = self.etag(AIRPORT_URL)
+
+        self.assertNotModified(AIRPORT_URL, etag, queries=0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_airport()
+        self.assertNotEqual(self.etag(AIRPORT_URL), etag)
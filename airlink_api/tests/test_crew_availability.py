@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from airlink_api.models import Flight
+from airlink_api.serializers import FlightSerializer
+from airlink_api.tests.test_airlink_api import (
+    sample_airplane,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+
+class CrewAvailabilityTests(TestCase):
+    def setUp(self):
+        self.departure = timezone.now() + timedelta(days=1)
+        self.crew = [sample_crew() for _ in range(6)]
+        self.busy_flight = sample_flight(
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=3),
+        )
+        self.busy_flight.crew.set(self.crew[:2])
+
+    def test_single_query_reports_all_conflicts(self):
+        with self.assertNumQueries(1):
+            with self.assertRaises(ValidationError) as context:
+                Flight.validate_crew_availability(
+                    self.crew,
+                    self.departure + timedelta(hours=1),
+                    self.departure + timedelta(hours=4),
+                )
+
+        self.assertEqual(len(context.exception.messages), 2)
+        for crew_member in self.crew[:2]:
+            self.assertTrue(
+                any(
+                    str(crew_member) in message
+                    for message in context.exception.messages
+                )
+            )
+
+    def test_adjacent_flights_do_not_conflict(self):
+        Flight.validate_crew_availability(
+            self.crew,
+            self.departure + timedelta(hours=3),
+            self.departure + timedelta(hours=5),
+        )
+
+    def test_flight_does_not_conflict_with_itself(self):
+        Flight.validate_crew_availability(
+            self.crew,
+            self.departure,
+            self.departure + timedelta(hours=3),
+            exclude_flight_id=self.busy_flight.pk,
+        )
+
+    def test_serializer_surfaces_conflicts(self):
+        serializer = FlightSerializer(
+            data={
+                "route": sample_route().id,
+                "airplane": sample_airplane().id,
+                "crew": [crew_member.id for crew_member in self.crew],
+                "departure_time": self.departure + timedelta(hours=2),
+                "arrival_time": self.departure + timedelta(hours=6),
+            }
+        )
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(serializer.errors["non_field_errors"]), 2)
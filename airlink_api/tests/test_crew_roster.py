@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.crew_schedule import crew_schedule
+from airlink_api.models import Flight
+from airlink_api.roster import RosterFlight, solve_roster, split_blocks
+from airlink_api.tests.test_airlink_api import sample_crew, sample_flight
+
+AUTO_ASSIGN_URL = reverse("airlink_api:flight-auto-assign-crew")
+
+HOUR = 3600
+
+
+def roster_flight(flight_id, start_hour, hours, assigned=()):
+    return RosterFlight(
+        flight_id, start_hour * HOUR, (start_hour + hours) * HOUR, frozenset(assigned)
+    )
+
+
+class SolveRosterTests(SimpleTestCase):
+    def test_crew_rest_between_flights(self):
+        flights = [roster_flight(1, 0, 2), roster_flight(2, 2.5, 2)]
+
+        assignments, unassigned, _ = solve_roster(
+            flights, [1, 2, 3, 4], min_crew=2, min_rest=HOUR
+        )
+
+        self.assertEqual(unassigned, [])
+        self.assertFalse(set(assignments[1]) & set(assignments[2]))
+
+    def test_crew_reused_after_rest(self):
+        flights = [roster_flight(1, 0, 2), roster_flight(2, 3, 2)]
+
+        assignments, unassigned, _ = solve_roster(
+            flights, [1, 2], min_crew=2, min_rest=HOUR
+        )
+
+        self.assertEqual(unassigned, [])
+        self.assertEqual(sorted(assignments[2]), [1, 2])
+
+    def test_existing_duties_and_crew_are_respected(self):
+        flights = [roster_flight(1, 0, 2, assigned=[3])]
+        duties = {1: ([1 * HOUR], [4 * HOUR])}
+
+        assignments, unassigned, _ = solve_roster(
+            flights, [1, 2, 3], duties, min_crew=2, min_rest=0
+        )
+
+        self.assertEqual(assignments, {1: [2]})
+
+    def test_unstaffed_flights_are_reported(self):
+        flights = [roster_flight(1, 0, 2), roster_flight(2, 1, 2)]
+
+        assignments, unassigned, _ = solve_roster(flights, [1, 2, 3], min_crew=2)
+
+        self.assertEqual(list(assignments), [1])
+        self.assertEqual(unassigned, [2])
+
+    def test_blocks_are_split_on_rest_gaps(self):
+        flights = [
+            roster_flight(1, 0, 2),
+            roster_flight(2, 1, 3),
+            roster_flight(3, 5, 1),
+            roster_flight(4, 6.5, 1),
+        ]
+
+        blocks = split_blocks(flights, HOUR)
+
+        self.assertEqual([[f.id for f in block] for block in blocks], [[1, 2], [3, 4]])
+
+    def test_process_pool_gives_same_roster(self):
+        flights = [
+            roster_flight(day * 10 + index, day * 24 + index, 3)
+            for day in range(4)
+            for index in range(6)
+        ]
+
+        single = solve_roster(flights, range(1, 20), min_crew=3, workers=1)
+        pooled = solve_roster(flights, range(1, 20), min_crew=3, workers=2)
+
+        self.assertEqual(single, pooled)
+        self.assertEqual(single[2], 4)
+
+
+class AutoAssignCrewApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        start = timezone.now() + timedelta(days=1)
+        self.flights = [
+            sample_flight(
+                departure_time=start + timedelta(hours=offset),
+                arrival_time=start + timedelta(hours=offset + 2),
+            )
+            for offset in (0, 1)
+        ]
+        self.crew = [sample_crew() for _ in range(4)]
+        self.payload = {
+            "flights": [flight.pk for flight in self.flights],
+            "crew": [member.pk for member in self.crew],
+            "min_crew": 3,
+        }
+
+    def test_dry_run(self):
+        res = self.client.post(AUTO_ASSIGN_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data["committed"])
+        self.assertEqual(len(res.data["assigned"]), 2)
+        self.assertEqual(
+            Flight.crew.through.objects.filter(crew__in=self.crew).count(), 0
+        )
+
+    def test_commit(self):
+        res = self.client.post(
+            AUTO_ASSIGN_URL, {**self.payload, "commit": True}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for flight in self.flights:
+            self.assertEqual(flight.crew.count(), 3)
+        for item in res.data["assigned"]:
+            for crew_id in item["crew"]:
+                self.assertEqual(
+                    [entry["flight"] for entry in crew_schedule(crew_id)],
+                    [item["flight"]],
+                )
+
+    def test_requires_flight_selection(self):
+        res = self.client.post(AUTO_ASSIGN_URL, {"min_crew": 2}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@user.com", "testpass")
+        )
+
+        res = self.client.post(AUTO_ASSIGN_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.crew_schedule import crew_schedule
+from airlink_api.models import CrewDutyInterval
+from airlink_api.tests.test_airlink_api import sample_crew, sample_flight
+
+SCHEDULES_URL = reverse("airlink_api:crew-schedules")
+
+
+def schedule_url(crew_id):
+    return reverse("airlink_api:crew-schedule", args=[crew_id])
+
+
+class CrewScheduleIndexTests(TestCase):
+    def setUp(self):
+        self.crew = sample_crew()
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.flights = []
+        for offset in (0, 5, 12):
+            flight = sample_flight(
+                departure_time=self.start + timedelta(hours=offset),
+                arrival_time=self.start + timedelta(hours=offset + 3),
+            )
+            flight.crew.add(self.crew)
+            self.flights.append(flight)
+
+    def test_schedule_is_sorted_with_rest_gaps(self):
+        schedule = crew_schedule(self.crew.pk)
+
+        self.assertEqual(
+            [entry["flight"] for entry in schedule],
+            [flight.pk for flight in self.flights],
+        )
+        self.assertEqual(
+            [entry["rest_before_minutes"] for entry in schedule], [None, 120, 240]
+        )
+
+    def test_range_returns_overlapping_flights(self):
+        schedule = crew_schedule(
+            self.crew.pk,
+            self.start + timedelta(hours=2),
+            self.start + timedelta(hours=6),
+        )
+
+        self.assertEqual(
+            [entry["flight"] for entry in schedule],
+            [self.flights[0].pk, self.flights[1].pk],
+        )
+
+    def test_crew_changes_update_index(self):
+        self.flights[1].crew.remove(self.crew)
+        self.assertEqual(len(crew_schedule(self.crew.pk)), 2)
+
+        self.crew.flight_set.clear()
+        self.assertEqual(crew_schedule(self.crew.pk), [])
+
+        self.crew.flight_set.add(self.flights[2])
+        self.assertEqual(
+            [entry["flight"] for entry in crew_schedule(self.crew.pk)],
+            [self.flights[2].pk],
+        )
+
+    def test_flight_time_changes_update_index(self):
+        flight = self.flights[0]
+        flight.departure_time += timedelta(hours=20)
+        flight.arrival_time += timedelta(hours=20)
+        flight.save()
+
+        self.assertEqual(crew_schedule(self.crew.pk)[-1]["flight"], flight.pk)
+
+    def test_rebuild_command(self):
+        CrewDutyInterval.objects.all().delete()
+
+        call_command("rebuild_crew_schedule", stdout=StringIO())
+
+        self.assertEqual(len(crew_schedule(self.crew.pk)), 3)
+
+    def test_schedule_is_one_query(self):
+        with self.assertNumQueries(1):
+            crew_schedule(self.crew.pk, self.start, self.start + timedelta(days=1))
+
+
+class CrewScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.crew = sample_crew()
+        self.start = timezone.now() + timedelta(days=1)
+        self.flight = sample_flight(
+            departure_time=self.start,
+            arrival_time=self.start + timedelta(hours=3),
+        )
+        self.flight.crew.add(self.crew)
+
+    def test_schedule(self):
+        res = self.client.get(schedule_url(self.crew.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["crew"], self.crew.pk)
+        self.assertEqual(res.data["full_name"], self.crew.full_name)
+        self.assertEqual(res.data["flights"][0]["flight"], self.flight.pk)
+
+    def test_schedule_range_excludes_other_flights(self):
+        res = self.client.get(
+            schedule_url(self.crew.pk),
+            {"from": (self.start + timedelta(hours=4)).isoformat()},
+        )
+
+        self.assertEqual(res.data["flights"], [])
+
+    def test_invalid_range(self):
+        res = self.client.get(
+            schedule_url(self.crew.pk),
+            {"from": self.start.isoformat(), "to": self.start.isoformat()},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schedules(self):
+        other = sample_crew()
+
+        res = self.client.get(SCHEDULES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        schedules = {item["crew"]: item["flights"] for item in res.data["results"]}
+        self.assertEqual(len(schedules[self.crew.pk]), 1)
+        self.assertEqual(schedules[other.pk], [])
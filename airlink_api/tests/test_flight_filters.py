@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+
+class FlightFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+
+        self.start = timezone.now() + timedelta(days=1)
+        kyiv = sample_airport(closest_big_city="Kyiv")
+        paris = sample_airport(closest_big_city="Paris")
+        london = sample_airport(closest_big_city="London")
+        self.kyiv_paris = self.flight(sample_route(source=kyiv, destination=paris), 0)
+        self.kyiv_london = self.flight(
+            sample_route(source=kyiv, destination=london), 24
+        )
+        self.paris_kyiv = self.flight(sample_route(source=paris, destination=kyiv), 48)
+
+    def flight(self, route, hours):
+        departure = self.start + timedelta(hours=hours)
+        return sample_flight(
+            route=route,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=3),
+        )
+
+    def search(self, **params):
+        res = self.client.get(FLIGHT_URL, params)
+        return {flight["id"] for flight in res.data["results"]}
+
+    def test_filter_by_city_pair(self):
+        self.assertEqual(
+            self.search(source_city="kyiv"),
+            {self.kyiv_paris.pk, self.kyiv_london.pk},
+        )
+        self.assertEqual(
+            self.search(source_city="Kyiv", destination_city="Paris"),
+            {self.kyiv_paris.pk},
+        )
+
+    def test_filter_by_departure_window(self):
+        self.assertEqual(
+            self.search(
+                departure_after=(self.start + timedelta(hours=12)).isoformat(),
+                departure_before=(self.start + timedelta(hours=48)).isoformat(),
+            ),
+            {self.kyiv_london.pk},
+        )
+
+    def test_filter_available_only(self):
+        self.kyiv_paris.airplane = sample_airplane(rows=1, seats_in_row=2)
+        self.kyiv_paris.tickets_sold = 2
+        self.kyiv_paris.save()
+
+        self.assertEqual(
+            self.search(available_only="true"),
+            {self.kyiv_london.pk, self.paris_kyiv.pk},
+        )
+        self.assertEqual(len(self.search(available_only="false")), 3)
+
+    def test_exact_filters_still_work(self):
+        self.assertEqual(
+            self.search(route__id=self.paris_kyiv.route_id), {self.paris_kyiv.pk}
+        )
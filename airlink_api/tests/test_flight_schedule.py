@@ -0,0 +1,149 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.crew_schedule import crew_schedule
+from airlink_api.models import Flight
+from airlink_api.scheduling import Interval, find_overlaps
+from airlink_api.tests.test_airlink_api import (
+    sample_airplane,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+SCHEDULE_URL = reverse("airlink_api:flight-schedule")
+
+
+class FindOverlapsTests(TestCase):
+    def test_overlaps_per_resource(self):
+        start = timezone.now()
+        hour = timedelta(hours=1)
+        first = Interval("crew", 1, start, start + 3 * hour, 10, None)
+        second = Interval("crew", 1, start + 2 * hour, start + 4 * hour, None, 0)
+        adjacent = Interval("crew", 1, start + 4 * hour, start + 5 * hour, None, 1)
+        other_crew = Interval("crew", 2, start, start + 3 * hour, None, 2)
+        airplane = Interval("airplane", 1, start, start + 3 * hour, None, 3)
+
+        overlaps = list(find_overlaps([adjacent, second, first, other_crew, airplane]))
+
+        self.assertEqual(overlaps, [(first, second)])
+
+
+class FlightScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.crew = [sample_crew() for _ in range(3)]
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+
+    def flight_payload(self, offset, airplane=None, crew=None, hours=3):
+        departure_time = self.start + timedelta(hours=offset)
+        return {
+            "route": self.route.pk,
+            "airplane": (airplane or self.airplane).pk,
+            "crew": [member.pk for member in (crew or self.crew)],
+            "departure_time": departure_time.isoformat(),
+            "arrival_time": (departure_time + timedelta(hours=hours)).isoformat(),
+        }
+
+    def test_schedule_creates_flights_in_bulk(self):
+        payload = [self.flight_payload(offset) for offset in range(0, 40, 4)]
+
+        # Three of them build the flight search entries.
+        with self.assertNumQueries(12):
+            res = self.client.post(SCHEDULE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 10)
+        flight = Flight.objects.get(pk=res.data["results"][0]["id"])
+        self.assertEqual(set(flight.crew.all()), set(self.crew))
+        self.assertEqual(len(crew_schedule(self.crew[0].pk)), 10)
+
+    def test_conflicts_inside_batch(self):
+        other_airplane = sample_airplane()
+        payload = [
+            self.flight_payload(0),
+            self.flight_payload(2, airplane=other_airplane, crew=self.crew[:1]),
+            self.flight_payload(5, crew=self.crew[1:]),
+        ]
+
+        res = self.client.post(SCHEDULE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([bool(error) for error in res.data], [True, True, False])
+        self.assertIn("flight #0 of this batch", res.data[1]["non_field_errors"][0])
+        self.assertFalse(Flight.objects.exists())
+
+    def test_conflicts_with_existing_flights(self):
+        existing = sample_flight(
+            airplane=self.airplane,
+            departure_time=self.start + timedelta(hours=1),
+            arrival_time=self.start + timedelta(hours=2),
+        )
+
+        res = self.client.post(
+            SCHEDULE_URL, [self.flight_payload(0, crew=[])], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        message = res.data[0]["non_field_errors"][0]
+        self.assertIn(f"flight {existing.pk}", message)
+
+    def test_unknown_references(self):
+        payload = self.flight_payload(0)
+        payload["crew"] = [999999]
+
+        res = self.client.post(SCHEDULE_URL, [payload], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data[0]["non_field_errors"],
+            ["Crew member 999999 does not exist."],
+        )
+
+    def test_invalid_flight_time(self):
+        payload = self.flight_payload(0, hours=-1)
+
+        res = self.client.post(SCHEDULE_URL, [payload], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("arrival_time", res.data[0])
+
+    def test_schedule_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@user.com", "testpass")
+        )
+
+        res = self.client.post(SCHEDULE_URL, [self.flight_payload(0)], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_schedule_command(self):
+        payload = [self.flight_payload(0), self.flight_payload(4)]
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as file:
+            json.dump(payload, file)
+            file.flush()
+
+            call_command("schedule_flights", file.name, "--dry-run", stdout=StringIO())
+            self.assertFalse(Flight.objects.exists())
+
+            call_command("schedule_flights", file.name, stdout=StringIO())
+            self.assertEqual(Flight.objects.count(), 2)
+
+            with self.assertRaises(CommandError):
+                call_command("schedule_flights", file.name, stdout=StringIO())
@@ -0,0 +1,107 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import FlightSearchEntry, Ticket
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    sample_crew,
+    sample_flight,
+)
+from airlink_api.tests.test_tickets_sold import create_order
+
+
+class FlightSearchEntryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.flight = sample_flight()
+        self.route = self.flight.route
+        self.airplane = self.flight.airplane
+
+    def entry(self):
+        return FlightSearchEntry.objects.get(flight=self.flight)
+
+    def test_entry_copies_flight(self):
+        entry = self.entry()
+
+        self.assertEqual(entry.flight_route, str(self.route))
+        self.assertEqual(entry.source_city, self.route.source.closest_big_city)
+        self.assertEqual(entry.airplane_type, self.airplane.airplane_type.name)
+        self.assertEqual(entry.tickets_available, self.airplane.capacity)
+        self.assertEqual(entry.crew, [str(self.flight.crew.get())])
+        self.assertEqual(entry.departure_time, self.flight.departure_time)
+
+    def test_related_changes_are_copied(self):
+        self.route.source.name = "Renamed airport"
+        self.route.source.save()
+        self.airplane.airplane_type.name = "Renamed type"
+        self.airplane.airplane_type.save()
+        member = self.flight.crew.get()
+        member.last_name = "Renamed"
+        member.save()
+
+        entry = self.entry()
+        self.assertTrue(entry.flight_route.startswith("Renamed airport - "))
+        self.assertEqual(entry.airplane_type, "Renamed type")
+        self.assertEqual(entry.crew, [str(member)])
+
+    def test_crew_changes_are_copied(self):
+        member = sample_crew()
+        member.flight_set.add(self.flight)
+        self.assertEqual(len(self.entry().crew), 2)
+
+        member.delete()
+        self.assertEqual(len(self.entry().crew), 1)
+
+        self.flight.crew.clear()
+        self.assertEqual(self.entry().crew, [])
+
+    def test_deleted_route_and_airplane(self):
+        self.route.delete()
+        self.airplane.delete()
+
+        entry = self.entry()
+        self.assertIsNone(entry.flight_route)
+        self.assertIsNone(entry.tickets_available)
+
+    def test_orders_update_tickets_sold(self):
+        create_order(self.user, self.flight, [(1, 1), (1, 2)])
+        self.assertEqual(self.entry().tickets_sold, 2)
+
+        Ticket.objects.get(row=1, seat=2).delete()
+        self.assertEqual(self.entry().tickets_sold, 1)
+
+    def test_rebuild_command(self):
+        FlightSearchEntry.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_flight_search", stdout=out)
+
+        self.assertIn("1 entries", out.getvalue())
+        self.assertEqual(self.entry().crew, [str(self.flight.crew.get())])
+
+
+class FlightSearchListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        for _ in range(3):
+            sample_flight()
+
+    def test_list_reads_only_search_entries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 3)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(
+            any('"airlink_api_flight"' in query["sql"] for query in queries)
+        )
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from airlink_api.fragment_cache import get_stats, reset_stats
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    detail_url,
+    sample_crew,
+    sample_flight,
+)
+from airlink_api.tests.test_tickets_sold import create_order
+
+LIST = "FlightSearchEntrySerializer"
+DETAIL = "FlightDetailSerializer"
+
+reported = []
+
+
+def collect_stats(name, hits, misses):
+    reported.append((name, hits, misses))
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        caches["reference"].clear()
+        caches["fragments"].clear()
+        reset_stats()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        # Fragments are disabled while flight changes are uncommitted.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flights = [sample_flight() for _ in range(3)]
+        self.flight = self.flights[0]
+
+    def stats(self, name):
+        counts = get_stats()[name]
+        return counts["hits"], counts["misses"]
+
+    def test_list_serializes_only_misses(self):
+        first = self.client.get(FLIGHT_URL).data["results"]
+        self.assertEqual(self.stats(LIST), (0, 3))
+
+        fragments = caches["fragments"]
+        with mock.patch.object(
+            fragments, "get_many", wraps=fragments.get_many
+        ) as get_many:
+            second = self.client.get(FLIGHT_URL).data["results"]
+
+        get_many.assert_called_once()
+        self.assertEqual(second, first)
+        self.assertEqual(self.stats(LIST), (3, 3))
+        self.assertEqual(get_stats()[LIST]["ratio"], 0.5)
+
+    def test_volatile_fields_are_not_cached(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(detail_url(self.flight.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(self.user, self.flight, [(1, 1)])
+
+        rows = {row["id"]: row for row in self.client.get(FLIGHT_URL).data["results"]}
+        detail = self.client.get(detail_url(self.flight.pk)).data
+        self.assertEqual(
+            rows[self.flight.pk]["tickets_available"],
+            self.flight.airplane.capacity - 1,
+        )
+        self.assertEqual(detail["taken_places"], [{"row": 1, "seat": 1}])
+        # Sales change only volatile fields, so every fragment is reused.
+        self.assertEqual(self.stats(LIST), (3, 3))
+        self.assertEqual(self.stats(DETAIL), (1, 1))
+
+    def test_seat_moves_keep_the_detail_fragment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = create_order(self.user, self.flight, [(1, 1)])
+        self.client.get(detail_url(self.flight.pk))
+
+        ticket = order.tickets.get()
+        ticket.row = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+
+        detail = self.client.get(detail_url(self.flight.pk)).data
+        self.assertEqual(detail["taken_places"], [{"row": 2, "seat": 1}])
+        self.assertEqual(self.stats(DETAIL), (1, 1))
+
+    def test_flight_changes_invalidate_fragments(self):
+        other = self.flights[1]
+        self.client.get(detail_url(self.flight.pk))
+        self.client.get(detail_url(other.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.crew.add(sample_crew())
+
+        detail = self.client.get(detail_url(self.flight.pk)).data
+        self.client.get(detail_url(other.pk))
+        self.assertEqual(len(detail["crew"]), 2)
+        self.assertEqual(self.stats(DETAIL), (1, 3))
+
+    def test_reference_changes_invalidate_fragments(self):
+        self.client.get(FLIGHT_URL)
+
+        source = self.flight.route.source
+        source.name = "Renamed airport"
+        with self.captureOnCommitCallbacks(execute=True):
+            source.save()
+
+        rows = {row["id"]: row for row in self.client.get(FLIGHT_URL).data["results"]}
+        self.assertTrue(
+            rows[self.flight.pk]["flight_route"].startswith("Renamed airport - ")
+        )
+        # Flights on other routes keep their fragments.
+        self.assertEqual(self.stats(LIST), (2, 4))
+
+    @override_settings(
+        FRAGMENT_CACHE={
+            "CACHE_ALIAS": "fragments",
+            "STATS_HOOK": "airlink_api.tests.test_fragment_cache.collect_stats",
+        }
+    )
+    def test_stats_hook(self):
+        reported.clear()
+
+        self.client.get(detail_url(self.flight.pk))
+        self.client.get(detail_url(self.flight.pk))
+
+        self.assertEqual(reported, [(DETAIL, 0, 1), (DETAIL, 1, 0)])
+        self.assertEqual(get_stats(), {})
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.idempotency import get_idempotency_store
+from airlink_api.models import IdempotencyRecord, Order, Ticket
+from airlink_api.tests.test_airlink_api import sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class IdempotencyKeyTestsMixin:
+    def setUp(self):
+        get_idempotency_store.cache_clear()
+        self.addCleanup(get_idempotency_store.cache_clear)
+        cache.clear()
+        self.store = get_idempotency_store()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def order(self, key, row=1, seat=1):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": row, "seat": seat, "flight": self.flight.id}]},
+            format="json",
+            headers={"Idempotency-Key": key},
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.order("key-1")
+        with mock.patch("airlink_api.serializers.OrderSerializer.is_valid") as is_valid:
+            retry = self.order("key-1")
+
+        is_valid.assert_not_called()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_validation_errors_are_replayed_too(self):
+        self.order("taken")
+        first = self.order("key-2")
+        retry = self.order("key-2")
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_with_other_payload(self):
+        self.order("key-3")
+
+        res = self.order("key-3", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_keys_are_scoped_per_user(self):
+        self.order("shared")
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "testpass")
+        )
+
+        res = self.order("shared", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    @override_settings(IDEMPOTENCY={"WAIT": 0})
+    def test_in_flight_duplicate_is_not_executed(self):
+        self.store.lock(f"order:{self.user.pk}:busy")
+
+        res = self.order("busy")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+
+class CacheIdempotencyStoreTests(IdempotencyKeyTestsMixin, TestCase):
+    pass
+
+
+@override_settings(
+    IDEMPOTENCY={"STORE": "airlink_api.idempotency.DatabaseIdempotencyStore"}
+)
+class DatabaseIdempotencyStoreTests(IdempotencyKeyTestsMixin, TestCase):
+    def test_expired_records_are_evicted(self):
+        self.order("old")
+        IdempotencyRecord.objects.update(expires_at="2000-01-01T00:00:00Z")
+
+        self.order("new", seat=2)
+
+        self.assertEqual(
+            list(IdempotencyRecord.objects.values_list("key", flat=True)),
+            [f"order:{self.user.pk}:new"],
+        )
@@ -0,0 +1,182 @@
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.itineraries import FlightGraph, find_itineraries, get_flight_graph
+from airlink_api.tests.test_airlink_api import (
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+ITINERARY_URL = reverse("airlink_api:itinerary-list")
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_flight_graph.cache_clear()
+        self.day = timezone.now().date() + timedelta(days=2)
+        self.midnight = timezone.make_aware(datetime.combine(self.day, time.min))
+        self.a, self.b, self.c = (sample_airport() for _ in range(3))
+        self.ab = sample_route(source=self.a, destination=self.b, distance=300)
+        self.bc = sample_route(source=self.b, destination=self.c, distance=300)
+        self.ac = sample_route(source=self.a, destination=self.c, distance=1000)
+
+        self.direct = self.flight(self.ac, 8, 4)
+        self.first_leg = self.flight(self.ab, 6, 1)
+        self.second_leg = self.flight(self.bc, 8, 1)
+
+    def flight(self, route, hour, hours):
+        departure = self.midnight + timedelta(hours=hour)
+        return sample_flight(
+            route=route,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+        )
+
+    def search(self, **options):
+        return find_itineraries(
+            self.a.pk,
+            self.c.pk,
+            self.midnight,
+            self.midnight + timedelta(days=1),
+            **options,
+        )
+
+    def flight_ids(self, itineraries):
+        return [[leg.flight for leg in legs] for legs in itineraries]
+
+    def test_rank_by_arrival(self):
+        self.assertEqual(
+            self.flight_ids(self.search()),
+            [[self.first_leg.pk, self.second_leg.pk], [self.direct.pk]],
+        )
+
+    def test_rank_by_distance(self):
+        self.assertEqual(
+            self.flight_ids(self.search(rank="distance")),
+            [[self.first_leg.pk, self.second_leg.pk], [self.direct.pk]],
+        )
+        self.ab.distance = 900
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ab.save()
+
+        self.assertEqual(
+            self.flight_ids(self.search(rank="distance"))[0], [self.direct.pk]
+        )
+
+    def test_min_connection_time(self):
+        self.assertEqual(
+            self.flight_ids(self.search(min_connection=2 * 3600)),
+            [[self.direct.pk]],
+        )
+
+    def test_max_legs(self):
+        self.assertEqual(self.flight_ids(self.search(max_legs=1)), [[self.direct.pk]])
+
+    def test_graph_is_updated_incrementally(self):
+        self.search()
+        graph = get_flight_graph()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            later = self.flight(self.ac, 3, 2)
+        with mock.patch.object(
+            FlightGraph, "rebuild", side_effect=AssertionError("rebuilt")
+        ):
+            itineraries = self.search()
+
+        self.assertEqual(itineraries[0][0].flight, later.pk)
+        self.assertIn(later.pk, graph.legs)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            later.delete()
+        self.assertNotIn(later.pk, [legs[0].flight for legs in self.search()])
+
+    def test_graph_rebuilds_after_lost_changes(self):
+        self.search()
+        with self.captureOnCommitCallbacks(execute=True):
+            later = self.flight(self.ac, 3, 2)
+        cache.delete_many([f"itineraries:change:{v}" for v in range(100)])
+
+        self.assertEqual(self.search()[0][0].flight, later.pk)
+
+
+class ItineraryApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_flight_graph.cache_clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.day = timezone.now().date() + timedelta(days=2)
+        departure = timezone.make_aware(datetime.combine(self.day, time(10)))
+        self.flight = sample_flight(
+            route=self.route,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=2),
+        )
+
+    def test_search(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {
+                "from": self.route.source_id,
+                "to": self.route.destination_id,
+                "date": self.day.isoformat(),
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        itinerary = res.data[0]
+        self.assertEqual(itinerary["duration_minutes"], 120)
+        self.assertEqual(itinerary["distance"], self.route.distance)
+        self.assertEqual(itinerary["legs"][0]["flight"], self.flight.pk)
+        self.assertEqual(itinerary["legs"][0]["source"], self.route.source.name)
+
+    def test_other_date_has_no_itineraries(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {
+                "from": self.route.source_id,
+                "to": self.route.destination_id,
+                "date": (self.day + timedelta(days=1)).isoformat(),
+            },
+        )
+
+        self.assertEqual(res.data, [])
+
+    def test_invalid_search(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {"from": self.route.source_id, "to": self.route.source_id, "date": "x"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItinerarySchemaTests(TestCase):
+    def test_endpoint_is_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        operation = schema["paths"]["/api/v1/itineraries/"]["get"]
+        self.assertLessEqual(
+            {"from", "to", "date"},
+            {parameter["name"] for parameter in operation["parameters"]},
+        )
+        self.assertEqual(
+            operation["responses"]["200"]["content"]["application/json"]["schema"][
+                "type"
+            ],
+            "array",
+        )
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Flight, Order
+from airlink_api.tests.test_airlink_api import FLIGHT_URL, sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+
+        start = timezone.now() + timedelta(days=1)
+        for index in range(25):
+            # Pairs of flights share a departure time to exercise the id tiebreak.
+            departure = start + timedelta(hours=index // 2)
+            sample_flight(
+                departure_time=departure, arrival_time=departure + timedelta(hours=1)
+            )
+        self.expected = list(
+            Flight.objects.order_by("departure_time", "id").values_list("pk", flat=True)
+        )
+
+    def walk(self, url, params):
+        ids, pages = [], 0
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [item["id"] for item in res.data["results"]]
+            pages += 1
+            if not res.data["next"]:
+                return ids, pages, res
+            res = self.client.get(res.data["next"])
+
+    def test_walk_flights_without_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            ids, pages, _ = self.walk(FLIGHT_URL, {"pagination": "cursor"})
+
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 3)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_previous_link(self):
+        first = self.client.get(FLIGHT_URL, {"pagination": "cursor", "page_size": 5})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in back.data["results"]], self.expected[:5]
+        )
+
+    def test_page_numbers_stay_default(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.data["count"], 25)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(FLIGHT_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_walk_orders_newest_first(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(12)]
+        Order.objects.filter(pk__in=[order.pk for order in orders[:6]]).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        expected = list(
+            Order.objects.order_by("-created_at", "-id").values_list("pk", flat=True)
+        )
+
+        ids, pages, _ = self.walk(ORDER_URL, {"pagination": "cursor"})
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 2)
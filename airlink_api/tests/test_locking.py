@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from airlink_api.locking import (
+    AdvisoryLocking,
+    get_locking_strategy,
+    OptimisticLocking,
+    PessimisticLocking,
+    SeatContention,
+)
+from airlink_api.models import SeatInventory
+from airlink_api.seat_inventory import find_best_seats, iter_taken
+from airlink_api.serializers import OrderSerializer
+from airlink_api.tests.test_airlink_api import sample_flight
+
+
+def first_free(count):
+    def choose(inventory):
+        return find_best_seats(
+            inventory.seat_map, inventory.rows, inventory.seats_in_row, count
+        )
+
+    return choose
+
+
+class LockingStrategyTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+
+    def taken(self):
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        return list(iter_taken(inventory.seat_map, inventory.seats_in_row))
+
+    def test_pessimistic_and_advisory_claim_seats(self):
+        PessimisticLocking().claim(self.flight, first_free(2))
+        AdvisoryLocking().claim(self.flight, first_free(1))
+
+        self.assertEqual(self.taken(), [(1, 1), (1, 2), (1, 3)])
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+    def test_optimistic_retries_on_remaining_seats(self):
+        calls = []
+
+        def choose(inventory):
+            if not calls:
+                PessimisticLocking().claim(self.flight, first_free(2))
+            calls.append(inventory.version)
+            return first_free(2)(inventory)
+
+        seats = OptimisticLocking().claim(self.flight, choose)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(seats, [(1, 3), (1, 4)])
+        self.assertEqual(self.taken(), [(1, 1), (1, 2), (1, 3), (1, 4)])
+
+    def test_optimistic_gives_up_after_retries(self):
+        def choose(inventory):
+            PessimisticLocking().claim(self.flight, first_free(1))
+            return first_free(1)(inventory)
+
+        with self.assertRaises(SeatContention):
+            OptimisticLocking(retries=2).claim(self.flight, choose)
+
+    @override_settings(SEAT_LOCKING={"STRATEGY": "optimistic"})
+    def test_order_uses_configured_strategy(self):
+        self.assertIsInstance(get_locking_strategy(), OptimisticLocking)
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        serializer = OrderSerializer(data={"flight": self.flight.id, "count": 2})
+        serializer.is_valid(raise_exception=True)
+
+        serializer.save(user=user)
+
+        self.assertEqual(self.taken(), [(1, 1), (1, 2)])
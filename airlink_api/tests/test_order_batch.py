@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Order, SeatInventory, Ticket
+from airlink_api.seat_holds import get_seat_hold_store
+from airlink_api.tests.test_airlink_api import sample_flight
+
+BATCH_URL = reverse("airlink_api:order-batch")
+
+
+def ticket(flight, row, seat):
+    return {"row": row, "seat": seat, "flight": flight.id}
+
+
+class OrderBatchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("agency@test.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.other_flight = sample_flight()
+
+    def test_per_order_results(self):
+        res = self.client.post(
+            BATCH_URL,
+            [
+                {"tickets": [ticket(self.flight, 1, 1), ticket(self.flight, 1, 2)]},
+                {"tickets": [ticket(self.flight, 1, 2)]},
+                {"tickets": [ticket(self.flight, 11, 1)]},
+                {"tickets": [ticket(self.other_flight, 1, 2)]},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 2)
+        self.assertIn("order", res.data["results"][0])
+        self.assertIn("errors", res.data["results"][1])
+        self.assertIn("errors", res.data["results"][2])
+        self.assertEqual(len(res.data["results"][3]["order"]["tickets"]), 1)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+    def test_tickets_inserted_once_for_whole_batch(self):
+        orders = [
+            {
+                "tickets": [
+                    ticket(self.flight, row, 1),
+                    ticket(self.other_flight, row, 1),
+                ]
+            }
+            for row in range(1, 6)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.post(BATCH_URL, orders, format="json")
+
+        self.assertEqual(res.data["created"], 5)
+        sql = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(
+            sum(query.startswith('INSERT INTO "airlink_api_ticket"') for query in sql),
+            1,
+        )
+        self.assertEqual(
+            sum('JOIN "airlink_api_airplane"' in query for query in sql), 1
+        )
+
+    def test_constraint_violation_replays_per_order(self):
+        self.client.post(
+            BATCH_URL, [{"tickets": [ticket(self.flight, 1, 1)]}], format="json"
+        )
+        SeatInventory.objects.filter(flight=self.flight).update(
+            seat_map=bytes(8), sold=0
+        )
+
+        res = self.client.post(
+            BATCH_URL,
+            [
+                {"tickets": [ticket(self.flight, 1, 1)]},
+                {"tickets": [ticket(self.flight, 2, 2)]},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertIn("errors", res.data["results"][0])
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 2)
+
+    def test_replay_keeps_hold_based_orders(self):
+        get_seat_hold_store.cache_clear()
+        self.addCleanup(get_seat_hold_store.cache_clear)
+        hold = get_seat_hold_store().acquire(self.flight.id, [(3, 3)], self.user.pk, 60)
+        self.client.post(
+            BATCH_URL, [{"tickets": [ticket(self.flight, 1, 1)]}], format="json"
+        )
+        SeatInventory.objects.filter(flight=self.flight).update(
+            seat_map=bytes(8), sold=0
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                BATCH_URL,
+                [
+                    {"tickets": [ticket(self.flight, 1, 1)]},
+                    {"hold": hold["token"]},
+                ],
+                format="json",
+            )
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertIn("order", res.data["results"][1])
+        self.assertTrue(
+            Ticket.objects.filter(flight=self.flight, row=3, seat=3).exists()
+        )
+        self.assertEqual(get_seat_hold_store().held_seats(self.flight.id), {})
+
+    def test_rejects_non_list_payload(self):
+        res = self.client.post(BATCH_URL, {"tickets": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
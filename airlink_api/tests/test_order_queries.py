@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from airlink_api.models import SeatInventory, Ticket
+from airlink_api.serializers import OrderSerializer
+from airlink_api.tests.test_airlink_api import sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class OrderCreationQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flights = [sample_flight(), sample_flight()]
+
+    def order(self, row, count):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id}
+                    for seat in range(1, count + 1)
+                    for flight in self.flights
+                ]
+            },
+            format="json",
+        )
+
+    def count_queries(self, row, count):
+        with CaptureQueriesContext(connection) as context:
+            res = self.order(row, count)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_ticket_count(self):
+        self.order(1, 1)
+
+        self.assertEqual(self.count_queries(2, 1), self.count_queries(3, 6))
+
+    def test_tickets_are_inserted_in_one_statement(self):
+        with CaptureQueriesContext(connection) as context:
+            self.order(1, 5)
+
+        inserts = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "airlink_api_ticket"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Ticket.objects.count(), 10)
+
+    def test_constraint_violation_reports_conflicting_seats(self):
+        flight = self.flights[0]
+        self.order(1, 1)
+        SeatInventory.objects.filter(flight=flight).update(seat_map=bytes(8), sold=0)
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": flight.id},
+                    {"row": 1, "seat": 2, "flight": flight.id},
+                ]
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(ValidationError) as context:
+            serializer.save(user=self.user)
+
+        self.assertEqual(
+            context.exception.detail["tickets"],
+            [f"Seat 1 in row 1 on flight {flight.id} is not available."],
+        )
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 1)
+
+    def test_duplicate_seats_in_one_order_rejected(self):
+        flight = self.flights[0]
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": flight.id},
+                    {"row": 1, "seat": 1, "flight": flight.id},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
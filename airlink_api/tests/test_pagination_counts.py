@@ -0,0 +1,148 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Order
+from airlink_api.pagination import CountPaginator, estimate_count
+from airlink_api.scheduling import create_schedule
+from airlink_api.tests.test_airlink_api import (
+    FLIGHT_URL,
+    sample_airplane,
+    sample_flight,
+)
+from airlink_api.tests.test_tickets_sold import create_order
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class CachedCountTests(TestCase):
+    def setUp(self):
+        caches["reference"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        # Counts are not cached while flight changes are uncommitted.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flights = [sample_flight() for _ in range(3)]
+
+    def get(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL, params)
+        return res.data, len(queries)
+
+    def test_count_is_cached(self):
+        first, first_queries = self.get()
+        second, second_queries = self.get()
+
+        self.assertEqual((first["count"], first["count_approximate"]), (3, False))
+        self.assertEqual((second["count"], second["count_approximate"]), (3, True))
+        self.assertEqual(second_queries, first_queries - 1)
+
+    def test_count_is_cached_per_filter_set(self):
+        self.get()
+
+        data, _ = self.get({"id": self.flights[0].pk})
+
+        self.assertEqual((data["count"], data["count_approximate"]), (1, False))
+
+    def test_flight_changes_refresh_the_count(self):
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flights[0].delete()
+
+        data, _ = self.get()
+        self.assertEqual((data["count"], data["count_approximate"]), (2, False))
+
+    def test_scheduled_flights_refresh_the_count(self):
+        self.get()
+        flight = self.flights[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_schedule(
+                [
+                    {
+                        "route_id": flight.route_id,
+                        "airplane_id": flight.airplane_id,
+                        "departure_time": flight.departure_time + timedelta(days=1),
+                        "arrival_time": flight.arrival_time + timedelta(days=1),
+                        "crew": [],
+                    }
+                ]
+            )
+
+        data, _ = self.get()
+        self.assertEqual((data["count"], data["count_approximate"]), (4, False))
+
+    def test_ticket_sales_keep_cached_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = sample_flight(airplane=sample_airplane(rows=1, seats_in_row=1))
+        self.get({"available_only": "true"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(self.user, flight, [(1, 1)])
+
+        # Bounded by the cache timeout and flagged as approximate.
+        data, _ = self.get({"available_only": "true"})
+        self.assertEqual((data["count"], data["count_approximate"]), (4, True))
+        self.assertEqual(len(data["results"]), 3)
+
+
+class EstimatedCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        for seat in range(1, 4):
+            create_order(self.user, flight, [(1, seat)])
+
+    def test_small_or_unknown_estimates_are_counted(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertFalse(res.data["count_approximate"])
+
+    @mock.patch("airlink_api.pagination.estimate_count", return_value=50000)
+    def test_large_estimates_are_used(self, estimate):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 50000)
+        self.assertTrue(res.data["count_approximate"])
+        self.assertEqual(len(res.data["results"]), 3)
+
+        past_real_rows = self.client.get(ORDER_URL, {"page": 2})
+        self.assertEqual(past_real_rows.status_code, status.HTTP_200_OK)
+        self.assertEqual(past_real_rows.data["results"], [])
+
+    def test_estimate_needs_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.assertIsInstance(estimate_count(Order.objects.all()), int)
+        else:
+            self.assertIsNone(estimate_count(Order.objects.all()))
+
+
+class CountPaginatorTests(TestCase):
+    def test_exact_count_rejects_pages_past_it(self):
+        paginator = CountPaginator(list(range(25)), 10, count=25)
+
+        self.assertEqual(list(paginator.page(3)), [20, 21, 22, 23, 24])
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    def test_approximate_count_serves_pages_past_it(self):
+        paginator = CountPaginator(list(range(25)), 10, count=12, approximate=True)
+
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertEqual(list(paginator.page(3)), [20, 21, 22, 23, 24])
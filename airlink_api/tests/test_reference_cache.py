@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Airport
+from airlink_api.serializers import CachedPrimaryKeyRelatedField
+from airlink_api.tests.test_airlink_api import sample_airport, sample_route
+
+AIRPORT_URL = reverse("airlink_api:airport-list")
+ROUTE_URL = reverse("airlink_api:route-list")
+
+
+def airport_url(airport_id):
+    return reverse("airlink_api:airport-detail", args=[airport_id])
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        caches["reference"].clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        # Committed data only: pending on_commit callbacks bypass the cache.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airport = sample_airport()
+            self.route = sample_route()
+
+    def test_list_and_detail_are_served_from_cache(self):
+        first = self.client.get(AIRPORT_URL)
+        detail = self.client.get(airport_url(self.airport.pk))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(AIRPORT_URL).data, first.data)
+            self.assertEqual(
+                self.client.get(airport_url(self.airport.pk)).data, detail.data
+            )
+
+    def test_changes_invalidate(self):
+        self.client.get(airport_url(self.airport.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(
+                airport_url(self.airport.pk), {"closest_big_city": "Lviv"}
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(airport_url(self.airport.pk))
+        self.assertEqual(res.data["closest_big_city"], "Lviv")
+
+    def test_uncommitted_changes_bypass_cache(self):
+        self.client.get(AIRPORT_URL)
+
+        Airport.objects.create(name="Uncommitted", closest_big_city="Kyiv")
+
+        self.assertEqual(self.client.get(AIRPORT_URL).data["count"], 4)
+
+    def test_route_airports_are_not_joined(self):
+        self.client.get(airport_url(self.route.source_id))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ROUTE_URL)
+
+        self.assertEqual(res.data["results"][0]["get_route"], str(self.route))
+        self.assertFalse(any("JOIN" in query["sql"] for query in queries))
+
+    def test_related_field_resolves_from_cache(self):
+        field = CachedPrimaryKeyRelatedField(queryset=Airport.objects.all())
+        field.to_internal_value(self.airport.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                field.to_internal_value(str(self.airport.pk)), self.airport
+            )
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value(0)
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value("x")
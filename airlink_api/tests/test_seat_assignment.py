@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Ticket
+from airlink_api.seat_inventory import build_seat_map, find_best_seats
+from airlink_api.tests.test_airlink_api import sample_airplane, sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class FindBestSeatsTests(SimpleTestCase):
+    def test_contiguous_block_in_front_most_row(self):
+        seat_map = build_seat_map(3, 4, [(1, 2), (2, 1)])
+
+        self.assertEqual(find_best_seats(seat_map, 3, 4, 3), [(2, 2), (2, 3), (2, 4)])
+
+    def test_falls_back_to_fewest_adjacent_rows(self):
+        taken = [(1, 1), (1, 2), (1, 3), (2, 2), (3, 2), (4, 1)]
+        seat_map = build_seat_map(4, 4, taken)
+
+        self.assertEqual(
+            find_best_seats(seat_map, 4, 4, 5),
+            [(2, 1), (2, 3), (2, 4), (3, 1), (3, 3)],
+        )
+
+    def test_blocked_seats_are_skipped(self):
+        seat_map = build_seat_map(2, 3, [])
+
+        self.assertEqual(
+            find_best_seats(seat_map, 2, 3, 3, blocked=[(1, 2)]),
+            [(2, 1), (2, 2), (2, 3)],
+        )
+
+    def test_not_together_takes_first_free_seats(self):
+        seat_map = build_seat_map(2, 3, [(1, 1)])
+
+        self.assertEqual(
+            find_best_seats(seat_map, 2, 3, 2, together=False), [(1, 2), (1, 3)]
+        )
+
+    def test_not_enough_seats(self):
+        seat_map = build_seat_map(1, 2, [(1, 1)])
+
+        self.assertIsNone(find_best_seats(seat_map, 1, 2, 2))
+
+
+class SeatAssignmentApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane(rows=2, seats_in_row=3))
+
+    def test_group_booking_gets_seats_together(self):
+        Ticket.objects.create(row=1, seat=2, flight=self.flight)
+
+        res = self.client.post(
+            ORDER_URL,
+            {"flight": self.flight.id, "count": 3, "together": True},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(2, 1), (2, 2), (2, 3)],
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 4)
+
+    def test_too_many_seats_requested(self):
+        res = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 7}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_flight_without_airplane_has_no_seats_to_assign(self):
+        self.flight.airplane.delete()
+
+        res = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 1}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data)
+
+    def test_assignment_cannot_be_mixed_with_tickets(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "flight": self.flight.id,
+                "count": 1,
+                "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}],
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,274 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import Order, Ticket
+from airlink_api.seat_holds import (
+    get_seat_hold_store,
+    LocMemSeatHoldStore,
+    RedisSeatHoldStore,
+    SeatsHeld,
+)
+from airlink_api.tests.test_airlink_api import sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+def order_url(order_id):
+    return reverse("airlink_api:order-detail", args=[order_id])
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis-py used by the hold store."""
+
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self.sets = {}
+
+    def _live(self, key):
+        value = self.values.get(key)
+        if value is not None and value[1] is not None and value[1] <= time.time():
+            del self.values[key]
+            return None
+        return value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._live(key) is not None:
+            return None
+        expires = time.time() + px / 1000 if px else None
+        self.values[key] = (value, expires)
+        return True
+
+    def get(self, key):
+        value = self._live(key)
+        return value[0] if value else None
+
+    def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high):
+        low = float(low)
+        high = float(high)
+        return [
+            member
+            for member, score in self.sorted_sets.get(key, {}).items()
+            if low <= score <= high
+        ]
+
+    def zremrangebyscore(self, key, low, high):
+        members = self.zrangebyscore(key, low, high)
+        return self.zrem(key, *members)
+
+    def zrem(self, key, *members):
+        sorted_set = self.sorted_sets.get(key, {})
+        return sum(sorted_set.pop(member, None) is not None for member in members)
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(str(value))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def srem(self, key, value):
+        self.sets.get(key, set()).discard(str(value))
+
+
+class SeatHoldStoreTestsMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+
+    def test_acquire_is_all_or_nothing(self):
+        self.store.acquire(1, [(1, 1)], 10, 60)
+
+        with self.assertRaises(SeatsHeld) as context:
+            self.store.acquire(1, [(1, 2), (1, 1)], 11, 60)
+
+        self.assertEqual(context.exception.seats, [(1, 1)])
+        self.assertEqual(self.store.held_seats(1), {(1, 1): 10})
+
+    def test_consume_only_by_owner_and_once(self):
+        hold = self.store.acquire(1, [(2, 2)], 10, 60)
+
+        self.assertIsNone(self.store.consume(hold["token"], 11))
+        self.assertEqual(self.store.consume(hold["token"], 10)["seats"], [(2, 2)])
+        self.assertIsNone(self.store.consume(hold["token"], 10))
+        self.assertEqual(self.store.held_seats(1), {})
+
+    def test_peek_keeps_the_hold(self):
+        hold = self.store.acquire(1, [(2, 2)], 10, 60)
+
+        self.assertIsNone(self.store.peek(hold["token"], 11))
+        self.assertEqual(self.store.peek(hold["token"], 10)["seats"], [(2, 2)])
+        self.assertEqual(self.store.held_seats(1), {(2, 2): 10})
+
+    def test_expired_holds_are_swept(self):
+        with mock.patch("airlink_api.seat_holds.time.time", return_value=1000.0):
+            hold = self.store.acquire(1, [(3, 3)], 10, 60)
+        with mock.patch("airlink_api.seat_holds.time.time", return_value=1061.0):
+            self.assertEqual(self.store.held_seats(1), {})
+            self.assertIsNone(self.store.consume(hold["token"], 10))
+            self.assertGreater(self.store.sweep(), 0)
+
+
+class LocMemSeatHoldStoreTests(SeatHoldStoreTestsMixin, SimpleTestCase):
+    def make_store(self):
+        return LocMemSeatHoldStore()
+
+
+class RedisSeatHoldStoreTests(SeatHoldStoreTestsMixin, SimpleTestCase):
+    def make_store(self):
+        return RedisSeatHoldStore(client=FakeRedis())
+
+    def test_expired_holds_are_swept(self):
+        hold = self.store.acquire(1, [(3, 3)], 10, 0.001)
+        time.sleep(0.01)
+
+        self.assertEqual(self.store.held_seats(1), {})
+        self.assertIsNone(self.store.consume(hold["token"], 10))
+        self.assertEqual(self.store.sweep(), 1)
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self):
+        get_seat_hold_store.cache_clear()
+        self.addCleanup(get_seat_hold_store.cache_clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.other = get_user_model().objects.create_user("other@test.com", "pass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.url = reverse("airlink_api:flight-holds", args=[self.flight.id])
+
+    def hold(self, *seats):
+        return self.client.post(
+            self.url,
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def test_hold_then_order(self):
+        res = self.hold((1, 1), (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL, {"hold": res.data["token"]}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(
+                Ticket.objects.filter(flight=self.flight).values_list("row", "seat")
+            ),
+            [(1, 1), (1, 2)],
+        )
+        self.assertEqual(get_seat_hold_store().held_seats(self.flight.id), {})
+
+    def test_held_seat_blocks_other_customers(self):
+        self.hold((4, 4))
+        self.client.force_authenticate(self.other)
+
+        self.assertEqual(self.hold((4, 4)).status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 4, "seat": 4, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hold_of_other_user_cannot_be_used(self):
+        token = self.hold((5, 5)).data["token"]
+        self.client.force_authenticate(self.other)
+
+        res = self.client.post(ORDER_URL, {"hold": token}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_sold_seat_cannot_be_held(self):
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 2, "seat": 2, "flight": self.flight.id}]},
+            format="json",
+        )
+
+        self.assertEqual(self.hold((2, 2)).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_without_airplane_cannot_be_held(self):
+        self.flight.airplane.delete()
+
+        res = self.hold((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data)
+
+    def test_failed_order_keeps_the_hold(self):
+        token = self.hold((1, 1), (1, 2)).data["token"]
+        Ticket.objects.create(row=1, seat=2, flight=self.flight)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, {"hold": token}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            get_seat_hold_store().held_seats(self.flight.id),
+            {(1, 1): self.user.pk, (1, 2): self.user.pk},
+        )
+
+    def test_partial_update_needs_no_tickets(self):
+        order = Order.objects.create(user=self.user)
+
+        res = self.client.patch(order_url(order.id), {}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_update_rejects_create_only_fields(self):
+        order = Order.objects.create(user=self.user)
+        token = self.hold((1, 1)).data["token"]
+
+        for data in (
+            {"hold": token},
+            {"flight": self.flight.id, "count": 2},
+            {"together": True},
+        ):
+            res = self.client.patch(order_url(order.id), data, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(set(res.data), set(data))
+        self.assertFalse(order.tickets.exists())
+
+
+class SweepSeatHoldsCommandTests(SimpleTestCase):
+    def setUp(self):
+        get_seat_hold_store.cache_clear()
+        self.addCleanup(get_seat_hold_store.cache_clear)
+
+    def test_refuses_process_local_store(self):
+        with self.assertRaises(CommandError):
+            call_command("sweep_seat_holds", stdout=StringIO())
+
+    @override_settings(
+        SEAT_HOLDS={
+            "STORE": "airlink_api.seat_holds.RedisSeatHoldStore",
+            "OPTIONS": {"client": "airlink_api.tests.test_seat_holds.FakeRedis"},
+        }
+    )
+    def test_sweeps_shared_store(self):
+        out = StringIO()
+
+        call_command("sweep_seat_holds", stdout=out)
+
+        self.assertIn("Removed 0 expired seat hold entries", out.getvalue())
@@ -0,0 +1,140 @@
+import base64
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airlink_api.models import SeatInventory, Ticket
+from airlink_api.seat_inventory import check_inventory, iter_taken
+from airlink_api.tests.test_airlink_api import FLIGHT_URL, sample_flight
+
+ORDER_URL = reverse("airlink_api:order-list")
+
+
+class SeatInventoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def order(self, *seats):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_order_marks_seats_sold(self):
+        res = self.order((1, 1), (10, 6))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.sold, 2)
+        self.assertEqual(
+            list(iter_taken(inventory.seat_map, inventory.seats_in_row)),
+            [(1, 1), (10, 6)],
+        )
+        self.assertEqual(check_inventory(self.flight), [])
+
+    def test_taken_seat_rejected(self):
+        self.order((2, 3))
+        res = self.order((2, 4), (2, 3))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SeatInventory.objects.get(flight=self.flight).sold, 1)
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 1)
+
+    def test_list_reads_availability_from_inventory(self):
+        self.order((1, 1), (1, 2), (1, 3))
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 57)
+
+    def test_ticket_delete_releases_seat(self):
+        self.order((4, 4))
+
+        Ticket.objects.get(flight=self.flight).delete()
+
+        inventory = SeatInventory.objects.get(flight=self.flight)
+        self.assertEqual(inventory.sold, 0)
+        self.assertEqual(check_inventory(self.flight), [])
+
+    def test_rebuild_command_repairs_drift(self):
+        self.order((3, 1))
+        SeatInventory.objects.filter(flight=self.flight).update(seat_map=b"", sold=0)
+        out = StringIO()
+
+        call_command("rebuild_seat_inventory", "--check", stdout=out)
+        self.assertIn("inconsistent", out.getvalue())
+
+        call_command("rebuild_seat_inventory", stdout=StringIO())
+        self.assertEqual(check_inventory(self.flight), [])
+
+
+class SeatMapApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                    {"row": 1, "seat": 2, "flight": self.flight.id},
+                    {"row": 2, "seat": 1, "flight": self.flight.id},
+                ]
+            },
+            format="json",
+        )
+        self.url = reverse("airlink_api:flight-seatmap", args=[self.flight.id])
+
+    def test_seatmap_base64(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 10)
+        self.assertEqual(res.data["seats_in_row"], 6)
+        self.assertEqual(res.data["sold"], 3)
+        seat_map = base64.b64decode(res.data["seats"])
+        self.assertEqual(len(seat_map), 8)
+        self.assertEqual(seat_map[0], 0b01000011)
+
+    def test_seatmap_run_lengths(self):
+        res = self.client.get(self.url, {"encoding": "rle"})
+
+        self.assertEqual(res.data["seats"], [0, 2, 4, 1, 53])
+
+    def test_detail_compact_seatmap(self):
+        res = self.client.get(
+            reverse("airlink_api:flight-detail", args=[self.flight.id]),
+            {"seatmap": "compact"},
+        )
+
+        self.assertNotIn("taken_places", res.data)
+        self.assertEqual(res.data["seatmap"]["sold"], 3)
+
+    def test_flight_without_airplane_has_no_seatmap(self):
+        self.flight.airplane.delete()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(
+            reverse("airlink_api:flight-detail", args=[self.flight.id]),
+            {"seatmap": "compact"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data["seatmap"])
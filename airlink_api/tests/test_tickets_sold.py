@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+
+from airlink_api import locking
+from airlink_api.models import Flight, FlightSearchEntry, SeatInventory, Ticket
+from airlink_api.seat_inventory import iter_taken
+from airlink_api.serializers import OrderSerializer
+from airlink_api.tests.test_airlink_api import sample_flight
+
+
+def create_order(user, flight, seats):
+    serializer = OrderSerializer(
+        data={
+            "tickets": [
+                {"row": row, "seat": seat, "flight": flight.id} for row, seat in seats
+            ]
+        }
+    )
+    serializer.is_valid(raise_exception=True)
+    return serializer.save(user=user)
+
+
+class TicketsSoldCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.flight = sample_flight()
+
+    def test_counter_follows_orders_and_deletes(self):
+        create_order(self.user, self.flight, [(1, 1), (1, 2)])
+        create_order(self.user, self.flight, [(2, 1)])
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+        Ticket.objects.get(row=1, seat=2).delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+    def test_counter_follows_ticket_moved_to_other_flight(self):
+        other_flight = sample_flight()
+        create_order(self.user, self.flight, [(1, 1)])
+
+        ticket = Ticket.objects.get(flight=self.flight)
+        ticket.flight = other_flight
+        ticket.save()
+
+        self.flight.refresh_from_db()
+        other_flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+        self.assertEqual(other_flight.tickets_sold, 1)
+
+    def test_counter_uses_stale_instances_safely(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        create_order(self.user, self.flight, [(3, 3)])
+
+        create_order(self.user, stale, [(3, 4)])
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+    def test_ticket_changes_move_single_seats(self):
+        create_order(self.user, self.flight, [(1, 1), (1, 2)])
+        ticket = Ticket.objects.get(row=1, seat=2)
+
+        ticket.seat = 3
+        ticket.save()
+        inventory = SeatInventory.objects.get(pk=self.flight.pk)
+        self.assertEqual(
+            list(iter_taken(inventory.seat_map, inventory.seats_in_row)),
+            [(1, 1), (1, 3)],
+        )
+        self.assertEqual(inventory.sold, 2)
+
+        ticket.delete()
+        inventory = SeatInventory.objects.get(pk=self.flight.pk)
+        self.assertEqual(
+            list(iter_taken(inventory.seat_map, inventory.seats_in_row)), [(1, 1)]
+        )
+        self.assertEqual(inventory.sold, 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+    def test_reconcile_command(self):
+        create_order(self.user, self.flight, [(1, 1), (1, 2)])
+        untouched = sample_flight()
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_sold=7)
+        SeatInventory.objects.filter(pk=self.flight.pk).update(sold=5)
+        FlightSearchEntry.objects.filter(pk=self.flight.pk).update(tickets_sold=9)
+
+        call_command("reconcile_tickets_sold", "--batch-size", "1", stdout=StringIO())
+
+        self.flight.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+        self.assertEqual(SeatInventory.objects.get(pk=self.flight.pk).sold, 2)
+        self.assertEqual(
+            FlightSearchEntry.objects.get(pk=self.flight.pk).tickets_sold, 2
+        )
+        self.assertEqual(untouched.tickets_sold, 0)
+
+
+@override_settings(SEAT_LOCKING={"STRATEGY": "optimistic"})
+class InterleavedTicketsSoldTests(TestCase):
+    """Two orders read the same inventory; the second one writes first."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.flight = sample_flight()
+
+    def test_interleaved_orders_keep_counter_exact(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        real_save = locking.save_reservation
+        interleaved = []
+
+        def save_after_other_order(*args, **kwargs):
+            if not interleaved:
+                interleaved.append(True)
+                create_order(self.user, stale, [(2, 1), (2, 2)])
+            return real_save(*args, **kwargs)
+
+        with mock.patch(
+            "airlink_api.locking.save_reservation", side_effect=save_after_other_order
+        ) as save:
+            create_order(self.user, self.flight, [(1, 1)])
+
+        # The first write found a newer inventory version and was retried.
+        self.assertEqual(save.call_count, 3)
+        self.flight.refresh_from_db()
+        inventory = SeatInventory.objects.get(pk=self.flight.pk)
+        self.assertEqual(self.flight.tickets_sold, 3)
+        self.assertEqual(inventory.sold, 3)
+        self.assertEqual(
+            list(iter_taken(inventory.seat_map, inventory.seats_in_row)),
+            [(1, 1), (2, 1), (2, 2)],
+        )
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 3)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentTicketsSoldTests(TransactionTestCase):
+    """Needs a database with row locks and concurrent writers (PostgreSQL)."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.flight = sample_flight()
+
+    def place_order(self, row):
+        try:
+            return create_order(
+                self.user, self.flight, [(row, seat) for seat in range(1, 7)]
+            )
+        finally:
+            connection.close()
+
+    def test_concurrent_orders_keep_counter_exact(self):
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(self.place_order, range(1, 11)))
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 60)
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 60)
@@ -8,6 +8,7 @@ from airlink_api.views import (
     CrewViewSet,
     RouteViewSet,
     FlightViewSet,
+    ItineraryViewSet,
     OrderViewSet,
 )
 
@@ -18,6 +19,7 @@ router.register(r"airports", AirportViewSet, basename="airport")
 router.register(r"crew", CrewViewSet, basename="crew")
 router.register(r"routes", RouteViewSet, basename="route")
 router.register(r"flights", FlightViewSet, basename="flight")
+router.register(r"itineraries", ItineraryViewSet, basename="itinerary")
 router.register(r"orders", OrderViewSet, basename="order")
 
 urlpatterns = [path("", include(router.urls))]
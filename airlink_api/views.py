@@ -1,11 +1,27 @@
-from django.db.models import F, Count, Value
-from django.db.models.functions import Concat
+from datetime import datetime, time, timedelta
+
+from django.db.models import F, Max, Sum
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets, filters
-from rest_framework.pagination import PageNumberPagination
+from drf_spectacular.utils import extend_schema
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from airlink_api.mixins import GenericMethodsMixin
+from airlink_api.autocomplete import find_airports
+from airlink_api.crew_schedule import crew_schedules
+from airlink_api.filters import FlightFilter, FlightSearchFilter
+from airlink_api.geo import find_nearby_airports
+from airlink_api.itineraries import describe_itinerary, find_itineraries
+from airlink_api.mixins import (
+    GenericMethodsMixin,
+    ConditionalGetMixin,
+    IdempotentCreateMixin,
+    KeysetPaginationMixin,
+    ReferenceCacheMixin,
+    ReferenceVersionMixin,
+)
 from airlink_api.models import (
     AirplaneType,
     Airplane,
@@ -13,34 +29,60 @@ from airlink_api.models import (
     Crew,
     Route,
     Flight,
+    FlightSearchEntry,
     Order,
 )
+from airlink_api.pagination import (
+    CountStrategyPagination,
+    FlightKeysetPagination,
+    OrderKeysetPagination,
+)
 from airlink_api.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airlink_api.reference_cache import (
+    REFERENCE_MODELS,
+    cache_enabled,
+    get_versions,
+)
+from airlink_api.seat_inventory import encode_seat_map, get_inventory
 from airlink_api.serializers import (
     AirplaneTypeSerializer,
     AirplaneSerializer,
     AirportSerializer,
+    AirportAutocompleteSerializer,
+    NearbyAirportSerializer,
+    NearbyAirportsSearchSerializer,
     CrewSerializer,
+    CrewScheduleSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    ScheduleRangeSerializer,
     RouteSerializer,
     FlightSerializer,
     OrderSerializer,
     AirplaneListSerializer,
     AirplaneDetailSerializer,
-    FlightListSerializer,
+    FlightSearchEntrySerializer,
     FlightDetailSerializer,
+    FlightDetailCompactSerializer,
+    FlightScheduleSerializer,
+    AutoAssignCrewSerializer,
+    SeatHoldSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
     OrderDetailSerializer,
 )
 
 
-class BasePagination(PageNumberPagination):
+class BasePagination(CountStrategyPagination):
     page_size = 10
     max_page_size = 100
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(
+    ReferenceVersionMixin, ReferenceCacheMixin, viewsets.ModelViewSet
+):
     queryset = AirplaneType.objects.all()
+    reference_models = (AirplaneType,)
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -49,8 +91,12 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
     pagination_class = BasePagination
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
-    queryset = Airplane.objects.select_related("airplane_type")
+class AirplaneViewSet(
+    ReferenceVersionMixin, ReferenceCacheMixin, viewsets.ModelViewSet
+):
+    queryset = Airplane.objects.all()
+    reference_models = (Airplane, AirplaneType)
+    cached_relations = ("airplane_type",)
     serializer_class = AirplaneSerializer
     action_serializers = {
         "list": AirplaneListSerializer,
@@ -63,8 +109,9 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     pagination_class = BasePagination
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(ReferenceVersionMixin, ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
+    reference_models = (Airport,)
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -72,9 +119,39 @@ class AirportViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "closest_big_city"]
     pagination_class = BasePagination
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Airports whose name, city or a word of the name starts with ``?q=``,
+        ignoring case and accents; at most ``?limit=`` of them. Served from
+        an in-memory index, see ``airlink_api.autocomplete``.
+        """
+        params = AirportAutocompleteSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        airports = find_airports(
+            params.validated_data["q"], params.validated_data.get("limit")
+        )
+        return Response(AirportSerializer(airports, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def nearby(self, request):
+        """
+        Airports within ``?radius=`` km of ``?lat=&lon=``, nearest first,
+        with their ``distance`` in km. Served from an in-memory grid, see
+        ``airlink_api.geo``.
+        """
+        params = NearbyAirportsSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        airports = find_nearby_airports(
+            data["lat"], data["lon"], data.get("radius"), data.get("limit")
+        )
+        return Response(NearbyAirportSerializer(airports, many=True).data)
+
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(ReferenceVersionMixin, ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
+    reference_models = (Crew,)
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -82,10 +159,55 @@ class CrewViewSet(viewsets.ModelViewSet):
     search_fields = ["first_name", "last_name"]
     pagination_class = BasePagination
 
+    def get_schedules(self, crew):
+        """Serialize the timelines of ``crew`` within the requested range."""
+        params = ScheduleRangeSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        schedules = crew_schedules(
+            [member.pk for member in crew],
+            params.validated_data.get("from"),
+            params.validated_data.get("to"),
+        )
+        return CrewScheduleSerializer(
+            [
+                {
+                    "crew": member.pk,
+                    "full_name": member.full_name,
+                    "flights": schedules[member.pk],
+                }
+                for member in crew
+            ],
+            many=True,
+        ).data
+
+    @action(detail=True, methods=["get"])
+    def schedule(self, request, pk=None):
+        """
+        Flights of the crew member overlapping ``?from=&to=``, sorted by
+        departure, with the rest time before each of them.
+        """
+        return Response(self.get_schedules([self.get_object()])[0])
+
+    @action(detail=False, methods=["get"])
+    def schedules(self, request):
+        """Schedules of a page of crew members; accepts the list filters."""
+        crew = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(crew)
+        if page is not None:
+            return self.get_paginated_response(self.get_schedules(page))
+        return Response(self.get_schedules(crew))
+
 
-class RouteViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
+class RouteViewSet(
+    ReferenceVersionMixin,
+    ReferenceCacheMixin,
+    GenericMethodsMixin,
+    viewsets.ModelViewSet,
+):
     pagination_class = BasePagination
-    queryset = Route.objects.select_related("source", "destination")
+    queryset = Route.objects.all()
+    reference_models = (Route, Airport)
+    cached_relations = ("source", "destination")
     serializer_class = RouteSerializer
     action_serializers = {
         "list": RouteListSerializer,
@@ -96,18 +218,85 @@ class RouteViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
     filterset_fields = ["source__name", "destination__name"]
 
 
-class FlightViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
+class FlightViewSet(
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    GenericMethodsMixin,
+    viewsets.ModelViewSet,
+):
     pagination_class = BasePagination
+    keyset_pagination_class = FlightKeysetPagination
+    count_strategy = "cached"
+    # Sales are not tracked: ``available_only`` counts may lag by the timeout.
+    count_models = (Flight,)
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["departure_time", "arrival_time", "id", "route__id"]
     serializer_class = FlightSerializer
     action_serializers = {
-        "list": FlightListSerializer,
+        "list": FlightSearchEntrySerializer,
         "retrieve": FlightDetailSerializer,
     }
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    schedule_max_size = 5000
+
+    @property
+    def filterset_class(self):
+        return FlightSearchFilter if self.action == "list" else FlightFilter
+
+    def get_version_stamp(self):
+        """
+        Search entries are rewritten with a new ``updated_at`` whenever
+        anything a flight shows changes, including seats sold; the seat
+        inventory version also covers tickets moved between seats.
+
+        A list stamp must also change when rows leave the filtered set, which
+        leaves its newest ``updated_at`` alone. The sum of the matching ids
+        is an order-independent checksum of the set, computed without a
+        ``COUNT``; sales inside the set move ``updated_at`` and flights that
+        sell out under ``available_only`` change the checksum. The versions
+        of flights (bumped on save and delete) and of the reference data
+        copied into entries cover edits.
+
+        The aggregate reads every row matching the filters on each request,
+        304 or not, so it saves serializing the page but not the scan.
+        """
+        if self.action == "list":
+            if not cache_enabled():
+                return None
+            stamp = (
+                self.filter_queryset(self.get_queryset())
+                .order_by()
+                .aggregate(updated_at=Max("updated_at"), ids=Sum("flight_id"))
+            )
+            versions = get_versions([Flight, *REFERENCE_MODELS])
+            return [stamp["updated_at"], stamp["ids"], versions], stamp["updated_at"]
+        if self.action == "retrieve":
+            try:
+                row = (
+                    FlightSearchEntry.objects.filter(pk=self.kwargs["pk"])
+                    .values_list("updated_at", "flight__seat_inventory__version")
+                    .first()
+                )
+            except (TypeError, ValueError):
+                return None
+            if row is not None:
+                return list(row), row[0]
+        return None
+
+    def get_serializer_class(self):
+        if (
+            self.action == "retrieve"
+            and self.request.query_params.get("seatmap") == "compact"
+        ):
+            return FlightDetailCompactSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
+        if self.action == "list":
+            # The list reads only the flattened read model, see flight_search.
+            return FlightSearchEntry.objects.order_by("departure_time", "flight_id")
+        if self.action in ("seatmap", "holds"):
+            return Flight.objects.select_related("airplane")
+
         queryset = (
             Flight.objects.select_related(
                 "airplane__airplane_type",
@@ -119,21 +308,152 @@ class FlightViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
             )
             .annotate(
                 tickets_available=(
-                    F("airplane__rows") * F("airplane__seats_in_row") - Count("tickets")
-                ),
-                custom_route=Concat(
-                    F("route__source__name"),
-                    Value(" - "),
-                    F("route__destination__name"),
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                    - F("tickets_sold")
                 ),
             )
         )
         return queryset
 
+    @action(detail=True, methods=["get"])
+    def seatmap(self, request, pk=None):
+        """
+        Occupancy of the flight as a packed bitmap (``?encoding=base64``,
+        default) or run lengths (``?encoding=rle``).
+        """
+        flight = self.get_object()
+        if flight.airplane_id is None:
+            return Response(
+                {"detail": "The flight has no airplane, so it has no seats."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        encoding = request.query_params.get("encoding", "base64")
+        if encoding not in ("base64", "rle"):
+            return Response(
+                {"encoding": "Must be either 'base64' or 'rle'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(encode_seat_map(get_inventory(flight), encoding))
+
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[IsAuthenticated],
+        serializer_class=SeatHoldSerializer,
+    )
+    def holds(self, request, pk=None):
+        """Hold seats for a few minutes so that an order can be placed on them."""
+        flight = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "flight": flight},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], serializer_class=FlightScheduleSerializer)
+    def schedule(self, request):
+        """
+        Create up to ``schedule_max_size`` flights at once. The batch is
+        validated as a whole, including conflicts between its own flights,
+        and either every flight is created or none.
+        """
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {"detail": "Expected a non-empty list of flights."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.schedule_max_size:
+            return Response(
+                {"detail": f"At most {self.schedule_max_size} flights per schedule."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            {"created": len(serializer.data), "results": serializer.data},
+            status=status.HTTP_201_CREATED,
+        )
 
-class OrderViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="auto-assign-crew",
+        serializer_class=AutoAssignCrewSerializer,
+    )
+    def auto_assign_crew(self, request):
+        """
+        Staff the selected flights with at least ``min_crew`` crew members
+        each, keeping ``min_rest_minutes`` between duties. Returns the roster;
+        it is only stored with ``"commit": true``.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ItineraryViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def list(self, request):
+        """
+        Connections from airport ``?from=`` to airport ``?to=`` with the first
+        leg departing on ``?date=``, ranked by ``?rank=arrival|distance``.
+        """
+        params = ItinerarySearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        earliest = timezone.make_aware(datetime.combine(data["date"], time.min))
+        min_connection = data.get("min_connection_minutes")
+        itineraries = find_itineraries(
+            data["from"].pk,
+            data["to"].pk,
+            earliest,
+            earliest + timedelta(days=1),
+            max_legs=data.get("max_legs"),
+            min_connection=None if min_connection is None else min_connection * 60,
+            rank=data["rank"],
+            limit=data["limit"],
+        )
+
+        airports = dict(
+            Airport.objects.filter(
+                pk__in={
+                    airport
+                    for legs in itineraries
+                    for leg in legs
+                    for airport in (leg.source, leg.destination)
+                }
+            ).values_list("pk", "name")
+        )
+        return Response(
+            ItinerarySerializer(
+                [describe_itinerary(legs, airports) for legs in itineraries],
+                many=True,
+            ).data
+        )
+
+
+class OrderViewSet(
+    IdempotentCreateMixin,
+    KeysetPaginationMixin,
+    GenericMethodsMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Order.objects.prefetch_related("tickets")
     pagination_class = BasePagination
+    keyset_pagination_class = OrderKeysetPagination
+    # Staff list every order; the planner estimate avoids counting them all.
+    count_strategy = "estimated"
     serializer_class = OrderSerializer
     action_serializers = {
         "retrieve": OrderDetailSerializer,
@@ -142,6 +462,7 @@ class OrderViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     ordering_fields = ["created_at"]
     search_fields = ["tickets__flight"]
+    batch_max_size = 500
 
     def get_queryset(self):
         queryset = self.queryset
@@ -157,3 +478,33 @@ class OrderViewSet(GenericMethodsMixin, viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Create up to ``batch_max_size`` orders in one request. Every order
+        succeeds or fails on its own; the response lists per-order results.
+        """
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {"detail": "Expected a non-empty list of orders."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.batch_max_size:
+            return Response(
+                {"detail": f"At most {self.batch_max_size} orders per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = OrderSerializer.create_batch(
+            request.data, self.get_serializer_context(), request.user
+        )
+        created = sum("order" in result for result in results)
+        return Response(
+            {
+                "created": created,
+                "failed": len(results) - created,
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -104,15 +104,114 @@ AUTH_USER_MODEL = "user.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("user.authentication.CachedJWTAuthentication",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.UserTokenObtainPairSerializer",
+}
+
+# "cached" resolves token users through the users cache, "stateless" trusts
+# the signed claims; see user.authentication.
+USER_AUTHENTICATION = {
+    "MODE": os.environ.get("USER_AUTHENTICATION_MODE", "cached"),
+    "CACHE_ALIAS": "users",
+    "TIMEOUT": 5 * 60,
+}
+
+SEAT_HOLDS = {
+    "STORE": "airlink_api.seat_holds.LocMemSeatHoldStore",
+    "OPTIONS": {},
+    "DEFAULT_MINUTES": 10,
+    "MAX_MINUTES": 30,
+}
+
+SEAT_LOCKING = {
+    "STRATEGY": os.getenv("SEAT_LOCKING_STRATEGY", "pessimistic"),
+    "OPTIMISTIC_RETRIES": 5,
+}
+
+IDEMPOTENCY = {
+    "STORE": "airlink_api.idempotency.CacheIdempotencyStore",
+    "OPTIONS": {},
+    "TTL": 24 * 60 * 60,
+    "LOCK_TIMEOUT": 30,
+    "WAIT": 5,
+}
+
+CREW_ROSTER = {
+    "MIN_CREW": 2,
+    "MIN_REST_MINUTES": 60,
+    "WORKERS": int(os.getenv("CREW_ROSTER_WORKERS", 1)),
+}
+
+ITINERARIES = {
+    "CACHE_ALIAS": "default",
+    "MIN_CONNECTION_MINUTES": 45,
+    "MAX_CONNECTION_MINUTES": 12 * 60,
+    "MAX_LEGS": 3,
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Bounded LRU cache of reference data, see airlink_api.reference_cache.
+    "reference": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "reference",
+        "TIMEOUT": 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Users of JWT-authenticated requests, see user.authentication.
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "users",
+        "TIMEOUT": 5 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Serialized flight fragments, see airlink_api.fragment_cache.
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragments",
+        "TIMEOUT": 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
+REFERENCE_CACHE = {
+    "CACHE_ALIAS": "reference",
+    "TIMEOUT": 60 * 60,
+}
+
+# Page counts of viewsets with a count_strategy, see airlink_api.pagination.
+# Cached counts live next to the reference versions they are keyed by.
+PAGINATION_COUNT = {
+    "STRATEGY": "exact",
+    "CACHE_ALIAS": "reference",
+    "TIMEOUT": 60,
+    "ESTIMATE_THRESHOLD": 10000,
+}
+
+FRAGMENT_CACHE = {
+    "CACHE_ALIAS": "fragments",
+    "TIMEOUT": 60 * 60,
+    "STATS_HOOK": "airlink_api.fragment_cache.record_stats",
+}
+
+AIRPORT_GEO = {
+    "CELL_DEGREES": 1.0,
+    "RADIUS_KM": 200,
+    "MAX_RADIUS_KM": 2000,
+}
+
+AIRPORT_AUTOCOMPLETE = {
+    "CACHE_ALIAS": "default",
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
 }
 
 SPECTACULAR_SETTINGS = {
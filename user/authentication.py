@@ -0,0 +1,113 @@
+"""
+JWT authentication without a user query per request.
+
+``CachedJWTAuthentication`` resolves the user of an access token from the
+cache named by ``USER_AUTHENTICATION["CACHE_ALIAS"]`` (bounded by the
+backend, e.g. ``MAX_ENTRIES`` of ``LocMemCache``) for ``TIMEOUT`` seconds.
+Entries are keyed by the user id and a per-user version that is replaced
+after every committed change to the user (see ``user.signals``), so new
+permissions, deactivation and password changes apply on the next request.
+Versions are unique timestamps rather than counters, so an evicted version
+never points back at an older entry. Use a shared cache backend when
+several processes serve requests.
+
+With ``MODE = "stateless"`` no cache or database is involved: the user is
+built from the ``email``, ``is_staff`` and ``is_superuser`` claims signed
+into the token by ``UserTokenObtainPairSerializer``. Changes to a user then
+take effect only once their tokens expire.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULT_SETTINGS = {
+    "MODE": "cached",
+    "CACHE_ALIAS": "default",
+    "CACHE_PREFIX": "auth-user",
+    "TIMEOUT": 5 * 60,
+}
+
+MODES = ("cached", "stateless")
+
+# Claims the stateless mode builds users from.
+USER_CLAIMS = ("email", "is_staff", "is_superuser")
+
+
+def authentication_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "USER_AUTHENTICATION", {})}
+
+
+def _cache():
+    return caches[authentication_settings()["CACHE_ALIAS"]]
+
+
+def _version_key(user_id):
+    return f"{authentication_settings()['CACHE_PREFIX']}:{user_id}:version"
+
+
+def user_key(user_id):
+    """Cache key of the current entry of ``user_id``."""
+    cache = _cache()
+    key = _version_key(user_id)
+    cache.add(key, time.time_ns(), None)
+    return f"{authentication_settings()['CACHE_PREFIX']}:{user_id}:{cache.get(key)}"
+
+
+def bump_version(user_id):
+    _cache().set(_version_key(user_id), time.time_ns(), None)
+
+
+def record_change(user_id):
+    """Drop the cached user once the transaction commits."""
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        config = authentication_settings()
+        if config["MODE"] not in MODES:
+            raise ValueError(
+                f"Unknown USER_AUTHENTICATION mode {config['MODE']!r}, "
+                f"expected one of {', '.join(MODES)}."
+            )
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if config["MODE"] == "stateless":
+            return self.get_token_user(user_id, validated_token)
+
+        key = user_key(user_id)
+        user = _cache().get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            _cache().set(key, user, config["TIMEOUT"])
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+    def get_token_user(self, user_id, validated_token):
+        """An unsaved user instance made of the token's claims."""
+        user = self.user_model(
+            **{api_settings.USER_ID_FIELD: user_id},
+            email=validated_token.get("email", ""),
+            is_staff=validated_token.get("is_staff", False),
+            is_superuser=validated_token.get("is_superuser", False),
+            is_active=True,
+        )
+        # Usable in queries and as a foreign key like a loaded user.
+        user._state.adding = False
+        user._state.db = DEFAULT_DB_ALIAS
+        return user
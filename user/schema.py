@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documents ``CachedJWTAuthentication`` as the same bearer scheme."""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import record_change
+
+# Saves limited to other fields (e.g. ``last_login``) keep cached users valid.
+AUTH_FIELDS = {"email", "password", "is_active", "is_staff", "is_superuser"}
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not AUTH_FIELDS & set(update_fields)):
+        return
+    record_change(instance.pk)
@@ -1 +1,96 @@
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import CachedJWTAuthentication
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+MANAGE_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        caches["users"].clear()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        res = APIClient().post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        self.token = res.data["access"]
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def save(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_user_is_cached(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user, self.user)
+
+    def test_changes_invalidate_cached_user(self):
+        self.authenticate()
+
+        self.save(is_staff=True)
+        self.assertTrue(self.authenticate().is_staff)
+
+        self.save(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_last_login_keeps_cached_user(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    def test_password_change_through_manage_view(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = client.patch(MANAGE_URL, {"password": "newpass"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.authenticate().check_password("newpass"))
+
+    def test_token_carries_user_claims(self):
+        token = AccessToken(self.token)
+
+        self.assertEqual(token["email"], "test@test.com")
+        self.assertFalse(token["is_staff"])
+
+    @override_settings(USER_AUTHENTICATION={"MODE": "stateless"})
+    def test_stateless_mode_trusts_claims(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "test@test.com")
+        self.assertFalse(user.is_staff)
+        self.assertEqual(get_user_model().objects.get(pk=user.pk), self.user)
+
+    @override_settings(USER_AUTHENTICATION={"MODE": "unknown"})
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.authenticate()